@@ -8,7 +8,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from temporal_analysis.temporal_analysis_handler import TemporalAnalysisHandler
-from pymongo import MongoClient
+from mongodb_storage import get_mongo_client
 from datetime import datetime
 
 
@@ -16,7 +16,7 @@ class RealTemporalAnalysisPipeline:
     """Pipeline for analyzing real temporal data from collections"""
     
     def __init__(self):
-        self.mongo_client = MongoClient('localhost', 27017)
+        self.mongo_client = get_mongo_client()
         self.db = self.mongo_client['gen_eezes']
         self.analysis_handler = TemporalAnalysisHandler()
     
@@ -4,6 +4,9 @@ import sys
 sys.path.insert(0, '..')
 from mongodb_storage import MongoDBStorage
 
+# incremental runs re-read this far behind the watermark (late announcements, cross-lists)
+WATERMARK_LOOKBACK = timedelta(days=3)
+
 class ArxivCollector:
     def __init__(self, max_results=300, days_back=365,categories=None):
         if categories is None: # default AI-related arXiv categories
@@ -23,6 +26,7 @@ class ArxivCollector:
         self.days_back = days_back
         self.categories = categories
         self.query = " OR ".join(categories) # build query string
+        self.pending_watermarks = {} # filled by the incremental fetch, saved with commit_watermarks()
 
     def fetch_recent_papers(self):
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=self.days_back) # goes back x days (set from main + timezone aware)
@@ -42,24 +46,96 @@ class ArxivCollector:
             
             print(f"  recent paper")
             
-            paper = {
-                "arxiv_id": result.get_short_id(),
-                "title": result.title.strip(),
-                "abstract": result.summary.strip(),
-                "authors": [a.name for a in result.authors],
-                "categories": result.categories,
-                "published": result.published.strftime('%Y-%m-%d'),
-                "pdf_url": result.pdf_url,
-                "arxiv_url": result.entry_id
-            }
-            collected.append(paper)
+            collected.append(self.build_paper(result))
             print(f"  added to results")
             
         return collected
 
+    def build_paper(self, result):
+        return {
+            "arxiv_id": result.get_short_id(),
+            "title": result.title.strip(),
+            "abstract": result.summary.strip(),
+            "authors": [a.name for a in result.authors],
+            "categories": result.categories,
+            "published": result.published.strftime('%Y-%m-%d'),
+            "pdf_url": result.pdf_url,
+            "arxiv_url": result.entry_id
+        }
+
+    def fetch_category_since(self, category, since, limit=None, client=None): # newest-first, stop paging once we cross since
+        """
+        Page through one category newest first until results cross since (or limit is hit).
+        limit only caps a category's seed run: papers older than the last one fetched
+        are then left out for good, later runs only look back from the watermark.
+
+        Returns:
+            (papers, newest published date fetched or None)
+        """
+        client = client or arxiv.Client(page_size=100, delay_seconds=3)
+        search = arxiv.Search(query=category, max_results=limit,
+                              sort_by=arxiv.SortCriterion.SubmittedDate,
+                              sort_order=arxiv.SortOrder.Descending)
+        papers = []
+        newest = oldest = None
+        for result in client.results(search):
+            if result.published < since:
+                break # older pages are never requested
+            papers.append(self.build_paper(result))
+            if newest is None or result.published > newest:
+                newest = result.published
+            if oldest is None or result.published < oldest:
+                oldest = result.published
+        else:
+            if limit is not None and len(papers) >= limit:
+                print(f"  {category}: seed run capped at {limit} papers, nothing published before "
+                      f"{oldest.strftime('%Y-%m-%d %H:%M')} is fetched (raise max_results to seed further back)")
+        print(f"  {category}: {len(papers)} papers since {since.strftime('%Y-%m-%d %H:%M')}")
+        return papers, newest
+
+    def fetch_recent_papers_incremental(self, db):
+        """
+        Query each category on its own, newest first, and stop as soon as results
+        cross that category's watermark (latest published seen, kept in mongo) minus
+        WATERMARK_LOOKBACK, so late announcements and cross-lists with an older
+        published date are still picked up; the bulk upsert de-duplicates the overlap.
+        Cross-listed papers are de-duplicated on arxiv_id. Call commit_watermarks(db)
+        once the papers are saved.
+        Categories with a watermark are paged all the way back to it; max_results only
+        caps the first run of a category (seeding from the days_back cutoff).
+        Categories run one after another on one client, which keeps arXiv's one
+        request per 3 seconds.
+        """
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=self.days_back)
+        watermarks = db.get_arxiv_watermarks()
+        client = arxiv.Client(page_size=100, delay_seconds=3)
+        papers = {}
+        fetched = 0
+        self.pending_watermarks = {}
+        print(f"incremental fetch for {len(self.categories)} categories")
+        for category in self.categories:
+            name = category.replace("cat:", "")
+            mark = watermarks.get(name)
+            mark = mark.replace(tzinfo=timezone.utc) if mark else None # mongo hands back naive utc
+            since = max(cutoff_date, mark - WATERMARK_LOOKBACK) if mark else cutoff_date
+            category_papers, newest = self.fetch_category_since(category, since, None if mark else self.max_results, client)
+            fetched += len(category_papers)
+            for paper in category_papers:
+                papers.setdefault(paper["arxiv_id"], paper) # cross-listed papers show up once per category
+            newest = max(filter(None, (newest, mark)), default=None) # the lookback never moves it back
+            if newest is not None:
+                self.pending_watermarks[name] = newest.astimezone(timezone.utc).replace(tzinfo=None)
+        print(f"{fetched} results, {len(papers)} unique papers")
+        return list(papers.values())
+
+    def commit_watermarks(self, db): # after a successful save
+        db.update_arxiv_watermarks(self.pending_watermarks)
+        self.pending_watermarks = {}
+
 if __name__ == "__main__":
     collector = ArxivCollector(max_results=10, days_back=365) # set max_results and days_back here
-    papers = collector.fetch_recent_papers()
+    db = MongoDBStorage()
+    papers = collector.fetch_recent_papers_incremental(db)
     print(f"\n{'='*60}")
     print(f"fetched {len(papers)} papers from the last {collector.days_back} days!")
     print(f"{'='*60}")
@@ -67,6 +143,6 @@ if __name__ == "__main__":
         print("\nexample:")
         print(papers[0])
         print(f"\nsaving to MongoDB...")
-        db = MongoDBStorage()
-        db.save_arxiv_papers(papers)
+        db.save_arxiv_papers(papers, bulk=True)
+        collector.commit_watermarks(db)
         db.get_collection_stats()
\ No newline at end of file
@@ -1,19 +1,151 @@
 """
 Historical Data Backfiller
-Backfills 8 weeks of historical snapshots by running collectors
-with backdated timestamps
+Rebuilds weekly snapshots from the documents already stored (replay mode,
+default), or backfills by running the live collectors with backdated
+timestamps (legacy mode, --legacy)
 """
 
-import sys
-from pathlib import Path
+import argparse
 from datetime import datetime, timedelta
-from pymongo import MongoClient
-from periodic_collector import PeriodicDataCollector
+from concurrent.futures import ThreadPoolExecutor
+from mongodb_storage import get_database
+from periodic_collector import (PeriodicDataCollector, SNAPSHOT_SOURCES, SNAPSHOT_IDS_COLLECTION,
+                                build_snapshot_document, save_snapshot, snapshot_window_end)
 import time
 
+WEEK_MS = 7 * 24 * 3600 * 1000
+
+# when each document "happened": publication date where the source has one, first seen otherwise
+EVENT_TIME = {
+    'github': '$scraped_at',
+    'arxiv': {'$dateFromString': {'dateString': '$published', 'onError': '$scraped_at', 'onNull': '$scraped_at'}},
+    'news': {'$dateFromString': {'dateString': '$published_at', 'onError': '$scraped_at', 'onNull': '$scraped_at'}},
+}
+
+
+def bucket_source_by_week(db, source, start, end):
+    """
+    Group a source's documents up to `end` into week buckets counted from `start`,
+    one aggregation result per week, so no result document collects more than a
+    week of ids. Documents older than `start` go into a baseline bucket (-1),
+    read from a cursor since it can be most of the collection.
+    Returns {week index: {'ids': [...], 'titles': [first 5 titles]}}.
+    """
+    collection = db[SNAPSHOT_SOURCES[source]]
+    events = [
+        {'$project': {
+            'title': {'$ifNull': ['$title', '$full_name']},
+            'event': EVENT_TIME[source],
+        }},
+        {'$match': {'event': {'$lte': end}}},
+    ]
+    baseline = {'ids': [], 'titles': []}
+    for doc in collection.aggregate(events + [{'$match': {'event': {'$lt': start}}}, {'$sort': {'_id': 1}}],
+                                    allowDiskUse=True):
+        baseline['ids'].append(doc['_id'])
+        if len(baseline['titles']) < 5:
+            baseline['titles'].append(doc.get('title'))
+    weeks = collection.aggregate(events + [
+        {'$match': {'event': {'$gte': start}}},
+        {'$project': {
+            'title': 1,
+            'week': {'$floor': {'$divide': [{'$subtract': ['$event', start]}, WEEK_MS]}},
+        }},
+        {'$sort': {'_id': 1}},
+        {'$group': {'_id': '$week', 'ids': {'$push': '$_id'}, 'titles': {'$push': '$title'}}},
+        {'$project': {'ids': 1, 'titles': {'$slice': ['$titles', 5]}}},
+    ], allowDiskUse=True)
+    return {-1: baseline, **{int(bucket['_id']): bucket for bucket in weeks}}
+
+
+def replay_backfill(weeks: int = 52, max_workers: int = 8):
+    """
+    Rebuild weekly snapshots from stored timestamps, no network needed.
+    Progress is checkpointed per week, so an interrupted run resumes where it stopped.
+    
+    Args:
+        weeks: Number of weeks of history to rebuild (default 52)
+        max_workers: Threads used to write week snapshots
+    """
+    
+    print("="*80)
+    print(f"HISTORICAL DATA BACKFILLER (replay) - Rebuilding {weeks} weeks of snapshots")
+    print("="*80)
+    
+    db = get_database('gen_eezes')
+    snapshots = db['data_collection_snapshots']
+    checkpoints = db['backfill_checkpoints']
+    
+    # weeks start on monday (utc, like scraped_at), so a rerun in the same week resumes the same run;
+    # the current week closes now, where the next live snapshot window starts
+    end = snapshot_window_end()
+    monday = end.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=end.weekday())
+    start = monday + timedelta(weeks=1) - timedelta(weeks=weeks)
+    run_id = f"{start:%Y-%m-%d}:{weeks}"
+    
+    checkpoint = checkpoints.find_one({'_id': run_id})
+    done = set(checkpoint['completed_weeks']) if checkpoint else set()
+    if checkpoint:
+        print(f"\nResuming backfill {run_id}: {len(done)}/{weeks} weeks already written")
+    else:
+        # only earlier backfills are replaced, live snapshots stay
+        cleared = snapshots.delete_many({'backfill_run': {'$exists': True}}).deleted_count
+        db[SNAPSHOT_IDS_COLLECTION].delete_many({'backfill_run': {'$exists': True}})
+        checkpoints.insert_one({'_id': run_id, 'completed_weeks': [], 'started_at': datetime.utcnow()})
+        print(f"✓ Cleared {cleared} snapshots from earlier backfills")
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(SNAPSHOT_SOURCES)) as pool:
+        buckets = dict(zip(SNAPSHOT_SOURCES, pool.map(lambda source: bucket_source_by_week(db, source, start, end), SNAPSHOT_SOURCES)))
+    print(f"  ✓ Bucketed {len(SNAPSHOT_SOURCES)} sources in {time.perf_counter() - started:.2f}s")
+    
+    # week -1 is the baseline: everything that happened before the first week, so the
+    # replayed deltas add up to the counts (get_corpus_as_of agrees with github_count etc.)
+    all_weeks = range(-1, weeks)
+    totals = {}
+    running = {source: 0 for source in SNAPSHOT_SOURCES}
+    for week in all_weeks:
+        for source, by_week in buckets.items():
+            running[source] += len(by_week[week]['ids']) if week in by_week else 0
+        totals[week] = dict(running)
+    
+    def write_week(week):
+        if week == -1:
+            window_start, window_end = None, start  # like the first live snapshot, open at the start
+        else:
+            window_start = start + timedelta(weeks=week)
+            window_end = min(window_start + timedelta(weeks=1), end)
+        summary, delta = {}, {}
+        for source, by_week in buckets.items():
+            bucket = by_week.get(week, {'ids': [], 'titles': []})
+            summary[source] = [{'id': str(doc_id), 'title': title or ''} for doc_id, title in zip(bucket['ids'], bucket['titles'])]
+            delta[source] = {'count': len(bucket['ids']), 'ids': bucket['ids']}
+        snapshot = build_snapshot_document(window_end, totals[week], summary, delta, window_start, window_end)
+        snapshot['backfill_run'] = run_id
+        save_snapshot(db, snapshot, {'backfill_run': run_id, 'window_start': window_start})
+        checkpoints.update_one({'_id': run_id}, {'$addToSet': {'completed_weeks': week}})
+        return week
+    
+    pending = [week for week in all_weeks if week not in done]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for week in pool.map(write_week, pending):
+            if week == -1:
+                print(f"  [baseline] before {start:%Y-%m-%d}: {sum(totals[week].values())} documents")
+                continue
+            snapshot_date = min(start + timedelta(weeks=week + 1), end)
+            print(f"  [{week + 1}/{weeks}] {snapshot_date.strftime('%Y-%m-%d (Week %W)')}: "
+                  f"{sum(totals[week].values())} documents")
+    
+    checkpoints.update_one({'_id': run_id}, {'$set': {'finished_at': datetime.utcnow()}})
+    
+    print("\n" + "="*80)
+    print(f"BACKFILL COMPLETE ({len(pending)} snapshots written in {time.perf_counter() - started:.2f}s)")
+    print("="*80)
+
 def backfill_historical_data(weeks: int = 8):
     """
     Backfill historical snapshots by running collectors with past dates
+    (legacy mode: every week re-collects the current data over the network)
     
     Args:
         weeks: Number of weeks of historical data to create (default 8)
@@ -24,22 +156,22 @@ def backfill_historical_data(weeks: int = 8):
     print("="*80)
     
     collector = PeriodicDataCollector()
-    mongo_client = MongoClient('localhost', 27017)
-    db = mongo_client['gen_eezes']
+    db = get_database('gen_eezes')
     
     # Clear previous snapshots if starting fresh
     existing_snapshots = db['data_collection_snapshots'].count_documents({})
     print(f"\nExisting snapshots in database: {existing_snapshots}")
     
-    # Auto-clear for backfilling
-    db['data_collection_snapshots'].delete_many({})
-    print("✓ Cleared existing snapshots for backfill")
+    # Auto-clear earlier backfills, live snapshots stay
+    cleared = db['data_collection_snapshots'].delete_many({'backfill_run': {'$exists': True}}).deleted_count
+    db[SNAPSHOT_IDS_COLLECTION].delete_many({'backfill_run': {'$exists': True}})
+    print(f"✓ Cleared {cleared} snapshots from earlier backfills")
     
     print(f"\n📅 Starting backfill from {weeks} weeks ago...")
     print("-"*80)
     
     # Calculate start date
-    start_date = datetime.now() - timedelta(weeks=weeks)
+    start_date = datetime.utcnow() - timedelta(weeks=weeks)
     
     # Generate snapshots for each week
     for week_num in range(weeks):
@@ -57,7 +189,7 @@ def backfill_historical_data(weeks: int = 8):
             # Update the snapshot with the backdated timestamp
             db['data_collection_snapshots'].update_one(
                 {'_id': snapshot['_id']},
-                {'$set': {'timestamp': snapshot_date}}
+                {'$set': {'timestamp': snapshot_date, 'backfill_run': 'legacy'}}
             )
             
             print(f"  ✓ Created snapshot with {snapshot['total_documents']} documents")
@@ -93,4 +225,12 @@ def backfill_historical_data(weeks: int = 8):
 
 
 if __name__ == '__main__':
-    backfill_historical_data(weeks=52)
+    parser = argparse.ArgumentParser(description='Backfill weekly data collection snapshots')
+    parser.add_argument('--weeks', type=int, default=52, help='weeks of history to build')
+    parser.add_argument('--legacy', action='store_true', help='run the live collectors once per week instead of replaying stored data')
+    args = parser.parse_args()
+    
+    if args.legacy:
+        backfill_historical_data(weeks=args.weeks)
+    else:
+        replay_backfill(weeks=args.weeks)
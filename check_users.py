@@ -1,7 +1,6 @@
-from pymongo import MongoClient
+from mongodb_storage import get_database
 
-client = MongoClient('mongodb://localhost:27017/')
-db = client['gen_eezes']
+db = get_database('gen_eezes')
 
 subscribed = list(db['users'].find({'subscribed': True}))
 all_users = list(db['users'].find({}))
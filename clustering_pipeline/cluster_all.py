@@ -3,6 +3,7 @@ Clustering & Topic Modeling Pipeline
 Combines embeddings with clustering algorithms to identify topics and trends
 """
 
+import os
 import sys
 import json
 import numpy as np
@@ -11,12 +12,13 @@ from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "embedding_pipeline"))
 
 from clustering_handler import ClusteringHandler
 from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams
-import pymongo
-from pymongo import MongoClient
+from mongodb_storage import get_mongo_client
+from local_index import LocalVectorIndex
 
 class ClusteringPipeline:
     def __init__(self):
@@ -25,12 +27,16 @@ class ClusteringPipeline:
         print("="*80)
         
         # MongoDB connection
-        self.mongo_client = MongoClient('mongodb://localhost:27017/')
+        self.mongo_client = get_mongo_client()
         self.db = self.mongo_client['gen_eezes']
         
-        # Qdrant connection
-        qdrant_path = Path(__file__).parent.parent / "qdrant_storage"
-        self.qdrant = QdrantClient(path=str(qdrant_path))
+        # Vector store: embedded Qdrant, or the local index (VECTOR_STORE=local), which
+        # can be read while the embedding pipeline or a search process has it open
+        if os.environ.get("VECTOR_STORE", "qdrant") == "local":
+            self.qdrant = LocalVectorIndex(str(Path(__file__).parent.parent / "vector_index"))
+        else:
+            qdrant_path = Path(__file__).parent.parent / "qdrant_storage"
+            self.qdrant = QdrantClient(path=str(qdrant_path))
         
         # Clustering handler
         self.clustering_handler = ClusteringHandler()
@@ -46,11 +52,18 @@ class ClusteringPipeline:
         n_points = collection_info.points_count
         print(f"  Found {n_points} items in {collection_name}")
         
+        if isinstance(self.qdrant, LocalVectorIndex):
+            # the whole matrix in one copy, no paging
+            embeddings, ids, payloads = self.qdrant.export(collection_name)
+            items = [{'id': point_id, 'payload': payload} for point_id, payload in zip(ids, payloads)]
+            print(f"  ✓ Loaded {len(embeddings)} embeddings with shape {embeddings.shape}")
+            return embeddings, items
+        
         embeddings_list = []
         items = []
         
         # Scroll through all points
-        offset = 0
+        offset = None
         batch_size = 100
         
         while True:
@@ -69,11 +82,11 @@ class ClusteringPipeline:
                     'payload': point.payload
                 })
             
-            if next_offset is None or next_offset == 0:
+            if next_offset is None:
                 break
             offset = next_offset
         
-        embeddings = np.array(embeddings_list)
+        embeddings = np.asarray(embeddings_list, dtype=np.float32)
         print(f"  ✓ Loaded {len(embeddings)} embeddings with shape {embeddings.shape}")
         
         return embeddings, items
@@ -7,7 +7,7 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from pymongo import MongoClient
+from mongodb_storage import get_database
 
 
 def verify_clusters():
@@ -17,8 +17,7 @@ def verify_clusters():
     print("="*80)
     
     # Connect to MongoDB
-    mongo_client = MongoClient('mongodb://localhost:27017/')
-    db = mongo_client['gen_eezes']
+    db = get_database('gen_eezes')
     clusters_collection = db['clusters']
     
     # Get all cluster documents
@@ -24,7 +24,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from email_pipeline.retrieval_context import RetrievalContext
 from email_pipeline.newsletter_generator import NewsletterGenerator
 from email_pipeline.email_sender_gmail import GmailAPISender
-from pymongo import MongoClient
+from mongodb_storage import get_mongo_client
 
 logger = logging.getLogger(__name__)
 
@@ -90,7 +90,7 @@ class EmailPipeline:
             raise
         
         try:
-            self.mongo = MongoClient(mongo_uri)
+            self.mongo = get_mongo_client(mongo_uri)
             self.db = self.mongo[db_name]
             logger.info("✓ MongoDB client initialized")
         except Exception as e:
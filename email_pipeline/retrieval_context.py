@@ -5,7 +5,8 @@ Extracts Module 4 temporal analysis data and formats as context for LLM
 
 import sys
 from pathlib import Path
-from pymongo import MongoClient
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from mongodb_storage import get_mongo_client
 from datetime import datetime
 import json
 
@@ -14,7 +15,7 @@ class RetrievalContext:
     
     def __init__(self):
         """Initialize MongoDB connection"""
-        self.mongo_client = MongoClient('localhost', 27017)
+        self.mongo_client = get_mongo_client()
         self.db = self.mongo_client['gen_eezes']
     
     def get_latest_trends(self):
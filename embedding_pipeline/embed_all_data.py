@@ -10,12 +10,132 @@ This script:
 """
 
 from mongodb_storage import MongoDBStorage
-from embedding_handler import EmbeddingHandler
-from qdrant_storage import QdrantStorage
-from typing import List, Tuple
+from embedding_handler import EmbeddingHandler, DEFAULT_EMBEDDING_CACHE_PATH
+from qdrant_storage import QdrantStorage, stable_point_id, content_checksum, payload_checksum, payload_timestamp
+from local_index import LocalVectorIndex, DEFAULT_LOCAL_INDEX_PATH
+from qdrant_client import QdrantClient
+from typing import Callable, Dict, List, Tuple
 import numpy as np
 from datetime import datetime
 import json
+import os
+import queue
+import threading
+
+# field weights for combine_fields (text repetition) or fusion (weighted vector sum)
+FIELD_WEIGHTS = {
+    "github": {
+        "owner": 0.5,
+        "name": 1.5,
+        "description": 2,
+        "readme": 1,
+        "topics": 1
+    },
+    "arxiv": {
+        "title": 2,
+        "abstract": 2,
+        "categories": 0.5
+    },
+    "news": {
+        "title": 3,
+        "url": 0.5,
+        "author": 0.5
+    }
+}
+
+# only the fields combine_fields and the payloads use (readme cut to 500 chars server-side)
+GITHUB_PROJECTION = {
+    "owner": 1, "name": 1, "full_name": 1, "description": 1, "language": 1, "topics": 1,
+    "stars_total": 1, "stars_trending": 1, "repo_url": 1, "created_at": 1, "updated_at": 1,
+    "scraped_at": 1, "readme_text": {"$substrCP": [{"$ifNull": ["$readme_text", ""]}, 0, 500]}
+}
+ARXIV_PROJECTION = {
+    "arxiv_id": 1, "title": 1, "abstract": 1, "authors": 1, "categories": 1,
+    "published": 1, "pdf_url": 1, "arxiv_url": 1, "scraped_at": 1
+}
+NEWS_PROJECTION = {
+    "hackernews_id": 1, "title": 1, "url": 1, "score": 1, "comments": 1, "author": 1,
+    "published_at": 1, "story_type": 1, "scraped_at": 1
+}
+
+def github_entry(repo: Dict) -> Tuple:
+    """(point_id, fields to embed, payload) for one GitHub repo."""
+    fields = {
+        "owner": repo.get("owner", ""),
+        "name": repo.get("name", ""),
+        "description": repo.get("description", ""),
+        "readme": repo.get("readme_text", "")[:500],  # Limit readme length
+        "topics": " ".join(repo.get("topics", []))
+    }
+    payload = {
+        "source": "github",
+        "owner": repo.get("owner", ""),
+        "name": repo.get("name", ""),
+        "full_name": repo.get("full_name", ""),
+        "title": repo.get("full_name", ""),
+        "description": repo.get("description", ""),
+        "language": repo.get("language", ""),
+        "topics": list(repo.get("topics", [])),
+        "stars_total": repo.get("stars_total", 0),
+        "stars_trending": str(repo.get("stars_trending", "0")).rstrip("+"),
+        "repo_url": repo.get("repo_url", ""),
+        "created_at": repo.get("created_at", ""),
+        "updated_at": repo.get("updated_at", ""),
+        "scraped_at": repo.get("scraped_at", "").isoformat() if repo.get("scraped_at") else "",
+        "timestamp": payload_timestamp(repo.get("scraped_at"))  # when it was trending
+    }
+    # Stable point ID from the repo's full name
+    point_id = stable_point_id("github", repo.get("full_name") or repo["_id"])
+    return point_id, fields, payload
+
+
+def arxiv_entry(paper: Dict) -> Tuple:
+    """(point_id, fields to embed, payload) for one arXiv paper."""
+    fields = {
+        "title": paper.get("title", ""),
+        "abstract": paper.get("abstract", ""),
+        "categories": " ".join(paper.get("categories", []))
+    }
+    payload = {
+        "source": "arxiv",
+        "arxiv_id": paper.get("arxiv_id", ""),
+        "title": paper.get("title", ""),
+        "abstract": paper.get("abstract", ""),
+        "authors": json.dumps(paper.get("authors", [])),
+        "categories": list(paper.get("categories", [])),
+        "published": paper.get("published", ""),
+        "pdf_url": paper.get("pdf_url", ""),
+        "arxiv_url": paper.get("arxiv_url", ""),
+        "scraped_at": paper.get("scraped_at", "").isoformat() if paper.get("scraped_at") else "",
+        "timestamp": payload_timestamp(paper.get("published"), paper.get("scraped_at"))
+    }
+    point_id = stable_point_id("arxiv", paper.get("arxiv_id") or paper["_id"])
+    return point_id, fields, payload
+
+
+def news_entry(news: Dict) -> Tuple:
+    """(point_id, fields to embed, payload) for one news item."""
+    fields = {
+        "title": news.get("title", ""),
+        "url": news.get("url", ""),
+        "author": news.get("author", "")
+    }
+    payload = {
+        "source": "news",
+        "hackernews_id": news.get("hackernews_id", 0),
+        "title": news.get("title", ""),
+        "url": news.get("url", ""),
+        "score": news.get("score", 0),
+        "comments": news.get("comments", 0),
+        "author": news.get("author", ""),
+        "published_at": news.get("published_at", ""),
+        "story_type": news.get("story_type", ""),
+        "scraped_at": news.get("scraped_at", "").isoformat() if news.get("scraped_at") else "",
+        "timestamp": payload_timestamp(news.get("published_at"), news.get("scraped_at"))
+    }
+    point_id = stable_point_id("news", news.get("hackernews_id") or news["_id"])
+    return point_id, fields, payload
+
 
 class EmbeddingPipeline:
     """
@@ -24,14 +144,43 @@ class EmbeddingPipeline:
     
     def __init__(self, mongodb_db_name: str = "gen_eezes",
                  qdrant_path: str = "./qdrant_storage",
-                 embedder_model: str = "all-MiniLM-L6-v2"):
+                 embedder_model: str = "all-MiniLM-L6-v2",
+                 processes: int = 0,
+                 backend: str = "torch",
+                 stream: bool = True,
+                 stream_batch_size: int = 256,
+                 queue_depth: int = 4,
+                 fusion: bool = False,
+                 vector_config: Dict = None,
+                 vector_store: str = "qdrant",
+                 local_index_path: str = DEFAULT_LOCAL_INDEX_PATH,
+                 cache_path: str = DEFAULT_EMBEDDING_CACHE_PATH,
+                 cache_dtype: str = "float32"):
         """
         Initialize the embedding pipeline.
         
         Args:
             mongodb_db_name: MongoDB database name
-            qdrant_path: Path for Qdrant local storage
+            qdrant_path: Path for Qdrant local storage (None for in-memory)
             embedder_model: Name of the embedding model to use
+            processes: Encode with this many worker processes (0 = in-process),
+                       the pool is shared by all three sources
+            backend: EmbeddingHandler backend ("torch", "onnx", "onnx-int8")
+            stream: Read, encode and upsert in overlapping threads with bounded
+                    queues (memory stays at a few batches) instead of loading
+                    each collection into memory first
+            stream_batch_size: Documents per batch in streaming mode
+            queue_depth: Batches buffered between streaming stages
+            fusion: Embed each field separately and fuse the field vectors with
+                    FIELD_WEIGHTS instead of embedding one repeated-text string
+            vector_config: QdrantStorage settings per source (precision, collection profile), e.g.
+                           {"github": {"datatype": "float16", "dims": 256, "profile": "compact"}}
+                           (default: full float32, "default" profile)
+            vector_store: "qdrant", or "local" for the memory-mapped LocalVectorIndex
+                          in local_index_path (qdrant_path is then unused)
+            local_index_path: Directory of the local index
+            cache_path: sqlite file of the embedding cache (None disables it)
+            cache_dtype: Precision of cached vectors, "float32" or "float16"
         """
         print("\n" + "="*80)
         print("INITIALIZING EMBEDDING PIPELINE")
@@ -43,25 +192,40 @@ class EmbeddingPipeline:
         
         # Initialize embedding handler
         print("\n2. loading embedding model...")
-        self.embedder = EmbeddingHandler(model_name=embedder_model)
+        self.embedder = EmbeddingHandler(model_name=embedder_model, backend=backend, cache_path=cache_path,
+                                         cache_dtype=cache_dtype)
+        if processes:
+            self.embedder.start_pool(processes)
         embedding_dim = self.embedder.embedding_dim
         
         # Initialize Qdrant storage (3 collections, one per data source)
+        # One client shared by all collections, so the on-disk storage isn't locked twice
+        vector_config = vector_config or {}
         print("\n3. initializing qdrant collections...")
+        if vector_store == "local":
+            # readable by clustering / search in other processes while we write
+            self.qdrant_client = LocalVectorIndex(local_index_path)
+        elif qdrant_path:
+            self.qdrant_client = QdrantClient(path=qdrant_path, prefer_grpc=False)
+        else:
+            self.qdrant_client = QdrantClient(":memory:")
         self.qdrant_github = QdrantStorage(
             collection_name="github_embeddings",
             vector_size=embedding_dim,
-            use_memory=True  # Use memory to avoid file locking issues during batch insertion
+            client=self.qdrant_client,
+            **vector_config.get("github", {})
         )
         self.qdrant_arxiv = QdrantStorage(
             collection_name="arxiv_embeddings",
             vector_size=embedding_dim,
-            use_memory=True
+            client=self.qdrant_client,
+            **vector_config.get("arxiv", {})
         )
         self.qdrant_news = QdrantStorage(
             collection_name="news_embeddings",
             vector_size=embedding_dim,
-            use_memory=True
+            client=self.qdrant_client,
+            **vector_config.get("news", {})
         )
         
         self.processed_count = {
@@ -69,6 +233,11 @@ class EmbeddingPipeline:
             "arxiv": 0,
             "news": 0
         }
+        self.sync_stats = {}
+        self.stream = stream
+        self.stream_batch_size = stream_batch_size
+        self.queue_depth = queue_depth
+        self.fusion = fusion
     
     def embed_github_repos(self) -> int:
         """
@@ -81,62 +250,8 @@ class EmbeddingPipeline:
         print("PROCESSING GITHUB REPOS")
         print("-"*80)
         
-        repos = list(self.db.github_collection.find())
-        print(f"found {len(repos)} repos in mongodb")
-        
-        if not repos:
-            print("no repos to process")
-            return 0
-        
-        points = []
-        for idx, repo in enumerate(repos, 1):
-            # Combine relevant text fields
-            combined_text = self.embedder.combine_fields({
-                "owner": repo.get("owner", ""),
-                "name": repo.get("name", ""),
-                "description": repo.get("description", ""),
-                "readme": repo.get("readme_text", "")[:500],  # Limit readme length
-                "topics": " ".join(repo.get("topics", []))
-            }, weights={
-                "owner": 0.5,
-                "name": 1.5,
-                "description": 2,
-                "readme": 1,
-                "topics": 1
-            })
-            
-            # Generate embedding
-            embedding = self.embedder.embed_text(combined_text)
-            
-            # Prepare payload (metadata)
-            payload = {
-                "source": "github",
-                "owner": repo.get("owner", ""),
-                "name": repo.get("name", ""),
-                "full_name": repo.get("full_name", ""),
-                "title": repo.get("full_name", ""),
-                "description": repo.get("description", ""),
-                "language": repo.get("language", ""),
-                "topics": json.dumps(repo.get("topics", [])),
-                "stars_total": repo.get("stars_total", 0),
-                "stars_trending": str(repo.get("stars_trending", "0")).rstrip("+"),
-                "repo_url": repo.get("repo_url", ""),
-                "created_at": repo.get("created_at", ""),
-                "updated_at": repo.get("updated_at", ""),
-                "scraped_at": repo.get("scraped_at", "").isoformat() if repo.get("scraped_at") else ""
-            }
-            
-            # Use MongoDB ObjectId as Qdrant point ID (convert to int)
-            point_id = hash(str(repo["_id"])) % (2**31)
-            
-            points.append((point_id, embedding, payload))
-            
-            if idx % 5 == 0:
-                print(f"  processed {idx}/{len(repos)} repos...")
-        
-        # Batch insert to Qdrant
-        added = self.qdrant_github.add_points_batch(points)
-        print(f"✓ added {added} embeddings to qdrant")
+        added = self._embed_source("github", self.db.github_collection, self.qdrant_github,
+                                   self._github_entry, GITHUB_PROJECTION, "repos")
         
         self.processed_count["github"] = added
         return added
@@ -152,52 +267,8 @@ class EmbeddingPipeline:
         print("PROCESSING ARXIV PAPERS")
         print("-"*80)
         
-        papers = list(self.db.arxiv_collection.find())
-        print(f"found {len(papers)} papers in mongodb")
-        
-        if not papers:
-            print("no papers to process")
-            return 0
-        
-        points = []
-        for idx, paper in enumerate(papers, 1):
-            # Combine relevant text fields
-            combined_text = self.embedder.combine_fields({
-                "title": paper.get("title", ""),
-                "abstract": paper.get("abstract", ""),
-                "categories": " ".join(paper.get("categories", []))
-            }, weights={
-                "title": 2,
-                "abstract": 2,
-                "categories": 0.5
-            })
-            
-            # Generate embedding
-            embedding = self.embedder.embed_text(combined_text)
-            
-            # Prepare payload
-            payload = {
-                "source": "arxiv",
-                "arxiv_id": paper.get("arxiv_id", ""),
-                "title": paper.get("title", ""),
-                "abstract": paper.get("abstract", ""),
-                "authors": json.dumps(paper.get("authors", [])),
-                "categories": json.dumps(paper.get("categories", [])),
-                "published": paper.get("published", ""),
-                "pdf_url": paper.get("pdf_url", ""),
-                "arxiv_url": paper.get("arxiv_url", ""),
-                "scraped_at": paper.get("scraped_at", "").isoformat() if paper.get("scraped_at") else ""
-            }
-            
-            point_id = hash(str(paper["_id"])) % (2**31)
-            points.append((point_id, embedding, payload))
-            
-            if idx % 5 == 0:
-                print(f"  processed {idx}/{len(papers)} papers...")
-        
-        # Batch insert to Qdrant
-        added = self.qdrant_arxiv.add_points_batch(points)
-        print(f"✓ added {added} embeddings to qdrant")
+        added = self._embed_source("arxiv", self.db.arxiv_collection, self.qdrant_arxiv,
+                                   self._arxiv_entry, ARXIV_PROJECTION, "papers")
         
         self.processed_count["arxiv"] = added
         return added
@@ -213,56 +284,233 @@ class EmbeddingPipeline:
         print("PROCESSING TECH NEWS")
         print("-"*80)
         
-        news_items = list(self.db.news_collection.find())
-        print(f"found {len(news_items)} news items in mongodb")
-        
-        if not news_items:
-            print("no news to process")
-            return 0
-        
-        points = []
-        for idx, news in enumerate(news_items, 1):
-            # Combine relevant text fields
-            combined_text = self.embedder.combine_fields({
-                "title": news.get("title", ""),
-                "url": news.get("url", ""),
-                "author": news.get("author", "")
-            }, weights={
-                "title": 3,
-                "url": 0.5,
-                "author": 0.5
-            })
-            
-            # Generate embedding
-            embedding = self.embedder.embed_text(combined_text)
-            
-            # Prepare payload
-            payload = {
-                "source": "news",
-                "hackernews_id": news.get("hackernews_id", 0),
-                "title": news.get("title", ""),
-                "url": news.get("url", ""),
-                "score": news.get("score", 0),
-                "comments": news.get("comments", 0),
-                "author": news.get("author", ""),
-                "published_at": news.get("published_at", ""),
-                "story_type": news.get("story_type", ""),
-                "scraped_at": news.get("scraped_at", "").isoformat() if news.get("scraped_at") else ""
-            }
-            
-            point_id = hash(str(news["_id"])) % (2**31)
-            points.append((point_id, embedding, payload))
-            
-            if idx % 5 == 0:
-                print(f"  processed {idx}/{len(news_items)} news items...")
-        
-        # Batch insert to Qdrant
-        added = self.qdrant_news.add_points_batch(points)
-        print(f"✓ added {added} embeddings to qdrant")
+        added = self._embed_source("news", self.db.news_collection, self.qdrant_news,
+                                   self._news_entry, NEWS_PROJECTION, "news items")
         
         self.processed_count["news"] = added
         return added
     
+    def _document(self, source: str, fields: Dict):
+        """What gets embedded for a document: the fields themselves in fusion mode, one combined text otherwise."""
+        if self.fusion:
+            return fields
+        return self.embedder.combine_fields(fields, weights=FIELD_WEIGHTS[source])
+    
+    def _embed_documents(self, source: str, documents: List) -> np.ndarray:
+        if self.fusion:
+            return self.embedder.embed_fields_batch(documents, weights=FIELD_WEIGHTS[source])
+        return self.embedder.embed_batch(documents)
+    
+    def _embedding_settings(self, source: str, qdrant: QdrantStorage) -> Dict:
+        """Everything besides the content that determines a stored vector (part of its checksum)."""
+        return {
+            "model": self.embedder.cache_key,  # model + backend
+            "fusion": self.fusion,
+            "weights": FIELD_WEIGHTS[source],
+            "dims": qdrant.vector_size,
+            "datatype": qdrant.datatype
+        }
+    
+    @staticmethod
+    def _sync_status(stored: Dict, point_id, content, payload: Dict, settings: Dict) -> str:
+        """
+        Stamp the checksums on `payload` and compare them with the stored ones:
+        "new" / "changed" need an embedding, "metadata" only a payload update.
+        """
+        payload["payload_checksum"] = payload_checksum(payload)
+        payload["checksum"] = content_checksum(content, settings)
+        if point_id not in stored:
+            return "new"
+        checksum, metadata = stored[point_id]
+        if checksum != payload["checksum"]:
+            return "changed"
+        return "unchanged" if metadata == payload["payload_checksum"] else "metadata"
+    
+    def _github_entry(self, repo: Dict) -> Tuple:
+        """Build (point_id, combined_text, payload) for one GitHub repo."""
+        point_id, fields, payload = github_entry(repo)
+        return point_id, self._document("github", fields), payload
+    
+    def _arxiv_entry(self, paper: Dict) -> Tuple:
+        """Build (point_id, combined_text, payload) for one arXiv paper."""
+        point_id, fields, payload = arxiv_entry(paper)
+        return point_id, self._document("arxiv", fields), payload
+    
+    def _news_entry(self, news: Dict) -> Tuple:
+        """Build (point_id, combined_text, payload) for one news item."""
+        point_id, fields, payload = news_entry(news)
+        return point_id, self._document("news", fields), payload
+    
+    def _embed_source(self, source: str, collection, qdrant: QdrantStorage,
+                      build_entry: Callable, projection: Dict, noun: str) -> int:
+        """Sync one source, streaming or from a fully loaded collection."""
+        if self.stream:
+            return self._stream_source(source, collection, qdrant, build_entry, projection, noun)
+        
+        docs = list(collection.find({}, projection))
+        print(f"found {len(docs)} {noun} in mongodb")
+        
+        # even with no documents left, their points still have to be deleted
+        return self._sync_points(source, qdrant, [build_entry(doc) for doc in docs])
+    
+    def _stream_source(self, source: str, collection, qdrant: QdrantStorage,
+                       build_entry: Callable, projection: Dict, noun: str) -> int:
+        """
+        Streaming incremental sync: cursor -> encode -> upsert, one thread per
+        stage with bounded queues between them. Only new or changed documents
+        are queued for encoding; points of removed documents are deleted at the end.
+        
+        Returns:
+            Number of points embedded and upserted
+        """
+        stored = qdrant.get_checksums()
+        settings = self._embedding_settings(source, qdrant)
+        seen = set()
+        stats = {"new": 0, "changed": 0, "metadata": 0, "unchanged": 0, "deleted": 0}
+        added = [0]
+        to_encode = queue.Queue(maxsize=self.queue_depth)
+        to_write = queue.Queue(maxsize=self.queue_depth)
+        stop = threading.Event()
+        errors = []
+        
+        def put(q, item):  # gives up once another stage has failed
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    continue
+        
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+            return None
+        
+        def read():
+            batch, metadata = [], []
+            for doc in collection.find({}, projection, batch_size=self.stream_batch_size):
+                point_id, text, payload = build_entry(doc)
+                seen.add(point_id)
+                status = self._sync_status(stored, point_id, text, payload, settings)
+                stats[status] += 1
+                if status == "metadata":
+                    # payload-only updates skip the encoder
+                    metadata.append((point_id, payload))
+                    if len(metadata) >= self.stream_batch_size:
+                        put(to_write, ([point_id for point_id, _ in metadata], None,
+                                       [payload for _, payload in metadata]))
+                        metadata = []
+                elif status != "unchanged":
+                    batch.append((point_id, text, payload))
+                    if len(batch) >= self.stream_batch_size:
+                        put(to_encode, batch)
+                        batch = []
+            if batch:
+                put(to_encode, batch)
+            if metadata:
+                # still ahead of the encoder's end marker, which follows ours
+                put(to_write, ([point_id for point_id, _ in metadata], None, [payload for _, payload in metadata]))
+        
+        def encode():
+            while (batch := get(to_encode)) is not None:
+                embeddings = self._embed_documents(source, [text for _, text, _ in batch])
+                put(to_write, ([point_id for point_id, _, _ in batch], embeddings,
+                               [payload for _, _, payload in batch]))
+        
+        def write():
+            while (points := get(to_write)) is not None:
+                ids, embeddings, payloads = points
+                if embeddings is None:
+                    qdrant.update_payloads(ids, payloads)
+                    continue
+                added[0] += qdrant.upsert_bulk(ids, embeddings, payloads)
+                print(f"  upserted {added[0]} {noun} so far...")
+        
+        def stage(work, downstream):
+            try:
+                work()
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                if downstream is not None:
+                    put(downstream, None)
+        
+        threads = [
+            threading.Thread(target=stage, args=(read, to_encode), name=f"{source}-read"),
+            threading.Thread(target=stage, args=(encode, to_write), name=f"{source}-encode"),
+            threading.Thread(target=stage, args=(write, None), name=f"{source}-write"),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            # don't delete anything after a partial read
+            raise errors[0]
+        
+        stale = set(stored) - seen
+        stats["deleted"] = len(stale)
+        self.sync_stats[source] = stats
+        print(f"  sync: {stats}")
+        if stale:
+            qdrant.delete_points(list(stale))
+            print(f"✓ deleted {len(stale)} embeddings of removed documents")
+        print(f"✓ upserted {added[0]} embeddings to qdrant")
+        
+        return added[0]
+    
+    def _sync_points(self, source: str, qdrant: QdrantStorage, entries: List[Tuple]) -> int:
+        """
+        Incremental sync of one source: embed and upsert only documents that are
+        new or whose content / embedding settings changed, update the payload of
+        documents whose metadata alone changed, delete points whose documents are gone.
+        
+        Args:
+            source: Source type ("github", "arxiv", "news")
+            qdrant: QdrantStorage for that source
+            entries: List of tuples (point_id, combined_text, payload)
+            
+        Returns:
+            Number of points embedded and upserted
+        """
+        stored = qdrant.get_checksums()
+        settings = self._embedding_settings(source, qdrant)
+        stats = {"new": 0, "changed": 0, "metadata": 0, "unchanged": 0, "deleted": 0}
+        changed, metadata = [], []
+        for point_id, text, payload in entries:
+            status = self._sync_status(stored, point_id, text, payload, settings)
+            stats[status] += 1
+            if status == "metadata":
+                metadata.append((point_id, payload))
+            elif status != "unchanged":
+                changed.append((point_id, text, payload))
+        stale = set(stored) - {point_id for point_id, _, _ in entries}
+        stats["deleted"] = len(stale)
+        self.sync_stats[source] = stats
+        print(f"  sync: {stats}")
+        
+        added = 0
+        if changed:
+            # Generate embeddings in length-sorted batches
+            print(f"  embedding {len(changed)} new/changed documents in batches...")
+            embeddings = self._embed_documents(source, [text for _, text, _ in changed])
+            added = qdrant.upsert_bulk([point_id for point_id, _, _ in changed], embeddings,
+                                       [payload for _, _, payload in changed])
+            print(f"✓ upserted {added} embeddings to qdrant")
+        if metadata:
+            updated = qdrant.update_payloads([point_id for point_id, _ in metadata],
+                                             [payload for _, payload in metadata])
+            print(f"✓ updated the payload of {updated} embeddings")
+        if stale:
+            qdrant.delete_points(list(stale))
+            print(f"✓ deleted {len(stale)} embeddings of removed documents")
+        
+        return added
+    
     def process_all(self) -> dict:
         """
         Process all data sources (GitHub, arXiv, Tech News).
@@ -276,9 +524,12 @@ class EmbeddingPipeline:
         
         start_time = datetime.now()
         
-        self.embed_github_repos()
-        self.embed_arxiv_papers()
-        self.embed_tech_news()
+        try:
+            self.embed_github_repos()
+            self.embed_arxiv_papers()
+            self.embed_tech_news()
+        finally:
+            self.embedder.stop_pool()
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -295,7 +546,7 @@ class EmbeddingPipeline:
         print("="*80)
         
         print("\n📊 STATISTICS:")
-        print(f"\nprocessed documents:")
+        print(f"\nembedded documents (new or changed):")
         print(f"  github repos:    {self.processed_count['github']} ✓")
         print(f"  arxiv papers:    {self.processed_count['arxiv']} ✓")
         print(f"  tech news:       {self.processed_count['news']} ✓")
@@ -321,6 +572,26 @@ class EmbeddingPipeline:
         print("="*80 + "\n")
 
 
+def pipeline_from_env(**overrides) -> EmbeddingPipeline:
+    """
+    EmbeddingPipeline configured from the EMBED_* / VECTOR_STORE environment
+    variables (shared by this script and embed_all.py).
+    """
+    vector_config = json.loads(os.environ.get("EMBED_VECTOR_CONFIG", "{}"))
+    if os.environ.get("EMBED_COLLECTION_PROFILE"):
+        for source in ("github", "arxiv", "news"):
+            vector_config.setdefault(source, {}).setdefault("profile", os.environ["EMBED_COLLECTION_PROFILE"])
+    settings = {
+        "processes": int(os.environ.get("EMBED_PROCESSES", "0")),
+        "backend": os.environ.get("EMBED_BACKEND", "torch"),
+        "fusion": os.environ.get("EMBED_FUSION", "0") == "1",
+        "vector_config": vector_config,
+        "vector_store": os.environ.get("VECTOR_STORE", "qdrant"),
+        "cache_dtype": os.environ.get("EMBED_CACHE_DTYPE", "float32"),
+    }
+    return EmbeddingPipeline(**{**settings, **overrides})
+
+
 if __name__ == "__main__":
-    pipeline = EmbeddingPipeline()
+    pipeline = pipeline_from_env()
     stats = pipeline.process_all()
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+DEFAULT_EMBEDDING_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "embeddings.sqlite")
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache keyed by sha256(model name + text).
+    Vectors are stored as float32 (or float16) blobs in sqlite; when the cache
+    grows past `max_entries` the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_EMBEDDING_CACHE_PATH, max_entries: int = 250000,
+                 dtype: str = "float32"):
+        """
+        Args:
+            path: sqlite file for the cache (":memory:" for a throwaway cache)
+            max_entries: number of vectors kept before LRU eviction (384 dims ~ 1.5KB each)
+            dtype: stored precision, "float32" or "float16"; lookups always return float32
+        """
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"unsupported cache dtype: {dtype}")
+        self.dtype = np.dtype(dtype)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        row = self.conn.execute("SELECT value FROM settings WHERE name = 'dtype'").fetchone()
+        if row and row[0] != dtype:  # blobs of the other precision can't be read back
+            print(f"embedding cache precision changed ({row[0]} -> {dtype}), clearing it")
+            self.conn.execute("DELETE FROM embeddings")
+        self.conn.execute("INSERT OR REPLACE INTO settings (name, value) VALUES ('dtype', ?)", (dtype,))
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def key(self, model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached vectors.
+
+        Returns:
+            Dictionary of position in `texts` -> float32 vector, for the hits only
+        """
+        keys = [self.key(model_name, t) for t in texts]
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), 500):  # stay under sqlite's variable limit
+                chunk = keys[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self.conn.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+                self.conn.commit()
+        hits = {i: np.frombuffer(found[k], dtype=self.dtype).astype(np.float32) for i, k in enumerate(keys) if k in found}
+        self.stats["hits"] += len(hits)
+        self.stats["misses"] += len(texts) - len(hits)
+        return hits
+
+    def put_many(self, model_name: str, texts: List[str], vectors: np.ndarray):
+        now = time.time()
+        rows = [(self.key(model_name, t), np.asarray(v, dtype=self.dtype).tobytes(), now)
+                for t, v in zip(texts, vectors)]
+        with self.lock:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows)
+            self.size += self.conn.total_changes - before
+            if self.size > self.max_entries:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):  # drop the least recently used tenth below the limit
+        target = int(self.max_entries * 0.9)
+        excess = self.size - target
+        self.conn.execute(
+            "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (excess,)
+        )
+        self.stats["evicted"] += excess
+        self.size = target
+
+    def report(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_ratio": self.stats["hits"] / lookups if lookups else 0.0, "entries": self.size}
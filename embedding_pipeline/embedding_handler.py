@@ -1,27 +1,101 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+import os
+import threading
 from typing import List, Dict, Union
 
+try:
+    from .embedding_cache import EmbeddingCache, DEFAULT_EMBEDDING_CACHE_PATH
+    from .onnx_backend import OnnxEncoder
+except ImportError:  # run from inside embedding_pipeline/
+    from embedding_cache import EmbeddingCache, DEFAULT_EMBEDDING_CACHE_PATH
+    from onnx_backend import OnnxEncoder
+
+try:
+    import psutil
+except ImportError:  # optional, falls back to os.sysconf
+    psutil = None
+
+
+def available_memory_bytes(default: int = 2 * 1024**3) -> int:
+    """Free RAM in bytes (psutil if installed, otherwise sysconf, otherwise `default`)."""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return default
+
+# loaded models shared by every EmbeddingHandler in the process, keyed by (model_name, backend)
+_shared_models = {}
+_shared_models_lock = threading.Lock()
+
+
+def get_shared_model(model_name: str = "all-MiniLM-L6-v2", backend: str = "torch"):
+    """
+    Load a model once per process. sentence_transformers / torch are only
+    imported here, so importing this module stays cheap.
+    """
+    key = (model_name, backend)
+    with _shared_models_lock:
+        if key not in _shared_models:
+            print(f"loading embedding model: {model_name} ({backend})...")
+            if backend == "torch":
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name)
+            else:
+                model = OnnxEncoder(model_name, quantize=backend == "onnx-int8")
+            _shared_models[key] = model
+            print(f"model loaded successfully. embedding dimension: {model.get_sentence_embedding_dimension()}")
+        return _shared_models[key]
+
+
 class EmbeddingHandler:
     """
     Handles embedding generation for various text inputs using Sentence Transformers.
     Uses all-MiniLM-L6-v2 model (384 dimensions) for fast, efficient embeddings.
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    max_batch_size = 1024  # upper bound for memory-sized batches of very short texts
+    max_field_cache = 50000  # short field vectors kept in memory by embed_fields_batch
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2",
+                 cache_path: str = DEFAULT_EMBEDDING_CACHE_PATH,
+                 backend: str = "torch",
+                 cache_dtype: str = "float32"):
         """
-        Initialize the embedding handler with a pre-trained model.
+        Initialize the embedding handler. The model itself is loaded on first
+        use and shared with every other handler for the same model in this process.
         
         Args:
             model_name: Name of the Sentence Transformers model to use
                        - all-MiniLM-L6-v2 (384 dims, fast, recommended)
                        - all-mpnet-base-v2 (768 dims, higher quality)
                        - text-embedding-3-large (3072 dims, requires API)
+            cache_path: sqlite file for the embedding cache used by embed_batch
+                        (None disables caching)
+            backend: "torch" (SentenceTransformer), "onnx" or "onnx-int8"
+                     (onnxruntime, exported once and cached, see onnx_backend.py)
+            cache_dtype: Precision of cached vectors, "float32" or "float16" (half the disk)
         """
-        print(f"loading embedding model: {model_name}...")
-        self.model = SentenceTransformer(model_name)
-        self.embedding_dim = self.model.get_sentence_embedding_dimension()
-        print(f"model loaded successfully. embedding dimension: {self.embedding_dim}")
+        if backend not in ("torch", "onnx", "onnx-int8"):
+            raise ValueError(f"unknown embedding backend: {backend}")
+        self.model_name = model_name
+        self.backend = backend
+        # vectors differ slightly between backends, so they're cached separately
+        self.cache_key = model_name if backend == "torch" else f"{model_name}:{backend}"
+        self.cache = EmbeddingCache(cache_path, dtype=cache_dtype) if cache_path else None
+        self.pool = None  # multi-process pool, see start_pool()
+        self.pool_size = 0
+        self.field_cache = {}  # short field text -> vector, for embed_fields_batch
+    
+    @property
+    def model(self):
+        """The SentenceTransformer (or OnnxEncoder), loaded on first access."""
+        return get_shared_model(self.model_name, self.backend)
+    
+    @property
+    def embedding_dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
     
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -31,38 +105,214 @@ class EmbeddingHandler:
             text: Text to embed
             
         Returns:
-            numpy array of shape (embedding_dim,)
+            float32 numpy array of shape (embedding_dim,)
         """
         if not text or not isinstance(text, str):
-            return np.zeros(self.embedding_dim)
+            return np.zeros(self.embedding_dim, dtype=np.float32)
         
         text = text.strip()
         if len(text) == 0:
-            return np.zeros(self.embedding_dim)
+            return np.zeros(self.embedding_dim, dtype=np.float32)
         
         embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding
+        return embedding.astype(np.float32, copy=False)
     
-    def embed_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    def embed_batch(self, texts: List[str], batch_size: int = None,
+                    memory_fraction: float = 0.25) -> np.ndarray:
         """
         Generate embeddings for multiple texts efficiently.
         
+        Texts are sorted by token length and encoded in buckets of similar length,
+        so short texts aren't padded up to the longest one in their batch. Each
+        bucket's batch size comes from a token budget sized to free memory
+        (short buckets get bigger batches). Texts already in the embedding
+        cache are not encoded again.
+        
         Args:
             texts: List of texts to embed
-            batch_size: Number of texts to process at once
+            batch_size: Fixed number of texts per batch (default: chosen from memory)
+            memory_fraction: Share of free memory the activations may use
             
         Returns:
-            numpy array of shape (len(texts), embedding_dim)
+            float32 numpy array of shape (len(texts), embedding_dim), in input order,
+            with zero vectors for empty texts
         """
-        # Filter out empty texts
         texts = [t.strip() if isinstance(t, str) else "" for t in texts]
+        indices = [i for i, t in enumerate(texts) if t]
+        hits = {}
+        if self.cache is not None and indices:
+            hits = self.cache.get_many(self.cache_key, [texts[i] for i in indices])
+        # a fully cached batch never loads the model, the cached vectors give the dimension
+        dim = len(next(iter(hits.values()))) if hits else self.embedding_dim
+        embeddings = np.zeros((len(texts), dim), dtype=np.float32)
+        if self.cache is not None and indices:
+            for k, vector in hits.items():
+                embeddings[indices[k]] = vector
+            misses = [i for k, i in enumerate(indices) if k not in hits]
+            print(f"  embedding cache: {len(hits)} hits / {len(misses)} misses")
+            indices = misses
+        if not indices:
+            return embeddings
+        
+        lengths = self.token_lengths([texts[i] for i in indices])
+        order = sorted(range(len(indices)), key=lambda k: lengths[k])
+        token_budget = self.token_budget(memory_fraction)
+        
+        if self.pool is not None:
+            self._encode_with_pool(texts, indices, lengths, order, token_budget, batch_size, embeddings)
+        else:
+            self._encode_bucketed(texts, indices, lengths, order, token_budget, batch_size, embeddings)
         
-        if not any(texts):
-            return np.zeros((len(texts), self.embedding_dim))
+        if self.cache is not None:
+            self.cache.put_many(self.cache_key, [texts[i] for i in indices], embeddings[indices])
         
-        embeddings = self.model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
         return embeddings
     
+    def _encode_bucketed(self, texts, indices, lengths, order, token_budget, batch_size, embeddings):
+        """Encode in-process, one length bucket per forward pass."""
+        start = 0
+        while start < len(order):
+            if batch_size:
+                size = batch_size
+            else:
+                # texts are sorted, so the bucket's longest text is its last one
+                size = 1
+                while (start + size < len(order) and size < self.max_batch_size
+                       and (size + 1) * lengths[order[start + size]] <= token_budget):
+                    size += 1
+            bucket = [indices[k] for k in order[start:start + size]]
+            embeddings[bucket] = self.model.encode(
+                [texts[i] for i in bucket], batch_size=len(bucket), convert_to_numpy=True
+            )
+            start += size
+    
+    def start_pool(self, processes: int = None):
+        """
+        Opt-in multi-process encoding: start worker processes that embed_batch
+        splits its inputs across. The pool stays up (reuse it for every source)
+        until stop_pool() is called.
+        
+        Args:
+            processes: Number of worker processes (default: one per CPU core)
+        """
+        if self.pool is not None:
+            return
+        if self.backend != "torch":
+            print("note: the encoding pool only applies to the torch backend, onnxruntime already uses all cores")
+            return
+        processes = processes or os.cpu_count() or 1
+        # one torch thread pool per worker would oversubscribe the cores,
+        # workers read OMP_NUM_THREADS when they import torch
+        previous = os.environ.get("OMP_NUM_THREADS")
+        os.environ["OMP_NUM_THREADS"] = str(max(1, (os.cpu_count() or 1) // processes))
+        try:
+            self.pool = self.model.start_multi_process_pool(target_devices=["cpu"] * processes)
+        finally:
+            if previous is None:
+                del os.environ["OMP_NUM_THREADS"]
+            else:
+                os.environ["OMP_NUM_THREADS"] = previous
+        self.pool_size = processes
+        print(f"started encoding pool with {processes} worker processes")
+    
+    def stop_pool(self):
+        """Stop the worker processes started by start_pool()."""
+        if self.pool is not None:
+            self.model.stop_multi_process_pool(self.pool)
+            self.pool = None
+            self.pool_size = 0
+    
+    def _encode_with_pool(self, texts, indices, lengths, order, token_budget, batch_size, embeddings):
+        """
+        Encode through the worker pool. Texts are sent length-sorted, so each
+        chunk a worker gets holds similar lengths; the pool returns them in order.
+        """
+        if not batch_size:
+            # the memory budget is shared by all workers, size batches for the longest text
+            batch_size = token_budget // (self.pool_size * max(lengths[order[-1]], 1))
+            batch_size = int(min(max(batch_size, 8), self.max_batch_size))
+        sorted_indices = [indices[k] for k in order]
+        chunk_size = max(batch_size, -(-len(sorted_indices) // (self.pool_size * 4)))  # ~4 chunks per worker
+        embeddings[sorted_indices] = self.model.encode_multi_process(
+            [texts[i] for i in sorted_indices], self.pool, batch_size=batch_size, chunk_size=chunk_size
+        )
+    
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Token count per text, capped at the model's max sequence length."""
+        max_len = getattr(self.model, "max_seq_length", None) or 512
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return [min(len(t) // 4 + 2, max_len) for t in texts]  # ~4 chars per token
+        encoded = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_len)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def token_budget(self, memory_fraction: float = 0.25, min_tokens: int = 2048,
+                     max_tokens: int = 131072) -> int:
+        """
+        Tokens per forward pass that fit in `memory_fraction` of free memory.
+        Rough activation cost per token: hidden size x layers x 16 float32 values.
+        """
+        config = getattr(getattr(self.model[0], "auto_model", None), "config", None) if hasattr(self.model, "__getitem__") else None
+        hidden = getattr(config, "hidden_size", self.embedding_dim)
+        layers = getattr(config, "num_hidden_layers", 6)
+        bytes_per_token = hidden * layers * 16 * 4
+        
+        free = available_memory_bytes()
+        if str(getattr(self.model, "device", "cpu")).startswith("cuda"):
+            import torch
+            free = torch.cuda.mem_get_info()[0]
+        
+        return int(min(max(free * memory_fraction // bytes_per_token, min_tokens), max_tokens))
+    
+    def embed_fields_batch(self, documents: List[Dict[str, str]], weights: Dict[str, float] = None,
+                           short_field_chars: int = 64) -> np.ndarray:
+        """
+        Fusion alternative to combine_fields + embed_batch: every field is
+        embedded once on its own and the document vector is the weighted sum of
+        the normalised field vectors, normalised again. Weights act as real
+        multipliers instead of text repetition, so nothing is lost to truncation.
+        
+        Args:
+            documents: List of field_name: text dictionaries (same fields as combine_fields)
+            weights: Optional field_name: weight (default 1.0)
+            short_field_chars: Fields up to this length (names, topics, ...) are
+                               kept in an in-memory cache across calls
+            
+        Returns:
+            float32 numpy array of shape (len(documents), embedding_dim), in input order,
+            zero vectors for documents without any text
+        """
+        weights = weights or {}
+        fused = None  # allocated from the first field vectors, so cached fields don't load the model
+        
+        for field_name in dict.fromkeys(name for doc in documents for name in doc):
+            texts = [doc.get(field_name) for doc in documents]
+            texts = [t.strip() if isinstance(t, str) else "" for t in texts]
+            unique = list(dict.fromkeys(t for t in texts if t))
+            vectors = {t: self.field_cache[t] for t in unique if t in self.field_cache}
+            missing = [t for t in unique if t not in vectors]
+            if missing:
+                for text, vector in zip(missing, self.embed_batch(missing)):
+                    norm = np.linalg.norm(vector)
+                    vectors[text] = vector / norm if norm > 0 else vector
+                    if len(text) <= short_field_chars:
+                        if len(self.field_cache) >= self.max_field_cache:
+                            self.field_cache.pop(next(iter(self.field_cache)))  # oldest first
+                        self.field_cache[text] = vectors[text]
+            
+            weight = weights.get(field_name, 1.0)
+            for i, text in enumerate(texts):
+                if text:
+                    if fused is None:
+                        fused = np.zeros((len(documents), len(vectors[text])), dtype=np.float32)
+                    fused[i] += weight * vectors[text]
+        
+        if fused is None:  # no text in any document
+            return np.zeros((len(documents), self.embedding_dim), dtype=np.float32)
+        norms = np.linalg.norm(fused, axis=1, keepdims=True)
+        np.divide(fused, norms, out=fused, where=norms > 0)
+        return fused
+    
     def combine_fields(self, fields: Dict[str, str], weights: Dict[str, float] = None) -> str:
         """
         Combine multiple text fields for contextual embedding.
@@ -101,6 +351,7 @@ class EmbeddingHandler:
         return {
             "model_name": self.model.modules()[0].auto_model.config.model_type if hasattr(self.model, 'modules') else "unknown",
             "embedding_dimension": self.embedding_dim,
+            "backend": self.backend,
             "max_seq_length": self.model.max_seq_length if hasattr(self.model, 'max_seq_length') else None
         }
 
@@ -0,0 +1,596 @@
+"""
+Local vector index: an in-repo alternative to the embedded QdrantClient(path=...).
+
+Each collection is a directory with
+    vectors.f32      memory-mapped float32 matrix (unit-length rows, cosine = dot product),
+                     vectors.f16 for float16 collections (half the disk and page cache)
+    payloads.sqlite  row -> point id + JSON payload, plus rows in use, capacity, version
+                     and a log of the rows each version changed (WAL mode, so readers never block)
+    meta.json        dimension and datatype
+
+Search is exact: query batches are multiplied against the matrix in row blocks
+and the best rows picked with argpartition, so recall is always 1.0. Several
+processes can read the same index at once (clustering, search, analysis);
+writes take a file lock and commit rows and version in one sqlite transaction,
+readers pick up the rows changed since their version. The class implements the
+part of the QdrantClient API that QdrantStorage uses, so it can be passed
+wherever a client is expected:
+
+    QdrantStorage("github_embeddings", 384, backend="local", path="./vector_index")
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from qdrant_client.models import (Batch, CollectionStatus, Datatype, Distance, Filter, MatchAny,
+                                  MatchExcept, MatchValue, Record, ScoredPoint, SetPayloadOperation,
+                                  VectorParams)
+
+try:
+    import fcntl  # cross-process write lock
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# <repo root>/vector_index, where clustering_pipeline/cluster_all.py reads it
+DEFAULT_LOCAL_INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vector_index")
+
+# rows scored per matrix product, bounds the (queries x rows) score block in memory
+SEARCH_BLOCK_ROWS = 65536
+
+# stored precision -> matrix file; float16 blocks are scored in float32
+VECTOR_FILES = {"float32": "vectors.f32", "float16": "vectors.f16"}
+
+# mutable collection state, kept in the payload database so it commits together with the rows
+STATE_FIELDS = ("rows", "capacity", "version", "log_start")
+
+# versions of changed rows kept for readers to catch up incrementally; older readers reload everything
+CHANGE_LOG_VERSIONS = 256
+
+
+def _lock(lock_file):
+    """Block until this process holds the write lock on `lock_file`."""
+    if fcntl:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return
+    while True:
+        try:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            pass  # LK_LOCK gives up after 10 one-second attempts, keep waiting
+
+
+def _unlock(lock_file):
+    if fcntl:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class LocalCollection:
+    """One collection directory: the vector matrix, its payload sidecar and metadata."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.dtype = np.dtype(meta.get("datatype", "float32"))
+        self.vectors_path = os.path.join(path, VECTOR_FILES[self.dtype.name])
+        # autocommit: reads and writes open their own transactions (see refresh / writing)
+        self.conn = sqlite3.connect(os.path.join(path, "payloads.sqlite"), check_same_thread=False,
+                                    isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value INTEGER)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS changes (version INTEGER, row INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS changes_version ON changes (version)")
+        # indexes written before the state table kept rows / capacity / version in meta.json
+        version = meta.get("version", 0)
+        initial = {"rows": meta.get("rows", 0), "capacity": meta.get("capacity", 0),
+                   "version": version, "log_start": version}
+        self.conn.executemany("INSERT OR IGNORE INTO state (name, value) VALUES (?, ?)", initial.items())
+        self.meta = {"dim": meta["dim"], "datatype": self.dtype.name}
+        self.lock = threading.RLock()
+        self.loaded_version = None
+        self.mask_cache, self.mask_cache_version = {}, None
+        self.refresh()
+
+    @staticmethod
+    def create(path: str, dim: int, datatype: str = "float32") -> "LocalCollection":
+        if datatype not in VECTOR_FILES:
+            raise ValueError(f"the local index stores float32 or float16 vectors, not {datatype}")
+        os.makedirs(path, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(path, "payloads.sqlite"))
+        conn.execute("CREATE TABLE IF NOT EXISTS points (row INTEGER PRIMARY KEY, id TEXT UNIQUE, payload TEXT)")
+        conn.commit()
+        conn.close()
+        open(os.path.join(path, VECTOR_FILES[datatype]), "wb").close()
+        LocalCollection.write_meta(os.path.join(path, "meta.json"), {"dim": dim, "datatype": datatype})
+        return LocalCollection(path)
+
+    @staticmethod
+    def write_meta(meta_path: str, meta: Dict):
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)  # atomic, readers see the old or the new version
+
+    def map_vectors(self, mode: str):
+        dim, capacity = self.meta["dim"], self.meta["capacity"]
+        if not capacity:
+            return np.zeros((0, dim), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode=mode, shape=(capacity, dim))
+
+    def refresh(self):
+        """
+        Pick up versions committed by other processes. The state, change log and
+        payloads are read in one sqlite transaction, so the rows loaded always
+        match the version; only rows changed since the loaded version are re-read
+        (everything, if the change log no longer reaches back that far).
+        """
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                state = dict(self.conn.execute("SELECT name, value FROM state"))
+                if state["version"] == self.loaded_version:
+                    return
+                full = self.loaded_version is None or self.loaded_version < state["log_start"]
+                if full:
+                    changed = []
+                    points = self.conn.execute("SELECT row, id, payload FROM points").fetchall()
+                else:
+                    changed = [row for (row,) in self.conn.execute(
+                        "SELECT DISTINCT row FROM changes WHERE version > ?", (self.loaded_version,))]
+                    points = self.conn.execute(
+                        "SELECT row, id, payload FROM points WHERE row IN "
+                        "(SELECT row FROM changes WHERE version > ?)", (self.loaded_version,)).fetchall()
+            finally:
+                self.conn.execute("COMMIT")
+            
+            remap = full or state["capacity"] != self.meta["capacity"]
+            self.meta.update(state)
+            if remap:
+                self.vectors = self.map_vectors("r")
+            if full:
+                self.ids = np.empty(0, dtype=object)
+                self.payloads = np.empty(0, dtype=object)
+                self.alive = np.zeros(0, dtype=bool)
+                self.row_of = {}
+            self.resize(state["rows"])
+            for row in changed:
+                if self.alive[row]:
+                    if self.row_of.get(self.ids[row]) == row:
+                        del self.row_of[self.ids[row]]
+                    self.alive[row] = False
+                    self.ids[row] = None
+                    self.payloads[row] = None
+            for row, key, payload in points:
+                point_id = json.loads(key)
+                self.ids[row] = point_id
+                self.payloads[row] = json.loads(payload)
+                self.alive[row] = True
+                self.row_of[point_id] = row
+            self.loaded_version = state["version"]
+
+    def resize(self, rows: int):
+        grown = rows - len(self.alive)
+        if grown > 0:
+            self.ids = np.concatenate([self.ids, np.empty(grown, dtype=object)])
+            self.payloads = np.concatenate([self.payloads, np.empty(grown, dtype=object)])
+            self.alive = np.concatenate([self.alive, np.zeros(grown, dtype=bool)])
+
+    @contextmanager
+    def writing(self):
+        """
+        Exclusive writer (threads and processes); readers keep going meanwhile.
+        Yields a list the caller extends with the rows it changed; the payload
+        changes, the change log and the new version commit in one transaction.
+        """
+        with self.lock:
+            with open(os.path.join(self.path, "write.lock"), "w") as lock_file:
+                _lock(lock_file)
+                try:
+                    self.refresh()  # another process may have written since
+                    self.vectors = self.map_vectors("r+")
+                    changed = []
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield changed
+                        # the in-memory arrays were updated in place, no reload needed
+                        version = self.meta["version"] + 1
+                        self.meta["version"] = version
+                        self.meta["log_start"] = max(self.meta["log_start"], version - CHANGE_LOG_VERSIONS)
+                        self.conn.executemany("INSERT INTO changes (version, row) VALUES (?, ?)",
+                                              [(version, int(row)) for row in set(changed)])
+                        self.conn.execute("DELETE FROM changes WHERE version <= ?", (self.meta["log_start"],))
+                        self.conn.executemany("UPDATE state SET value = ? WHERE name = ?",
+                                              [(self.meta[name], name) for name in STATE_FIELDS])
+                        self.conn.execute("COMMIT")
+                        self.loaded_version = version
+                    except BaseException:
+                        self.conn.execute("ROLLBACK")
+                        self.loaded_version = None  # in-memory arrays may be half updated, reload all
+                        raise
+                finally:
+                    if isinstance(self.vectors, np.memmap):
+                        self.vectors.flush()
+                    self.vectors = self.map_vectors("r")
+                    _unlock(lock_file)
+
+    def grow(self, capacity: int):
+        dim = self.meta["dim"]
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        with open(self.vectors_path, "r+b") as f:
+            f.truncate(capacity * dim * self.dtype.itemsize)
+        self.vectors = np.memmap(self.vectors_path, dtype=self.dtype, mode="r+", shape=(capacity, dim))
+        self.meta["capacity"] = capacity
+
+    def upsert(self, ids: List, vectors: np.ndarray, payloads: List[Optional[Dict]]):
+        vectors = normalize(np.asarray(vectors, dtype=np.float32))
+        payloads = [json.dumps(payload or {}, default=str) for payload in payloads]
+        with self.writing() as changed:
+            free = list(np.flatnonzero(~self.alive)[::-1])
+            rows = []
+            for point_id in ids:
+                if point_id in self.row_of:
+                    rows.append(self.row_of[point_id])
+                elif free:
+                    rows.append(int(free.pop()))
+                else:
+                    rows.append(self.meta["rows"])
+                    self.meta["rows"] += 1
+                self.row_of[point_id] = rows[-1]
+            if self.meta["rows"] > self.meta["capacity"]:
+                self.grow(max(self.meta["rows"], self.meta["capacity"] * 2, 1024))
+            rows = np.asarray(rows, dtype=np.int64)
+            self.vectors[rows] = vectors
+            self.vectors.flush()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)",
+                [(int(row), json.dumps(point_id), payload) for row, point_id, payload in zip(rows, ids, payloads)]
+            )
+            changed.extend(rows)
+            
+            self.resize(self.meta["rows"])
+            for row, point_id, payload in zip(rows, ids, payloads):
+                self.ids[row] = point_id
+                self.payloads[row] = json.loads(payload)  # same as a reader sees
+            self.alive[rows] = True
+
+    def set_payloads(self, ids: List, payloads: List[Dict]):
+        """Merge `payloads` into the stored payloads of existing points (vectors untouched)."""
+        with self.writing() as changed:
+            updates = []
+            for point_id, payload in zip(ids, payloads):
+                row = self.row_of.get(point_id)
+                if row is None:
+                    continue
+                merged = json.dumps({**self.payloads[row], **payload}, default=str)
+                updates.append((merged, int(row)))
+                self.payloads[row] = json.loads(merged)  # same as a reader sees
+                changed.append(row)
+            self.conn.executemany("UPDATE points SET payload = ? WHERE row = ?", updates)
+
+    def delete(self, ids: List):
+        with self.writing() as changed:
+            rows = [self.row_of.pop(point_id) for point_id in ids if point_id in self.row_of]
+            if rows:
+                self.vectors[rows] = 0  # row is reused by the next new point
+                self.vectors.flush()
+                self.conn.executemany("DELETE FROM points WHERE row = ?", [(int(row),) for row in rows])
+                changed.extend(rows)
+                self.alive[rows] = False
+                self.ids[rows] = None
+                self.payloads[rows] = None
+
+    def top_k(self, queries: np.ndarray, limit: int, mask: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-`limit` rows per query by cosine similarity.
+
+        Returns:
+            (rows, scores), both (n_queries, k) sorted by descending score; k <= limit
+        """
+        self.refresh()
+        allowed = self.alive if mask is None else self.alive & mask
+        queries = normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        n_rows = len(allowed)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+        for start in range(0, n_rows, SEARCH_BLOCK_ROWS):
+            end = min(start + SEARCH_BLOCK_ROWS, n_rows)
+            block_allowed = allowed[start:end]
+            if not block_allowed.any():
+                continue
+            scores = queries @ self.vectors[start:end].astype(np.float32, copy=False).T
+            scores[:, ~block_allowed] = -np.inf
+            rows = np.broadcast_to(np.arange(start, end), scores.shape)
+            # merge this block's candidates with the best so far
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            k = min(limit, scores.shape[1])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(rows, top, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+        k = min(limit, int(allowed.sum()))
+        return best_rows[:, :k], best_scores[:, :k]
+
+    def filter_mask(self, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        if query_filter is None:
+            return None
+        self.refresh()
+        # payloads are scanned once per filter and index version, repeated filters reuse the mask
+        key = query_filter.model_dump_json()
+        if self.mask_cache_version != self.loaded_version:
+            self.mask_cache, self.mask_cache_version = {}, self.loaded_version
+        if key not in self.mask_cache:
+            if len(self.mask_cache) >= 64:
+                self.mask_cache.clear()
+            self.mask_cache[key] = np.array([alive and matches(payload, query_filter)
+                                             for alive, payload in zip(self.alive, self.payloads)], dtype=bool)
+        return self.mask_cache[key]
+
+    def close(self):
+        self.vectors = None
+        self.conn.close()
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _as_datetime(value):
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))  # python < 3.11 rejects "Z"
+        except ValueError:
+            return None
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value if isinstance(value, datetime) else None
+
+
+def _condition_matches(payload: Dict, condition) -> bool:
+    if isinstance(condition, Filter):
+        return matches(payload, condition)
+    value = payload
+    for part in condition.key.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    values = value if isinstance(value, list) else [value]
+    if condition.match is not None:
+        match = condition.match
+        if isinstance(match, MatchValue):
+            return match.value in values
+        if isinstance(match, MatchAny):
+            return any(v in match.any for v in values)
+        if isinstance(match, MatchExcept):
+            return any(v not in match.except_ for v in values if v is not None)
+        raise ValueError(f"unsupported match in local index: {type(match).__name__}")
+    if condition.range is not None:
+        bounds = condition.range
+        is_datetime = any(isinstance(b, datetime) for b in (bounds.gt, bounds.gte, bounds.lt, bounds.lte))
+        for v in values:
+            v = _as_datetime(v) if is_datetime else v
+            if v is None or isinstance(v, (bool, str)):
+                continue
+            if ((bounds.gt is None or v > bounds.gt) and (bounds.gte is None or v >= bounds.gte)
+                    and (bounds.lt is None or v < bounds.lt) and (bounds.lte is None or v <= bounds.lte)):
+                return True
+        return False
+    raise ValueError(f"unsupported condition in local index: {condition}")
+
+
+def matches(payload: Dict, query_filter: Filter) -> bool:
+    """Evaluate a Qdrant Filter (must / should / must_not) against one payload."""
+    payload = payload or {}
+    if query_filter.must and not all(_condition_matches(payload, c) for c in query_filter.must):
+        return False
+    if query_filter.must_not and any(_condition_matches(payload, c) for c in query_filter.must_not):
+        return False
+    if query_filter.should and not any(_condition_matches(payload, c) for c in query_filter.should):
+        return False
+    return True
+
+
+def _select_payload(payload: Dict, with_payload):
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    return {key: payload[key] for key in with_payload if key in payload}
+
+
+class LocalVectorIndex:
+    """
+    Directory of LocalCollections behind the QdrantClient methods QdrantStorage
+    calls (create/get/delete collection, upsert, search, query_batch_points,
+    scroll, retrieve, delete, count, batch_update_points for payloads).
+    HNSW / quantization settings are accepted and ignored: search is exact.
+    """
+
+    def __init__(self, path: str = DEFAULT_LOCAL_INDEX_PATH):
+        """
+        Args:
+            path: Directory holding one sub-directory per collection
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.collections = {}
+        self.lock = threading.Lock()
+
+    def _collection(self, name: str) -> LocalCollection:
+        with self.lock:
+            if name not in self.collections:
+                path = os.path.join(self.path, name)
+                if not os.path.exists(os.path.join(path, "meta.json")):
+                    raise ValueError(f"collection {name} not found")
+                self.collections[name] = LocalCollection(path)
+            return self.collections[name]
+
+    def get_collections(self):
+        names = sorted(name for name in os.listdir(self.path)
+                       if os.path.exists(os.path.join(self.path, name, "meta.json")))
+        return SimpleNamespace(collections=[SimpleNamespace(name=name) for name in names])
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self.path, collection_name, "meta.json"))
+
+    def create_collection(self, collection_name: str, vectors_config: VectorParams, **kwargs) -> bool:
+        if vectors_config.distance != Distance.COSINE:
+            raise ValueError("the local index only supports cosine distance")
+        with self.lock:
+            self.collections[collection_name] = LocalCollection.create(
+                os.path.join(self.path, collection_name), vectors_config.size,
+                (vectors_config.datatype or Datatype.FLOAT32).value
+            )
+        return True
+
+    def create_payload_index(self, *args, **kwargs):
+        pass  # filters are evaluated on the in-memory payloads
+
+    def get_collection(self, collection_name: str):
+        collection = self._collection(collection_name)
+        collection.refresh()
+        vectors = VectorParams(size=collection.meta["dim"], distance=Distance.COSINE, datatype=Datatype(collection.meta.get("datatype", "float32")))
+        return SimpleNamespace(
+            status=CollectionStatus.GREEN,
+            points_count=int(collection.alive.sum()),
+            payload_schema={},
+            config=SimpleNamespace(params=SimpleNamespace(vectors=vectors))
+        )
+
+    def count(self, collection_name: str, **kwargs):
+        return SimpleNamespace(count=self.get_collection(collection_name).points_count)
+
+    def delete_collection(self, collection_name: str) -> bool:
+        with self.lock:
+            collection = self.collections.pop(collection_name, None)
+            if collection:
+                collection.close()
+            shutil.rmtree(os.path.join(self.path, collection_name), ignore_errors=True)
+        return True
+
+    def upsert(self, collection_name: str, points, wait: bool = True, **kwargs):
+        if isinstance(points, tuple):  # (ids, (n, d) array, payloads) from QdrantStorage.upsert_bulk
+            ids, vectors, payloads = points
+        elif isinstance(points, Batch):
+            ids, vectors = list(points.ids), points.vectors
+            payloads = points.payloads or [None] * len(ids)
+        else:
+            ids = [p.id for p in points]
+            vectors = [p.vector for p in points]
+            payloads = [p.payload for p in points]
+        if ids:
+            self._collection(collection_name).upsert(ids, vectors, payloads)  # always applied before returning
+
+    def delete(self, collection_name: str, points_selector, **kwargs):
+        self._collection(collection_name).delete(list(points_selector))
+
+    def batch_update_points(self, collection_name: str, update_operations, **kwargs):
+        """SetPayloadOperations only (QdrantStorage.update_payloads), applied as one write."""
+        ids, payloads = [], []
+        for operation in update_operations:
+            if not isinstance(operation, SetPayloadOperation):
+                raise ValueError(f"unsupported update in local index: {type(operation).__name__}")
+            for point_id in operation.set_payload.points:
+                ids.append(point_id)
+                payloads.append(operation.set_payload.payload)
+        if ids:
+            self._collection(collection_name).set_payloads(ids, payloads)
+        return [SimpleNamespace(status="completed") for _ in update_operations]
+
+    def _scored(self, collection: LocalCollection, rows, scores, with_payload, with_vectors, score_threshold):
+        points = []
+        for row, score in zip(rows, scores):
+            if score_threshold is not None and score < score_threshold:
+                break
+            points.append(ScoredPoint(
+                id=collection.ids[row], version=collection.meta["version"], score=float(score),
+                payload=_select_payload(collection.payloads[row], with_payload),
+                vector=collection.vectors[row].tolist() if with_vectors else None
+            ))
+        return points
+
+    def search(self, collection_name: str, query_vector, query_filter: Filter = None, limit: int = 10,
+               score_threshold: float = None, with_payload=True, with_vectors: bool = False, **kwargs):
+        collection = self._collection(collection_name)
+        rows, scores = collection.top_k(query_vector, limit, collection.filter_mask(query_filter))
+        return self._scored(collection, rows[0], scores[0], with_payload, with_vectors, score_threshold)
+
+    def query_batch_points(self, collection_name: str, requests, **kwargs):
+        """All requests sharing a filter are answered with one matrix product."""
+        collection = self._collection(collection_name)
+        responses = [None] * len(requests)
+        groups = {}
+        for i, request in enumerate(requests):
+            key = request.filter.model_dump_json() if request.filter is not None else None
+            groups.setdefault(key, []).append(i)
+        for indices in groups.values():
+            mask = collection.filter_mask(requests[indices[0]].filter)
+            queries = np.asarray([requests[i].query for i in indices], dtype=np.float32)
+            rows, scores = collection.top_k(queries, max(requests[i].limit or 10 for i in indices), mask)
+            for n, i in enumerate(indices):
+                request = requests[i]
+                limit = request.limit or 10
+                responses[i] = SimpleNamespace(points=self._scored(
+                    collection, rows[n][:limit], scores[n][:limit],
+                    request.with_payload if request.with_payload is not None else True,
+                    bool(request.with_vector), request.score_threshold
+                ))
+        return responses
+
+    def scroll(self, collection_name: str, scroll_filter: Filter = None, limit: int = 10, offset=None,
+               with_payload=True, with_vectors: bool = False, **kwargs):
+        """Points in row order; the offset is the next row to read."""
+        collection = self._collection(collection_name)
+        collection.refresh()
+        allowed = collection.alive
+        mask = collection.filter_mask(scroll_filter)
+        if mask is not None:
+            allowed = allowed & mask
+        rows = np.flatnonzero(allowed[offset or 0:]) + (offset or 0)
+        page = rows[:limit]
+        records = [Record(id=collection.ids[row],
+                          payload=_select_payload(collection.payloads[row], with_payload),
+                          vector=collection.vectors[row].tolist() if with_vectors else None)
+                   for row in page]
+        next_offset = int(rows[limit]) if len(rows) > limit else None
+        return records, next_offset
+
+    def retrieve(self, collection_name: str, ids: List, with_payload=True, with_vectors: bool = False, **kwargs):
+        collection = self._collection(collection_name)
+        collection.refresh()
+        return [Record(id=point_id,
+                       payload=_select_payload(collection.payloads[collection.row_of[point_id]], with_payload),
+                       vector=collection.vectors[collection.row_of[point_id]].tolist() if with_vectors else None)
+                for point_id in ids if point_id in collection.row_of]
+
+    def export(self, collection_name: str) -> Tuple[np.ndarray, List, List[Dict]]:
+        """
+        Every live point at once, without paging: (vectors (n, d) float32, ids, payloads).
+        """
+        collection = self._collection(collection_name)
+        collection.refresh()
+        rows = np.flatnonzero(collection.alive)
+        return (np.array(collection.vectors[rows], dtype=np.float32),
+                list(collection.ids[rows]), list(collection.payloads[rows]))
+
+    def close(self):
+        with self.lock:
+            for collection in self.collections.values():
+                collection.close()
+            self.collections = {}
@@ -0,0 +1,167 @@
+"""
+ONNX Runtime backend for EmbeddingHandler (CPU inference without torch).
+
+The SentenceTransformer's transformer is exported once to ONNX (optionally
+dynamically quantised to int8) and cached on disk together with its tokenizer
+and pooling settings. Pooling and normalisation are redone in numpy, so the
+vectors stay compatible with the existing 384-d Qdrant collections:
+
+    backend       cosine vs torch (per document)
+    onnx          >= 0.9999   (same fp32 weights, only kernel differences)
+    onnx-int8     >= 0.98     (int8 weights, typically ~0.99)
+
+tests/benchmark_onnx_backend.py checks both tolerances and compares docs/sec.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Union
+
+import numpy as np
+
+DEFAULT_ONNX_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "onnx")
+
+# minimum cosine similarity to the torch vectors, per backend
+COSINE_TOLERANCE = {
+    "onnx": 0.9999,
+    "onnx-int8": 0.98,
+}
+
+
+class OnnxEncoder:
+    """
+    Drop-in for the parts of SentenceTransformer that EmbeddingHandler uses
+    (encode, get_sentence_embedding_dimension, tokenizer, max_seq_length),
+    running an exported ONNX model through onnxruntime.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", quantize: bool = False,
+                 cache_dir: str = DEFAULT_ONNX_CACHE_DIR, threads: int = None):
+        """
+        Args:
+            model_name: Sentence Transformers model to export
+            quantize: Use the dynamically int8-quantised export
+            cache_dir: Where exported models are kept (one folder per model)
+            threads: onnxruntime intra-op threads (default: all cores)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.model_dir = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9._-]", "_", model_name))
+        self.meta = self.load_or_export()
+        model_file = "model.onnx"
+        if quantize:
+            model_file = "model.int8.onnx"
+            if not os.path.exists(os.path.join(self.model_dir, model_file)):
+                self.quantize()
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        self.max_seq_length = self.meta["max_seq_length"]
+        self.device = "cpu"
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            os.path.join(self.model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def load_or_export(self) -> Dict:
+        meta_path = os.path.join(self.model_dir, "meta.json")
+        if os.path.exists(meta_path) and os.path.exists(os.path.join(self.model_dir, "model.onnx")):
+            with open(meta_path) as f:
+                return json.load(f)
+        return self.export()
+
+    def export(self) -> Dict:
+        """Export the transformer to ONNX (needs torch + sentence_transformers, only once)."""
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        print(f"exporting {self.model_name} to onnx (one-time)...")
+        os.makedirs(self.model_dir, exist_ok=True)
+        st_model = SentenceTransformer(self.model_name, device="cpu")
+        transformer = st_model[0]
+        tokenizer = transformer.tokenizer
+        sample = tokenizer(["export sample text"], return_tensors="pt", padding=True)
+        input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+
+        class HiddenStates(torch.nn.Module):  # positional inputs -> last_hidden_state
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs)))[0]
+
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+        with torch.no_grad():
+            torch.onnx.export(
+                HiddenStates(transformer.auto_model.eval()),
+                tuple(sample[n] for n in input_names),
+                os.path.join(self.model_dir, "model.onnx"),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+        tokenizer.save_pretrained(self.model_dir)
+
+        pooling = "mean"
+        normalize = False
+        for module in st_model:
+            if type(module).__name__ == "Pooling" and getattr(module, "pooling_mode_cls_token", False):
+                pooling = "cls"
+            if type(module).__name__ == "Normalize":
+                normalize = True
+        meta = {
+            "model_name": self.model_name,
+            "embedding_dim": st_model.get_sentence_embedding_dimension(),
+            "max_seq_length": st_model.max_seq_length,
+            "pooling": pooling,
+            "normalize": normalize,
+            "exported_at": datetime.now().isoformat()
+        }
+        with open(os.path.join(self.model_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        print(f"onnx model cached in {self.model_dir}")
+        return meta
+
+    def quantize(self):
+        """Dynamic int8 quantisation of the exported model (weights only, activations stay fp32)."""
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        print("quantizing onnx model to int8 (one-time)...")
+        quantize_dynamic(
+            os.path.join(self.model_dir, "model.onnx"),
+            os.path.join(self.model_dir, "model.int8.onnx"),
+            weight_type=QuantType.QInt8
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.meta["embedding_dim"]
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32,
+               convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode for str / list input."""
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        out = np.zeros((len(texts), self.meta["embedding_dim"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(batch, padding=True, truncation=True,
+                                     max_length=self.max_seq_length, return_tensors="np")
+            feeds = {name: encoded[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            if self.meta["pooling"] == "cls":
+                pooled = hidden[:, 0]
+            else:
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if self.meta["normalize"]:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            out[start:start + len(batch)] = pooled
+        return out[0] if single else out
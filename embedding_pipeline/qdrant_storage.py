@@ -1,10 +1,169 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Distance, VectorParams, PointStruct, Datatype, Batch, PayloadSchemaType, QueryRequest
+from qdrant_client.models import HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+from qdrant_client.models import SearchParams, QuantizationSearchParams, SetPayload, SetPayloadOperation
+from qdrant_client.local.qdrant_local import QdrantLocal
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional, Tuple
 import numpy as np
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
+from numbers import Integral, Real
+import hashlib
+import time
+import uuid
 import json
 
+try:
+    from .local_index import LocalVectorIndex, DEFAULT_LOCAL_INDEX_PATH
+except ImportError:
+    from local_index import LocalVectorIndex, DEFAULT_LOCAL_INDEX_PATH
+
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "gen-eezes/embeddings")
+
+VECTOR_DATATYPES = {
+    "float32": Datatype.FLOAT32,
+    "float16": Datatype.FLOAT16,  # half the memory/disk per point
+}
+
+# payload fields we filter on; indexed so filtered searches don't scan every payload
+PAYLOAD_INDEXES = {
+    "source": PayloadSchemaType.KEYWORD,
+    "language": PayloadSchemaType.KEYWORD,
+    "categories": PayloadSchemaType.KEYWORD,  # list of arXiv categories
+    "topics": PayloadSchemaType.KEYWORD,      # list of GitHub topics
+    "timestamp": PayloadSchemaType.DATETIME,  # publication time (see payload_timestamp)
+}
+
+RANGE_OPERATORS = {"$gt": "gt", "$gte": "gte", "$lt": "lt", "$lte": "lte"}
+
+# HNSW graph, search and storage settings per collection (QdrantStorage(profile=...)).
+# m / ef_construct: graph links per node and build-time beam, ef: search-time beam,
+# quantization "int8": scalar-quantised copy kept in RAM, `oversampling` x limit
+# candidates rescored with the originals, on_disk: originals / payloads memory-mapped.
+# tests/benchmark_collection_profiles.py measures recall vs latency for each.
+COLLECTION_PROFILES = {
+    "default": {"m": 16, "ef_construct": 100, "ef": 128, "quantization": None,
+                "rescore": True, "oversampling": 1.0, "on_disk": False, "on_disk_payload": False},
+    "accurate": {"m": 32, "ef_construct": 256, "ef": 256},
+    "fast": {"ef_construct": 128, "ef": 64, "quantization": "int8", "oversampling": 1.5},
+    "compact": {"quantization": "int8", "oversampling": 2.0, "on_disk": True, "on_disk_payload": True},
+}
+
+
+def compact_vectors(vectors, dims: int = None, datatype: str = "float32") -> np.ndarray:
+    """
+    Turn float32 embeddings into what a compact collection stores: the first
+    `dims` components (renormalised, cosine expects unit length) and rounded
+    to float16 when requested. Works on a single vector or a (n, d) matrix.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dims and dims < vectors.shape[-1]:
+        vectors = vectors[..., :dims]
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    if datatype == "float16":
+        vectors = vectors.astype(np.float16)
+    return vectors
+
+
+def stable_point_id(source: str, natural_key) -> str:
+    """
+    Deterministic point ID for a document, e.g. ("github", "owner/repo").
+    Same document -> same ID in every run (unlike hash(), which is salted per process).
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{source}:{natural_key}"))
+
+
+def content_checksum(content, settings: Dict = None) -> str:
+    """
+    Checksum of what gets embedded (the text, or field dict for fused embeddings)
+    and how (`settings`: model / backend, fusion weights, stored dims and
+    precision), stored with the point; when it changes the vector is recomputed.
+    """
+    if not isinstance(content, str):
+        content = json.dumps(content, sort_keys=True, default=str)
+    data = json.dumps(settings or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{content}\0{data}".encode("utf-8")).hexdigest()
+
+
+def payload_checksum(payload: Dict) -> str:
+    """Checksum of a point's metadata; when only this changes the payload is updated in place."""
+    data = {key: value for key, value in payload.items() if key not in ("checksum", "payload_checksum")}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def resolve_profile(profile="default") -> Dict:
+    """
+    Full settings for a profile name from COLLECTION_PROFILES, or a dict of
+    overrides (optionally with "base": <profile name>) on top of "default".
+    """
+    if isinstance(profile, dict) and "name" in profile:
+        return profile  # already resolved
+    overrides = dict(profile) if isinstance(profile, dict) else {"base": profile}
+    base = overrides.pop("base", "default")
+    if base not in COLLECTION_PROFILES:
+        raise ValueError(f"unknown collection profile: {base}")
+    settings = {**COLLECTION_PROFILES["default"], **COLLECTION_PROFILES[base], **overrides}
+    unknown = set(settings) - set(COLLECTION_PROFILES["default"])
+    if unknown:
+        raise ValueError(f"unknown collection profile settings: {', '.join(sorted(unknown))}")
+    if settings["quantization"] not in (None, "int8"):
+        raise ValueError(f"unsupported quantization: {settings['quantization']}")
+    return {"name": base if not overrides else f"{base}+custom", **settings}
+
+
+def collection_params(vector_size: int, profile="default", datatype: str = "float32") -> Dict:
+    """Keyword arguments for client.create_collection (everything but the name)."""
+    settings = resolve_profile(profile)
+    quantization = None
+    if settings["quantization"] == "int8":
+        quantization = ScalarQuantization(scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8,
+            quantile=0.99,      # clip outliers so the int8 range isn't wasted
+            always_ram=True     # quantised vectors stay in RAM even when originals are on disk
+        ))
+    return {
+        "vectors_config": VectorParams(
+            size=vector_size,
+            distance=Distance.COSINE,  # Cosine distance for text embeddings
+            datatype=VECTOR_DATATYPES[datatype],
+            on_disk=settings["on_disk"]
+        ),
+        "hnsw_config": HnswConfigDiff(m=settings["m"], ef_construct=settings["ef_construct"]),
+        "quantization_config": quantization,
+        "on_disk_payload": settings["on_disk_payload"]
+    }
+
+
+def search_params(profile="default") -> SearchParams:
+    """Search-time settings of a profile (HNSW ef, rescoring of quantised candidates)."""
+    settings = resolve_profile(profile)
+    quantization = None
+    if settings["quantization"]:
+        quantization = QuantizationSearchParams(rescore=settings["rescore"], oversampling=settings["oversampling"])
+    return SearchParams(hnsw_ef=settings["ef"], quantization=quantization)
+
+
+def payload_timestamp(*candidates) -> str:
+    """
+    First parseable date among `candidates` (datetime, date or ISO string) as
+    an RFC 3339 UTC string for the indexed "timestamp" payload field, "" if none.
+    """
+    for value in candidates:
+        if isinstance(value, str) and value:
+            try:
+                value = datetime.fromisoformat(value.replace("Z", "+00:00"))  # python < 3.11 rejects "Z"
+            except ValueError:
+                continue
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if isinstance(value, datetime):
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc).replace(tzinfo=None)
+            return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return ""
+
+
 class QdrantStorage:
     """
     Handles storage and retrieval of embeddings from Qdrant vector database.
@@ -13,7 +172,9 @@ class QdrantStorage:
     
     def __init__(self, collection_name: str, vector_size: int, 
                  host: str = "localhost", port: int = 6333, 
-                 path: str = None, use_memory: bool = False):
+                 path: str = None, use_memory: bool = False, client: QdrantClient = None,
+                 datatype: str = "float32", dims: int = None, profile="default",
+                 backend: str = "qdrant"):
         """
         Initialize Qdrant client and collection.
         
@@ -24,12 +185,31 @@ class QdrantStorage:
             port: Qdrant server port (default: 6333)
             path: Local path for in-memory storage (alternative to server)
             use_memory: If True, use in-memory storage (no persistence)
+            client: Existing QdrantClient to share (a local path can only be opened by one client)
+            datatype: Stored precision, "float32" or "float16"
+            dims: Keep only the first `dims` components of each vector (None = all)
+            profile: Name in COLLECTION_PROFILES or a dict of overrides (HNSW, quantization, on-disk)
+            backend: "qdrant", or "local" for the memory-mapped LocalVectorIndex in `path`
+                     (exact search, no server, many readers; see local_index.py)
         """
+        if backend not in ("qdrant", "local"):
+            raise ValueError(f"unknown vector store backend: {backend}")
+        if datatype not in VECTOR_DATATYPES:
+            raise ValueError(f"unsupported vector datatype: {datatype}")
         self.collection_name = collection_name
-        self.vector_size = vector_size
+        self.datatype = datatype
+        self.dims = dims if dims and dims < vector_size else None
+        self.vector_size = self.dims or vector_size  # size stored in the collection
+        self.profile = resolve_profile(profile)
+        self.search_params = search_params(self.profile)
         
         try:
-            if use_memory:
+            if client is not None:
+                self.client = client
+            elif backend == "local":
+                print(f"initializing local vector index: {path or DEFAULT_LOCAL_INDEX_PATH}")
+                self.client = LocalVectorIndex(path or DEFAULT_LOCAL_INDEX_PATH)
+            elif use_memory:
                 # In-memory Qdrant (useful for testing)
                 print(f"initializing qdrant in-memory client...")
                 self.client = QdrantClient(":memory:")
@@ -65,21 +245,60 @@ class QdrantStorage:
             
             if self.collection_name in collection_names:
                 print(f"collection '{self.collection_name}' already exists")
+                params = self.client.get_collection(self.collection_name).config.params.vectors
+                stored_type = getattr(params, "datatype", None) or Datatype.FLOAT32
+                if params.size != self.vector_size or stored_type != VECTOR_DATATYPES[self.datatype]:
+                    print(f"warning: '{self.collection_name}' stores {params.size}-d {stored_type.value} vectors, "
+                          f"not {self.vector_size}-d {self.datatype}; recreate it to change precision")
+                self._check_profile()
+                self.create_payload_indexes()
                 return
             
             # Create new collection
             print(f"creating collection: {self.collection_name}")
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(
-                    size=self.vector_size,
-                    distance=Distance.COSINE  # Cosine distance for text embeddings
-                )
+                **collection_params(self.vector_size, self.profile, self.datatype)
             )
-            print(f"collection '{self.collection_name}' created successfully")
+            print(f"collection '{self.collection_name}' created successfully (profile: {self.profile['name']})")
+            self.create_payload_indexes()
         except Exception as e:
             print(f"error creating collection: {e}")
     
+    def _check_profile(self):
+        """Warn when an existing collection was built with other index/storage settings."""
+        if self._is_local():
+            return  # the local client keeps no index settings
+        config = self.client.get_collection(self.collection_name).config
+        stored = {
+            "m": config.hnsw_config.m,
+            "ef_construct": config.hnsw_config.ef_construct,
+            "quantization": "int8" if config.quantization_config else None,
+            "on_disk": bool(config.params.vectors.on_disk)
+        }
+        differs = {key: value for key, value in stored.items() if value != self.profile[key]}
+        if differs:
+            print(f"warning: '{self.collection_name}' was created with {differs}, not profile "
+                  f"'{self.profile['name']}'; recreate it (or update_collection) to apply the profile")
+    
+    def create_payload_indexes(self):
+        """Declare the PAYLOAD_INDEXES that don't exist yet (the local client has no indexes)."""
+        if self._is_local():
+            return
+        existing = self.client.get_collection(self.collection_name).payload_schema or {}
+        for field, schema in PAYLOAD_INDEXES.items():
+            if field not in existing:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field,
+                    field_schema=schema
+                )
+                print(f"  indexed payload field '{field}' ({schema.value})")
+    
+    def _is_local(self) -> bool:
+        """Embedded client or local index: in-process, exact search, no payload indexes."""
+        return isinstance(self.client, LocalVectorIndex) or isinstance(getattr(self.client, "_client", None), QdrantLocal)
+    
     def add_point(self, point_id: int, vector: np.ndarray, payload: Dict) -> bool:
         """
         Add a single point (embedding) to the collection.
@@ -93,7 +312,7 @@ class QdrantStorage:
             True if successful, False otherwise
         """
         try:
-            vector_list = vector.tolist() if isinstance(vector, np.ndarray) else vector
+            vector_list = compact_vectors(vector, self.dims, self.datatype).tolist()
             
             point = PointStruct(
                 id=point_id,
@@ -112,7 +331,7 @@ class QdrantStorage:
     
     def add_points_batch(self, points: List[Tuple[int, np.ndarray, Dict]]) -> int:
         """
-        Add multiple points efficiently in batch mode.
+        Add multiple points efficiently in batch mode (see upsert_bulk).
         
         Args:
             points: List of tuples (point_id, vector, payload)
@@ -120,25 +339,77 @@ class QdrantStorage:
         Returns:
             Number of points successfully added
         """
-        try:
-            point_structs = []
-            for point_id, vector, payload in points:
-                vector_list = vector.tolist() if isinstance(vector, np.ndarray) else vector
-                point = PointStruct(
-                    id=point_id,
-                    vector=vector_list,
-                    payload=payload
-                )
-                point_structs.append(point)
+        if not points:
+            return 0
+        ids, vectors, payloads = zip(*points)
+        return self.upsert_bulk(list(ids), np.stack(vectors), list(payloads))
+    
+    def upsert_bulk(self, ids: List, vectors: np.ndarray, payloads: List[Dict],
+                    chunk_size: int = 256, workers: int = 4, wait: bool = False,
+                    retries: int = 3) -> int:
+        """
+        Bulk ingest: the (n, d) vector matrix is compacted once, split into
+        chunks of `chunk_size` points and sent by `workers` parallel threads.
+        Each chunk is retried on its own, so one failure doesn't lose the batch.
+        With wait=False chunks are only acknowledged, and a final wait=True
+        write acts as the barrier before returning.
+        
+        Args:
+            ids: Point IDs
+            vectors: numpy array of shape (n, vector_size) (float32 preferred)
+            payloads: Metadata dictionaries
+            chunk_size: Points per upsert request
+            workers: Parallel upsert threads (the local client always uses one)
+            wait: Wait for every chunk to be applied instead of one final barrier
+            retries: Attempts per chunk before it's given up
             
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=point_structs
-            )
-            return len(point_structs)
-        except Exception as e:
-            print(f"error adding batch of points: {e}")
+        Returns:
+            Number of points successfully added (failed IDs in self.failed_ids)
+        """
+        vectors = compact_vectors(vectors, self.dims, self.datatype)
+        chunks = [(i, min(i + chunk_size, len(ids))) for i in range(0, len(ids), chunk_size)]
+        self.failed_ids = []
+        if not chunks:
             return 0
+        
+        def send(chunk, wait_for_apply):
+            start, end = chunk
+            if isinstance(self.client, LocalVectorIndex):  # takes the matrix as is
+                points = (list(ids[start:end]), vectors[start:end].astype(np.float32), list(payloads[start:end]))
+            else:
+                points = Batch(ids=list(ids[start:end]), vectors=vectors[start:end].tolist(), payloads=list(payloads[start:end]))
+            for attempt in range(1, retries + 1):
+                try:
+                    self.client.upsert(collection_name=self.collection_name, points=points, wait=wait_for_apply)
+                    return True
+                except Exception as e:
+                    if attempt == retries:
+                        print(f"error adding points {start}-{end}: {e}")
+                        return False
+                    time.sleep(0.5 * 2 ** (attempt - 1))
+        
+        # the embedded local client isn't thread-safe (and is cpu-bound anyway)
+        if self._is_local():
+            workers = 1
+        if workers == 1:
+            sent = [send(chunk, wait) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                sent = list(pool.map(lambda chunk: send(chunk, wait), chunks))
+        succeeded = [chunk for chunk, ok in zip(chunks, sent) if ok]
+        
+        if not wait and succeeded and not self._is_local():  # local writes are applied before upsert returns
+            # updates are applied in order, so waiting on one final write waits on all of them;
+            # that chunk only counts as added once the barrier itself goes through
+            barrier = succeeded.pop()
+            if send(barrier, True):
+                succeeded.append(barrier)
+        
+        done = set(succeeded)
+        for start, end in chunks:
+            if (start, end) not in done:
+                self.failed_ids.extend(ids[start:end])
+        return sum(end - start for start, end in succeeded)
     
     def search(self, query_vector: np.ndarray, limit: int = 10, 
                score_threshold: float = None, filter_dict: Dict = None) -> List[Dict]:
@@ -149,24 +420,22 @@ class QdrantStorage:
             query_vector: Query embedding vector
             limit: Maximum number of results to return
             score_threshold: Minimum similarity score (0-1 for cosine)
-            filter_dict: Optional filter on payload fields
-                        Example: {"source": "github"} or {"score": {"$gte": 100}}
+            filter_dict: Optional filter on payload fields (see _build_filter)
+                        Example: {"source": "github"} or {"score": {"$gte": 100, "$lte": 500}}
             
         Returns:
             List of search results with scores and metadata
         """
+        # Build filter if provided (outside the try: a malformed filter is the caller's error)
+        query_filter = self._build_filter(filter_dict) if filter_dict else None
         try:
-            vector_list = query_vector.tolist() if isinstance(query_vector, np.ndarray) else query_vector
-            
-            # Build filter if provided
-            query_filter = None
-            if filter_dict:
-                query_filter = self._build_filter(filter_dict)
+            vector_list = compact_vectors(query_vector, self.dims).tolist()  # queries stay float32
             
             results = self.client.search(
                 collection_name=self.collection_name,
                 query_vector=vector_list,
                 query_filter=query_filter,
+                search_params=self.search_params,
                 limit=limit,
                 score_threshold=score_threshold
             )
@@ -185,6 +454,79 @@ class QdrantStorage:
             print(f"error searching: {e}")
             return []
     
+    def search_batch(self, query_vectors: np.ndarray, limit=10, score_threshold: float = None,
+                     filters=None, max_batch: int = 256) -> List[List[Dict]]:
+        """
+        Run many searches in one batched request (one round-trip per `max_batch`
+        queries instead of one per query). A failed batch is retried query by
+        query; an error that persists is raised rather than returned as no hits.
+        
+        Args:
+            query_vectors: numpy array of shape (n, d), one query per row
+            limit: Results per query, an int or one per query
+            score_threshold: Minimum similarity score for every query
+            filters: One filter dict for all queries, or a list with one
+                     filter dict (or None) per query (see _build_filter)
+            max_batch: Queries per request
+            
+        Returns:
+            One list of results per query, in input order (same format as search)
+        """
+        query_vectors = compact_vectors(query_vectors, self.dims)  # queries stay float32
+        n = len(query_vectors)
+        limits = [int(limit)] * n if isinstance(limit, Integral) else [int(l) for l in limit]
+        if filters is None or isinstance(filters, dict):
+            filters = [filters] * n
+        # build each distinct filter once
+        built = {}
+        query_filters = []
+        for filter_dict in filters:
+            key = json.dumps(filter_dict, sort_keys=True, default=str) if filter_dict else None
+            if key not in built:
+                built[key] = self._build_filter(filter_dict) if filter_dict else None
+            query_filters.append(built[key])
+        
+        results = []
+        for start in range(0, n, max_batch):
+            requests = [
+                QueryRequest(
+                    query=query_vectors[i].tolist(),
+                    filter=query_filters[i],
+                    params=self.search_params,
+                    limit=limits[i],
+                    score_threshold=score_threshold,
+                    with_payload=True
+                )
+                for i in range(start, min(start + max_batch, n))
+            ]
+            try:
+                responses = self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=requests
+                )
+            except Exception as e:
+                # retry one query per request; an error that persists is raised to the caller
+                print(f"error in batch search, retrying {len(requests)} queries one by one: {e}")
+                responses = [
+                    self.client.query_batch_points(collection_name=self.collection_name, requests=[request])[0]
+                    for request in requests
+                ]
+            results.extend(
+                [{"id": hit.id, "score": hit.score, "payload": hit.payload} for hit in response.points]
+                for response in responses
+            )
+        return results
+    
+    def search_recent(self, query_vector: np.ndarray, weeks: int = 4, limit: int = 10,
+                      score_threshold: float = None, filter_dict: Dict = None) -> List[Dict]:
+        """
+        Search restricted to documents published in the last `weeks` weeks
+        (range on the indexed "timestamp" payload field).
+        """
+        since = datetime.utcnow() - timedelta(weeks=weeks)
+        filter_dict = {**(filter_dict or {}), "timestamp": {"$gte": since}}
+        return self.search(query_vector, limit=limit, score_threshold=score_threshold, filter_dict=filter_dict)
+    
     def search_by_id(self, point_id: int) -> Optional[Dict]:
         """
         Retrieve a specific point by ID.
@@ -226,6 +568,9 @@ class QdrantStorage:
                 "collection_name": self.collection_name,
                 "points_count": stats.points_count if hasattr(stats, 'points_count') else 0,
                 "vector_size": self.vector_size,
+                "datatype": self.datatype,
+                "profile": self.profile["name"],
+                "vector_bytes": self.vector_size * np.dtype(self.datatype).itemsize,
                 "status": str(stats.status) if hasattr(stats, 'status') else "unknown"
             }
         except Exception as e:
@@ -244,14 +589,14 @@ class QdrantStorage:
             List of matching documents
         """
         try:
-            points = self.client.scroll(
+            points, _ = self.client.scroll(
                 collection_name=self.collection_name,
                 limit=limit,
                 scroll_filter=self._build_filter({"source": source})
             )
             
             results = []
-            for point, _ in points:
+            for point in points:
                 results.append({
                     "id": point.id,
                     "payload": point.payload
@@ -262,6 +607,69 @@ class QdrantStorage:
             print(f"error filtering by source: {e}")
             return []
     
+    def get_checksums(self, batch_size: int = 1000) -> Dict:
+        """
+        Stored checksums per point ID (None for points stored without them).
+        
+        Returns:
+            Dictionary of point_id: (content checksum, payload checksum)
+        """
+        checksums = {}
+        offset = None
+        try:
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=["checksum", "payload_checksum"],
+                    with_vectors=False
+                )
+                for point in points:
+                    payload = point.payload or {}
+                    checksums[point.id] = (payload.get("checksum"), payload.get("payload_checksum"))
+                if offset is None:
+                    break
+        except Exception as e:
+            print(f"error reading checksums: {e}")
+        return checksums
+    
+    def update_payloads(self, ids: List, payloads: List[Dict], chunk_size: int = 256) -> int:
+        """
+        Set new payloads on existing points without re-sending their vectors
+        (one batched request per `chunk_size` points).
+        
+        Returns:
+            Number of points updated
+        """
+        updated = 0
+        for start in range(0, len(ids), chunk_size):
+            operations = [
+                SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[point_id]))
+                for point_id, payload in zip(ids[start:start + chunk_size], payloads[start:start + chunk_size])
+            ]
+            try:
+                self.client.batch_update_points(collection_name=self.collection_name,
+                                                update_operations=operations)
+                updated += len(operations)
+            except Exception as e:
+                print(f"error updating payloads {start}-{start + len(operations)}: {e}")
+        return updated
+    
+    def delete_points(self, point_ids: List) -> int:
+        """Delete several points by ID, returns how many were requested."""
+        if not point_ids:
+            return 0
+        try:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=list(point_ids)
+            )
+            return len(point_ids)
+        except Exception as e:
+            print(f"error deleting points: {e}")
+            return 0
+    
     def delete_point(self, point_id: int) -> bool:
         """Delete a point by ID."""
         try:
@@ -286,42 +694,64 @@ class QdrantStorage:
     
     def _build_filter(self, filter_dict: Dict):
         """
-        Build a Qdrant filter from a dictionary.
-        This is a simplified version - for complex filters, use Qdrant's Filter API directly.
+        Build a Qdrant filter from a Mongo-style dictionary. Conditions on
+        different fields are combined with AND.
+        
+            {"source": "github"}                          equality
+            {"language": {"$ne": "JavaScript"}}           not equal
+            {"categories": {"$in": ["cs.AI", "cs.LG"]}}   any of (also matches inside list fields)
+            {"language": {"$nin": ["", "HTML"]}}          none of
+            {"score": {"$gte": 100, "$lt": 500}}          numeric range, any of $gt/$gte/$lt/$lte
+            {"timestamp": {"$gte": datetime(2024, 1, 1)}} datetime range (datetime/date/ISO-8601 string bounds)
+        
+        Raises ValueError for unknown operators and for range bounds that are
+        neither numbers nor parseable dates.
         
         Args:
             filter_dict: Dictionary with field names and values/conditions
             
         Returns:
-            Qdrant Filter object
+            Qdrant Filter object, or None for an empty filter
         """
-        from qdrant_client.models import Filter, FieldCondition, MatchValue, Range
+        from qdrant_client.models import Filter, FieldCondition, MatchValue, MatchAny, Range, DatetimeRange
         
-        conditions = []
+        must, must_not = [], []
         for key, value in filter_dict.items():
-            if isinstance(value, dict):
-                # Handle range queries like {"$gte": 100}
-                if "$gte" in value:
-                    conditions.append(FieldCondition(
-                        key=key,
-                        range=Range(gte=value["$gte"])
-                    ))
-                elif "$lte" in value:
-                    conditions.append(FieldCondition(
-                        key=key,
-                        range=Range(lte=value["$lte"])
-                    ))
-            else:
+            if not isinstance(value, dict):
                 # Simple equality match
-                conditions.append(FieldCondition(
-                    key=key,
-                    match=MatchValue(value=value)
-                ))
+                value = {"$eq": value}
+            
+            bounds = {RANGE_OPERATORS[op]: bound for op, bound in value.items() if op in RANGE_OPERATORS}
+            if bounds:
+                if all(isinstance(bound, Real) and not isinstance(bound, bool) for bound in bounds.values()):
+                    must.append(FieldCondition(key=key, range=Range(**bounds)))
+                else:
+                    timestamps = {name: payload_timestamp(bound) if isinstance(bound, (str, date)) else ""
+                                  for name, bound in bounds.items()}
+                    invalid = [bound for name, bound in bounds.items() if not timestamps[name]]
+                    if invalid:
+                        raise ValueError(f"range bounds on '{key}' must be all numbers or all datetimes / "
+                                         f"dates / ISO-8601 strings, got {invalid!r}")
+                    must.append(FieldCondition(key=key, range=DatetimeRange(**timestamps)))
+            
+            for op, operand in value.items():
+                if op in RANGE_OPERATORS:
+                    continue
+                if op == "$eq":
+                    must.append(FieldCondition(key=key, match=MatchValue(value=operand)))
+                elif op == "$ne":
+                    must_not.append(FieldCondition(key=key, match=MatchValue(value=operand)))
+                elif op == "$in":
+                    must.append(FieldCondition(key=key, match=MatchAny(any=list(operand))))
+                elif op == "$nin":
+                    must_not.append(FieldCondition(key=key, match=MatchAny(any=list(operand))))
+                else:
+                    raise ValueError(f"unsupported filter operator {op} on '{key}'")
         
-        if not conditions:
+        if not must and not must_not:
             return None
         
-        return Filter(must=conditions)
+        return Filter(must=must or None, must_not=must_not or None)
 
 
 # Test if run directly
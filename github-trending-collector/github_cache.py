@@ -0,0 +1,134 @@
+import sqlite3
+import threading
+import time
+import os
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "github_http_cache.sqlite")
+
+class GitHubHTTPCache:
+    """
+    On-disk cache for GitHub API / raw README responses.
+    Stores ETag / Last-Modified per url and turns them into If-None-Match /
+    If-Modified-Since headers, so unchanged repos come back as 304 (which don't
+    count against the rate limit). Also tracks X-RateLimit-Remaining / Reset to
+    pace requests before the quota runs out, and reports hit ratio + quota use per run.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, min_remaining=20, pace_below=500):
+        """
+        Args:
+            path: sqlite file for cached responses (":memory:" for a throwaway cache)
+            min_remaining: when this few api calls are left, wait for the reset
+            pace_below: below this many remaining calls, spread requests over the reset window
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.min_remaining = min_remaining
+        self.pace_below = pace_below
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT, fetched_at REAL)"
+        )
+        self.conn.commit()
+        self.rate_remaining = None
+        self.rate_reset = None
+        self.reset_stats()
+
+    def reset_stats(self): # call at the start of each run
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "uncached": 0, "api_calls": 0, "quota_used": 0}
+
+    def known(self, url): # url has a cached body
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def conditional_headers(self, url): # validators from the last 200 for this url
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def resolve(self, url, status, headers, body):
+        """
+        Record a response and return (status, body) to use:
+        a 304 is swapped for the cached 200 body, a 200 with validators is stored.
+        """
+        self.stats["requests"] += 1
+        self.update_rate_limit(status, headers)
+        if status == 304:
+            with self.lock:
+                row = self.conn.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                self.stats["hits"] += 1
+                return 200, row[0]
+            self.stats["uncached"] += 1 # validators sent but the cached body is gone
+            return status, body
+        if status == 200 and (headers.get("ETag") or headers.get("Last-Modified")):
+            self.stats["misses"] += 1
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (url, headers.get("ETag"), headers.get("Last-Modified"), body, time.time())
+                )
+                self.conn.commit()
+        else:
+            self.stats["uncached"] += 1
+        return status, body
+
+    def update_rate_limit(self, status, headers): # only api.github.com sends these
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        self.stats["api_calls"] += 1
+        if status != 304: # conditional hits are free
+            self.stats["quota_used"] += 1
+        remaining = int(remaining)
+        reset = headers.get("X-RateLimit-Reset")
+        reset = float(reset) if reset is not None else self.rate_reset
+        if reset != self.rate_reset or self.rate_remaining is None:
+            self.rate_remaining = remaining # new window
+        else:
+            self.rate_remaining = min(self.rate_remaining, remaining) # concurrent responses arrive out of order
+        self.rate_reset = reset
+
+    def pace_delay(self): # seconds to wait before the next api call
+        if self.rate_remaining is None or self.rate_reset is None:
+            return 0
+        window = self.rate_reset - time.time()
+        if window <= 0: # quota already reset
+            return 0
+        if self.rate_remaining <= self.min_remaining:
+            print(f"  rate limit nearly used up ({self.rate_remaining} left), waiting {window:.0f}s for reset")
+            return window + 1
+        if self.rate_remaining < self.pace_below:
+            return window / self.rate_remaining # spread what's left over the window
+        return 0
+
+    def quota_exhausted(self): # waiting for the reset, pace_delay is then the time until it
+        if self.rate_remaining is None or self.rate_reset is None:
+            return False
+        return self.rate_reset > time.time() and self.rate_remaining <= self.min_remaining
+
+    def report(self):
+        cacheable = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": self.stats["hits"] / cacheable if cacheable else 0.0,
+            "rate_limit_remaining": self.rate_remaining,
+            "rate_limit_reset": self.rate_reset
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(f"\nhttp cache: {report['hits']} hits / {report['misses']} misses "
+              f"(hit ratio {report['hit_ratio']:.0%}), {report['uncached']} uncached")
+        print(f"github quota used this run: {report['quota_used']} "
+              f"(remaining: {report['rate_limit_remaining']})")
+        return report
@@ -0,0 +1,157 @@
+from langdetect import detect, DetectorFactory, LangDetectException
+from googletrans import Translator
+import hashlib
+import sqlite3
+import threading
+import os
+import re
+
+DetectorFactory.seed = 0 # deterministic langdetect, so cached results stay consistent
+
+DEFAULT_LANGUAGE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "language_cache.sqlite")
+
+COMMON_ENGLISH_WORDS = {"the", "and", "to", "of", "a", "is", "for", "in", "with", "this", "that", "on", "you", "it", "are", "be", "an", "or", "your", "can"}
+BATCH_MARKER = "§§§" # kept as-is by the translator, used to split batched results
+BATCH_SEPARATOR = f"\n\n{BATCH_MARKER}\n\n"
+
+class LanguageStage:
+    """
+    Language detection + translation for README ingestion.
+    - plainly ASCII text with common english words skips langdetect
+    - content-hash -> (language, translation) cache in sqlite, so unchanged
+      READMEs are never re-detected or re-translated
+    - texts that do need translating are packed into a few batched requests per language
+    """
+
+    def __init__(self, cache_path=DEFAULT_LANGUAGE_CACHE_PATH, translator=None, batch_chars=4500, min_length=20):
+        """
+        Args:
+            cache_path: sqlite file for the cache (":memory:" for a throwaway cache)
+            translator: googletrans Translator (created if not given)
+            batch_chars: max characters per batched translation request
+            min_length: shorter texts are left alone (same as before)
+        """
+        if cache_path != ":memory:":
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.translator = translator or Translator()
+        self.batch_chars = batch_chars
+        self.min_length = min_length
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS texts (hash TEXT PRIMARY KEY, lang TEXT, translation TEXT)")
+        self.conn.commit()
+        self.stats = {"precheck": 0, "cache_hits": 0, "detected": 0, "translated": 0, "translate_requests": 0}
+
+    def text_hash(self, text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def looks_english(self, text): # cheap pre-check before langdetect
+        letters = [c for c in text if c.isalpha()]
+        if not letters:
+            return True
+        ascii_ratio = sum(c.isascii() for c in letters) / len(letters)
+        if ascii_ratio < 0.98:
+            return False
+        words = re.findall(r"[a-z]+", text[:2000].lower())
+        return sum(w in COMMON_ENGLISH_WORDS for w in words) >= 3
+
+    def lookup(self, text):
+        with self.lock:
+            return self.conn.execute("SELECT lang, translation FROM texts WHERE hash = ?", (self.text_hash(text),)).fetchone()
+
+    def remember(self, text, lang, translation=None):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO texts (hash, lang, translation) VALUES (?, ?, ?)",
+                              (self.text_hash(text), lang, translation))
+            self.conn.commit()
+
+    def detect_language(self, text): # cache -> pre-check -> langdetect
+        if not text or len(text) < self.min_length:
+            return "en"
+        row = self.lookup(text)
+        if row:
+            self.stats["cache_hits"] += 1
+            return row[0]
+        if self.looks_english(text):
+            self.stats["precheck"] += 1
+            lang = "en"
+        else:
+            self.stats["detected"] += 1
+            try:
+                lang = detect(text)
+            except LangDetectException:
+                lang = "unknown"
+        self.remember(text, lang)
+        return lang
+
+    def process(self, pairs):
+        """
+        Translate (description, readme_text) pairs to english.
+        Returns a list of (description, readme_text) in the same order.
+        """
+        results = [list(pair) for pair in pairs]
+        pending = {} # src lang -> [(result index, field index, text)]
+        for i, (description, readme_text) in enumerate(pairs):
+            if self.detect_language(description + " " + readme_text) in ("en", "unknown"):
+                continue
+            for field, text in enumerate((description, readme_text)):
+                lang = self.detect_language(text)
+                if lang in ("en", "unknown"):
+                    continue
+                row = self.lookup(text)
+                if row and row[1] is not None:
+                    self.stats["cache_hits"] += 1
+                    results[i][field] = row[1]
+                    continue
+                pending.setdefault(lang, []).append((i, field, text))
+        for lang, entries in pending.items():
+            translations = self.translate_batch([text for _, _, text in entries], lang)
+            for (i, field, text), translated in zip(entries, translations):
+                if translated is not None:
+                    results[i][field] = translated
+                    self.remember(text, lang, translated)
+        return [tuple(r) for r in results]
+
+    def translate_batch(self, texts, src): # pack texts into as few requests as possible
+        translated = [None] * len(texts)
+        batch = []
+        size = 0
+        for i, text in enumerate(texts):
+            if BATCH_MARKER in text: # would break the split, send it on its own
+                self._translate_packed(texts, [i], src, translated)
+                continue
+            if batch and size + len(text) > self.batch_chars:
+                self._translate_packed(texts, batch, src, translated)
+                batch, size = [], 0
+            batch.append(i)
+            size += len(text) + len(BATCH_SEPARATOR)
+        if batch:
+            self._translate_packed(texts, batch, src, translated)
+        return translated
+
+    def _translate_packed(self, texts, batch, src, translated):
+        print(f"    translating {len(batch)} text(s) from {src} to english...")
+        if len(batch) > 1:
+            parts = self._translate(BATCH_SEPARATOR.join(texts[i] for i in batch), src)
+            parts = parts.split(BATCH_MARKER) if parts is not None else []
+            if len(parts) == len(batch):
+                for i, part in zip(batch, parts):
+                    translated[i] = part.strip()
+                self.stats["translated"] += len(batch)
+                return
+        for i in batch: # single text, or the separator got mangled
+            translated[i] = self._translate(texts[i], src)
+            self.stats["translated"] += translated[i] is not None
+
+    def _translate(self, text, src):
+        self.stats["translate_requests"] += 1
+        try:
+            return self.translator.translate(text, dest="en", src=src).text
+        except ValueError: # langdetect code googletrans doesn't know
+            try:
+                return self.translator.translate(text, dest="en").text
+            except Exception as e:
+                print(f"    translation failed: {e}")
+        except Exception as e:
+            print(f"    translation failed: {e}")
+        return None
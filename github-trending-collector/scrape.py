@@ -1,21 +1,36 @@
 import requests
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
-from langdetect import detect, LangDetectException
 from datetime import datetime, timedelta
 import re
 import os
+import json
 from googletrans import Translator
 import sys
+import time
 sys.path.insert(0, '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from mongodb_storage import MongoDBStorage
+from github_cache import GitHubHTTPCache, DEFAULT_CACHE_PATH
+from language_stage import LanguageStage, DEFAULT_LANGUAGE_CACHE_PATH
 
 class GitHubTrendingCollector:
-    def __init__(self, period="daily", github_token=None, active_days=60):
+    def __init__(self, period="daily", github_token=None, active_days=60,
+                 base_url=None, api_url="https://api.github.com",
+                 raw_url="https://raw.githubusercontent.com", timeout=30,
+                 cache_path=DEFAULT_CACHE_PATH, language_cache_path=DEFAULT_LANGUAGE_CACHE_PATH):
         self.period = period
-        self.base_url = f"https://github.com/trending?since={period}"
+        self.base_url = base_url or f"https://github.com/trending?since={period}"
+        self.api_url = api_url.rstrip("/") # overridable so a local stand-in can serve the api / raw files
+        self.raw_url = raw_url.rstrip("/")
         self.github_token = github_token
         self.active_days = active_days
+        self.timeout = timeout
+        self.session = requests.Session() # keep-alive across the sync requests
+        self.cache = GitHubHTTPCache(cache_path) # etag / last-modified cache + rate limit pacing
         self.translator = Translator()
+        self.language = LanguageStage(language_cache_path, translator=self.translator) # cached detection + batched translation
 
     def github_headers(self):
         headers = {"Accept": "application/vnd.github.mercy-preview+json"} # topics
@@ -23,20 +38,22 @@ class GitHubTrendingCollector:
             headers["Authorization"] = f"Bearer {self.github_token}"
         return headers
 
-    def is_english(self, text): # since there are a lot of chinese, korean, etc. repos
-        if not text or len(text) < 20:
-            return True
-        try:
-            return detect(text) == "en"
-        except LangDetectException:
-            return False
+    def cached_get(self, url, headers=None): # conditional GET through the http cache, returns (status, text)
+        delay = self.cache.pace_delay() if url.startswith(self.api_url) else 0
+        if delay:
+            time.sleep(delay)
+        headers = {**(headers or {}), **self.cache.conditional_headers(url)}
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        return self.cache.resolve(url, r.status_code, r.headers, r.text)
 
     def fetch_repo_metadata(self, owner, repo):
-        url = f"https://api.github.com/repos/{owner}/{repo}"
-        r = requests.get(url, headers=self.github_headers())
-        if r.status_code != 200:
+        url = f"{self.api_url}/repos/{owner}/{repo}"
+        status, text = self.cached_get(url, headers=self.github_headers())
+        if status != 200:
             return None
-        data = r.json()
+        return self.parse_repo_metadata(json.loads(text))
+
+    def parse_repo_metadata(self, data):
         return {
             "created_at": data.get("created_at"),
             "updated_at": data.get("updated_at"),
@@ -77,93 +94,175 @@ class GitHubTrendingCollector:
         text = re.sub(r' +', ' ', text)
         return text.strip()
     
-    def fetch_readme(self, owner, repo):
+    def readme_urls(self, owner, repo):
         urls = [
-            f"https://raw.githubusercontent.com/{owner}/{repo}/main/README.md",
-            f"https://raw.githubusercontent.com/{owner}/{repo}/master/README.md"
+            f"{self.raw_url}/{owner}/{repo}/main/README.md",
+            f"{self.raw_url}/{owner}/{repo}/master/README.md"
         ]
-        for url in urls:
-            r = requests.get(url)
-            if r.status_code == 200:
-                return self.clean_readme(r.text) # clean before returning
-        return ""
+        return sorted(urls, key=lambda url: not self.cache.known(url)) # branch that worked last time first
 
-    def translate_to_english(self, text): # translate text to eng if not
-        if not text or len(text) < 20:
-            return text
-        try:
-            lang = detect(text)
-            if lang != "en":
-                print(f"    translating from {lang} to english...")
-                translated = self.translator.translate(text, src_lang=lang, dest_language='en')
-                return translated.text
-            return text
-        except Exception as e:
-            print(f"    translation failed: {e}")
-            return text
-
-    def fetch_trending(self):
-        response = requests.get(self.base_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        repos = []
-        repo_list = soup.find_all("article", class_="Box-row")
-        cutoff_date = datetime.utcnow() - timedelta(days=self.active_days)
-        print(f"found {len(repo_list)} trending repos")
+    def fetch_readme(self, owner, repo):
+        for url in self.readme_urls(owner, repo):
+            status, text = self.cached_get(url)
+            if status == 200:
+                return self.clean_readme(text) # clean before returning
+        return ""
 
-        for repo in repo_list:
+    def parse_trending(self, html): # pull owner/name/description/language/stars out of the trending page
+        soup = BeautifulSoup(html, "html.parser")
+        items = []
+        for repo in soup.find_all("article", class_="Box-row"):
             full_name = repo.h2.a.text.strip().replace("\n", "").replace(" ", "")
             owner, name = full_name.split("/")
-            print(f"\nprocessing: {owner}/{name}")
             desc_tag = repo.find("p", class_="col-9 color-fg-muted my-1 pr-4")
-            description = desc_tag.text.strip() if desc_tag else ""
             lang_tag = repo.find("span", itemprop="programmingLanguage")
-            language = lang_tag.text.strip() if lang_tag else None
             stars_tag = repo.find("span", class_="d-inline-block float-sm-right")
-            stars_today = stars_tag.text.strip().split(" ")[0] if stars_tag else None
+            items.append({
+                "owner": owner,
+                "name": name,
+                "description": desc_tag.text.strip() if desc_tag else "",
+                "language": lang_tag.text.strip() if lang_tag else None,
+                "stars_today": stars_tag.text.strip().split(" ")[0] if stars_tag else None
+            })
+        return items
+
+    def is_active(self, meta, cutoff_date):
+        if not meta["updated_at"]:
+            return True
+        updated_date = datetime.fromisoformat(meta["updated_at"].replace("Z", ""))
+        if updated_date < cutoff_date:
+            print(f"  too old: updated {updated_date.date()}")
+            return False
+        print(f"  recent: updated {updated_date.date()}")
+        return True
+
+    def finish_records(self, fetched): # language stage over all repos at once, then build records
+        pairs = [(item["description"], readme_text) for item, _, readme_text in fetched]
+        translated = self.language.process(pairs)
+        print(f"language stage: {self.language.stats}")
+        return [self.build_record(item, meta, description, readme_text)
+                for (item, meta, _), (description, readme_text) in zip(fetched, translated)]
+
+    def build_record(self, item, meta, description, readme_text):
+        owner, name = item["owner"], item["name"]
+        return {
+            "owner": owner,
+            "name": name,
+            "full_name": f"{owner}/{name}",
+            "description": description,
+            "language": item["language"],
+            "topics": meta["topics"],
+            "stars_trending": item["stars_today"],
+            "stars_total": meta["stars_total"],
+            "readme_text": readme_text,
+            "created_at": meta["created_at"],
+            "updated_at": meta["updated_at"],
+            "pushed_at": meta["pushed_at"],
+            "repo_url": f"https://github.com/{owner}/{name}"
+        }
+
+    def fetch_trending(self):
+        self.cache.reset_stats()
+        response = self.session.get(self.base_url, timeout=self.timeout)
+        items = self.parse_trending(response.text)
+        fetched = []
+        cutoff_date = datetime.utcnow() - timedelta(days=self.active_days)
+        print(f"found {len(items)} trending repos")
+
+        for item in items:
+            owner, name = item["owner"], item["name"]
+            print(f"\nprocessing: {owner}/{name}")
             meta = self.fetch_repo_metadata(owner, name)
             if not meta:
                 print(f"  failed to fetch metadata")
                 continue
-            if meta["updated_at"]:
-                updated_date = datetime.fromisoformat(meta["updated_at"].replace("Z", ""))
-                if updated_date < cutoff_date:
-                    print(f"  too old: updated {updated_date.date()}")
-                    continue
-                print(f"  recent: updated {updated_date.date()}")
+            if not self.is_active(meta, cutoff_date):
+                continue
             readme_text = self.fetch_readme(owner, name)
-            combined_text = description + " " + readme_text
-            if not self.is_english(combined_text): # translate if not eng
-                print(f"  translating to english...")
-                description = self.translate_to_english(description)
-                readme_text = self.translate_to_english(readme_text)
-                combined_text = description + " " + readme_text
-            print(f"  english content")
-
-            repos.append({
-                "owner": owner,
-                "name": name,
-                "full_name": f"{owner}/{name}",
-                "description": description,
-                "language": language,
-                "topics": meta["topics"],
-                "stars_trending": stars_today,
-                "stars_total": meta["stars_total"],
-                "readme_text": readme_text,
-                "created_at": meta["created_at"],
-                "updated_at": meta["updated_at"],
-                "pushed_at": meta["pushed_at"],
-                "repo_url": f"https://github.com/{owner}/{name}"
-            })
+            fetched.append((item, meta, readme_text))
             print(f"  added to results")
+        repos = self.finish_records(fetched)
+        self.last_cache_report = self.cache.print_report()
+        return repos
+
+    # async mode: metadata + readme requests for every repo are fanned out on one
+    # keep-alive httpx client, with a semaphore per host bounding concurrency
+    def fetch_trending_async(self, max_per_host=8, max_connections=32):
+        return asyncio.run(self._fetch_trending_async(max_per_host, max_connections))
+
+    async def _fetch_trending_async(self, max_per_host, max_connections):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        host_limits = {}
+        pace_locks, next_send = {}, {}
+        async with httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True) as client:
+            async def pace(host): # one pacing decision at a time per host, each request reserves its own send slot
+                lock = pace_locks.setdefault(host, asyncio.Lock())
+                async with lock:
+                    now = time.monotonic()
+                    delay = self.cache.pace_delay()
+                    if self.cache.quota_exhausted(): # everyone queued waits for the same reset, not one window each
+                        send_at = max(now + delay, next_send.get(host, now))
+                    else:
+                        send_at = max(now, next_send.get(host, now)) + delay
+                    next_send[host] = send_at
+                if send_at > now:
+                    await asyncio.sleep(send_at - now)
+
+            async def get(url, headers=None, cached=True): # returns (status, text)
+                host = httpx.URL(url).host
+                if host not in host_limits:
+                    host_limits[host] = asyncio.Semaphore(max_per_host)
+                if cached and url.startswith(self.api_url):
+                    await pace(host) # before taking a connection slot, so waiting holds none
+                async with host_limits[host]:
+                    if not cached:
+                        r = await client.get(url, headers=headers)
+                        return r.status_code, r.text
+                    headers = {**(headers or {}), **self.cache.conditional_headers(url)}
+                    r = await client.get(url, headers=headers)
+                    return self.cache.resolve(url, r.status_code, r.headers, r.text)
+
+            self.cache.reset_stats()
+            _, html = await get(self.base_url, cached=False)
+            items = self.parse_trending(html)
+            cutoff_date = datetime.utcnow() - timedelta(days=self.active_days)
+            print(f"found {len(items)} trending repos")
+            fetched = await asyncio.gather(*(self._fetch_repo_async(get, item, cutoff_date) for item in items))
+
+        repos = self.finish_records([(item, *result) for item, result in zip(items, fetched) if result is not None])
+        print(f"added {len(repos)} repos to results")
+        self.last_cache_report = self.cache.print_report()
         return repos
 
+    async def _fetch_repo_async(self, get, item, cutoff_date):
+        owner, name = item["owner"], item["name"]
+        try:
+            status, text = await get(f"{self.api_url}/repos/{owner}/{name}", headers=self.github_headers())
+            if status != 200:
+                print(f"  {owner}/{name}: failed to fetch metadata")
+                return None
+            meta = self.parse_repo_metadata(json.loads(text))
+            if not self.is_active(meta, cutoff_date):
+                return None
+            for url in self.readme_urls(owner, name):
+                status, text = await get(url)
+                if status == 200:
+                    return meta, self.clean_readme(text)
+            return meta, ""
+        except httpx.HTTPError as e:
+            print(f"  {owner}/{name}: request failed: {e}")
+            return None
+
 # generate github authentication token
 # $env:GITHUB_TOKEN="ghp_your_token_here"
 # python scrape.py
 if __name__ == "__main__":
     github_token = os.getenv("GITHUB_TOKEN") # read from environment
     collector = GitHubTrendingCollector(period="daily", active_days=60, github_token=github_token) # period can be daily, weekly, or mo
-    data = collector.fetch_trending()
+    if os.getenv("GITHUB_ASYNC", "1") == "1": # set GITHUB_ASYNC=0 for the old one-repo-at-a-time mode
+        data = collector.fetch_trending_async()
+    else:
+        data = collector.fetch_trending()
     print(f"\n{'='*60}")
     print(f"active repos found: {len(data)}")
     print(f"{'='*60}")
@@ -172,5 +271,5 @@ if __name__ == "__main__":
         print(data[0])
         print(f"\nsaving to MongoDB...")
         db = MongoDBStorage()
-        db.save_github_repos(data)
+        db.save_github_repos(data, bulk=True)
         db.get_collection_stats()
\ No newline at end of file
@@ -1,7 +1,6 @@
-from pymongo import MongoClient
+from mongodb_storage import get_database
 
-client = MongoClient('mongodb://localhost:27017/')
-db = client['gen_eezes']
+db = get_database('gen_eezes')
 
 # Mark all users as subscribed
 result = db['users'].update_many({}, {'$set': {'subscribed': True}})
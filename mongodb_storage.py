@@ -1,28 +1,149 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from datetime import datetime
+import os
+import threading
+
+DEFAULT_MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+
+def _available_compressors(): # zstd/snappy need optional modules, zlib is always there
+    compressors = []
+    for name, module in (("zstd", "zstandard"), ("snappy", "snappy")):
+        try:
+            __import__(module)
+            compressors.append(name)
+        except ImportError:
+            pass
+    compressors.append("zlib")
+    return ",".join(compressors)
+
+# client options, override with env vars
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "compressors": os.getenv("MONGO_COMPRESSORS") or _available_compressors(),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "60000")),
+}
+
+_clients = {} # (pid, uri) -> MongoClient, one per process so forked workers don't share sockets
+_clients_lock = threading.Lock()
+_indexed_dbs = set() # (pid, db name) whose indexes were already ensured in this process
+
+def get_mongo_client(mongo_uri=None, **options): # shared, lazily created client for this process
+    """
+    Return the process-wide MongoClient for mongo_uri, creating it on first use.
+    Extra options only apply when the client is first created.
+    """
+    mongo_uri = mongo_uri or DEFAULT_MONGO_URI
+    key = (os.getpid(), mongo_uri.rstrip("/"))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = MongoClient(mongo_uri, **{**MONGO_CLIENT_OPTIONS, **options})
+                _clients[key] = client
+    return client
+
+def get_database(db_name="gen_eezes", mongo_uri=None): # database handle on the shared client
+    return get_mongo_client(mongo_uri)[db_name]
+
+def close_mongo_clients(): # close every client created by this process
+    with _clients_lock:
+        for key in [k for k in _clients if k[0] == os.getpid()]:
+            _clients.pop(key).close()
 
 class MongoDBStorage:
-    def __init__(self, db_name="gen_eezes", mongo_uri="mongodb://localhost:27017/"): # connect to mongodb
-        """Connect to MongoDB"""
-        self.client = MongoClient(mongo_uri)
+    def __init__(self, db_name="gen_eezes", mongo_uri=None): # connect to mongodb
+        """Connect to MongoDB (reuses the shared process-wide client)"""
+        self.client = get_mongo_client(mongo_uri)
         self.db = self.client[db_name]
         self.github_collection = self.db["github_repos"]
         self.arxiv_collection = self.db["arxiv_papers"]
         self.news_collection = self.db["tech_news"]
         self.users_collection = self.db["users"]
+        self.arxiv_watermarks = self.db["arxiv_watermarks"] # latest published date seen per category
         print(f"Connected to MongoDB database: {db_name}")
     
-    def create_indexes(self): # create indexes for faster queries
-        self.github_collection.create_index("full_name", unique=True)
+    def create_indexes(self): # create indexes for faster queries (idempotent)
+        self._create_key_index(self.github_collection, "full_name")
         self.github_collection.create_index("scraped_at")
-        self.arxiv_collection.create_index("arxiv_id", unique=True)
+        self._create_key_index(self.arxiv_collection, "arxiv_id")
         self.arxiv_collection.create_index("scraped_at")
+        self._create_key_index(self.news_collection, "hackernews_id")
+        self.news_collection.create_index("scraped_at")
         print(" indexes created")
+
+    def _create_key_index(self, collection, key_field): # unique upsert key, plain index if old runs left duplicates
+        try:
+            collection.create_index(key_field, unique=True)
+        except (DuplicateKeyError, OperationFailure) as e:
+            print(f"warning: {collection.name}.{key_field} is not unique yet (older duplicates?), "
+                  f"using a non-unique index: {e}")
+            collection.create_index(key_field)
+
+    def ensure_indexes(self): # create_indexes once per process and database
+        key = (os.getpid(), self.db.name)
+        if key not in _indexed_dbs:
+            self.create_indexes()
+            _indexed_dbs.add(key)
+
+    def _bulk_upsert(self, collection, docs, key_field, chunk_size=500): # upsert docs in unordered batches keyed on key_field
+        """
+        Upsert documents with unordered bulk_write batches of UpdateOne(..., upsert=True).
+        scraped_at is only set when a document is first inserted (first seen),
+        last_seen_at is bumped for every document in the batch.
+
+        Returns:
+            dict with inserted / updated / unchanged / errors counts
+        """
+        self.ensure_indexes() # every UpdateOne and the last_seen_at update look up key_field
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "errors": 0}
+        now = datetime.utcnow()
+        keys = []
+        ops = []
+        for doc in docs:
+            key = doc.get(key_field)
+            if key is None:
+                counts["errors"] += 1
+                continue
+            fields = {k: v for k, v in doc.items() if k not in ("_id", "scraped_at", "last_seen_at")}
+            ops.append(UpdateOne(
+                {key_field: key},
+                {"$set": fields, "$setOnInsert": {"scraped_at": now}},
+                upsert=True
+            ))
+            keys.append(key)
+        for start in range(0, len(ops), chunk_size):
+            chunk = ops[start:start + chunk_size]
+            try:
+                result = collection.bulk_write(chunk, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e: # unordered, so the rest of the chunk still went through
+                details = e.details
+                counts["errors"] += len(details.get("writeErrors", []))
+                for err in details.get("writeErrors", [])[:3]:
+                    print(f"error upserting {keys[start + err['index']]}: {err.get('errmsg')}")
+            upserted = details.get("nUpserted", 0)
+            matched = details.get("nMatched", 0)
+            modified = details.get("nModified", 0)
+            counts["inserted"] += upserted
+            counts["updated"] += modified
+            counts["unchanged"] += matched - modified
+        if keys: # one extra round-trip so the counts above only reflect content changes
+            collection.update_many({key_field: {"$in": keys}}, {"$set": {"last_seen_at": now}})
+        return counts
     
-    def save_github_repos(self, repos): # save github repos to mongodb
+    def save_github_repos(self, repos, bulk=False, chunk_size=500): # save github repos to mongodb
         if not repos:
             print("no repos to save")
             return
+        if bulk: # idempotent upsert keyed on full_name
+            counts = self._bulk_upsert(self.github_collection, repos, "full_name", chunk_size)
+            print(f" upserted {len(repos)} repos to mongodb: {counts}")
+            return counts
         for repo in repos:
             repo["scraped_at"] = datetime.utcnow()
             try:
@@ -31,10 +152,14 @@ class MongoDBStorage:
                 print(f"error saving {repo['full_name']}: {e}")
         print(f" saved {len(repos)} repos to mongodb")
     
-    def save_arxiv_papers(self, papers): # save arxiv papers to mongodb
+    def save_arxiv_papers(self, papers, bulk=False, chunk_size=500): # save arxiv papers to mongodb
         if not papers:
             print("no papers to save")
             return
+        if bulk: # idempotent upsert keyed on arxiv_id
+            counts = self._bulk_upsert(self.arxiv_collection, papers, "arxiv_id", chunk_size)
+            print(f" upserted {len(papers)} papers to mongodb: {counts}")
+            return counts
         for paper in papers:
             paper["scraped_at"] = datetime.utcnow()
             try:
@@ -47,6 +172,15 @@ class MongoDBStorage:
         repos = list(self.github_collection.find().sort("scraped_at", -1).limit(limit))
         return repos
     
+    def get_arxiv_watermarks(self): # category -> latest published datetime (naive utc)
+        return {doc["_id"]: doc["published"] for doc in self.arxiv_watermarks.find()}
+
+    def update_arxiv_watermarks(self, watermarks): # only ever moves a watermark forward
+        ops = [UpdateOne({"_id": category}, {"$max": {"published": published}}, upsert=True)
+               for category, published in watermarks.items() if published is not None]
+        if ops:
+            self.arxiv_watermarks.bulk_write(ops, ordered=False)
+
     def get_repos_by_language(self, language): # get repos by programming language
         repos = list(self.github_collection.find({"language": language}))
         return repos
@@ -63,10 +197,14 @@ class MongoDBStorage:
         print(f"arxiv papers stored: {arxiv_count}")
         print(f"{'='*60}\n")
     
-    def save_tech_news(self, news_items): # save tech news to mongodb
+    def save_tech_news(self, news_items, bulk=False, chunk_size=500): # save tech news to mongodb
         if not news_items:
             print("no news to save")
             return
+        if bulk: # idempotent upsert keyed on hackernews_id
+            counts = self._bulk_upsert(self.news_collection, news_items, "hackernews_id", chunk_size)
+            print(f"upserted {len(news_items)} news items to mongodb: {counts}")
+            return counts
         
         for news in news_items:
             news["scraped_at"] = datetime.utcnow()
@@ -77,6 +215,21 @@ class MongoDBStorage:
         
         print(f"saved {len(news_items)} news items to mongodb")
     
+    def update_news_scores(self, stories): # refresh score / comment counts of stories already stored
+        """
+        Update only score and comments for stored news, keyed on hackernews_id.
+        Never inserts, so a refresh can't bring back or rewrite anything else.
+
+        Returns:
+            number of documents whose counts changed
+        """
+        ops = [UpdateOne({"hackernews_id": story["id"]},
+                         {"$set": {"score": story.get("score", 0), "comments": story.get("descendants", 0)}})
+               for story in stories if story and story.get("id") is not None]
+        if not ops:
+            return 0
+        return self.news_collection.bulk_write(ops, ordered=False).modified_count
+    
     def get_recent_news(self, limit=10): # get most recently scraped news
         news = list(self.news_collection.find().sort("scraped_at", -1).limit(limit))
         return news
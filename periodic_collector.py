@@ -5,138 +5,306 @@ Maintains historical snapshots for temporal analysis
 """
 
 import sys
+import os
+import threading
+import time
 from pathlib import Path
 import importlib.util
 from datetime import datetime, timedelta
-from pymongo import MongoClient
-import json
+from bson import ObjectId
+from mongodb_storage import MongoDBStorage
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent / "github-trending-collector"))
 sys.path.insert(0, str(Path(__file__).parent / "arxiv-collector"))
 sys.path.insert(0, str(Path(__file__).parent / "tech-news-collector"))
 
+# source -> (collector folder, collector class)
+COLLECTORS = {
+    'github': ('github-trending-collector', 'GitHubTrendingCollector'),
+    'arxiv': ('arxiv-collector', 'ArxivCollector'),
+    'news': ('tech-news-collector', 'TechNewsCollector'),
+}
+_collector_classes = {}
+
+# snapshot source -> mongo collection
+SNAPSHOT_SOURCES = {
+    'github': 'github_repos',
+    'arxiv': 'arxiv_papers',
+    'news': 'tech_news',
+}
+
+
+def load_collector_class(source):
+    """Import a collector class from its scrape.py once per process"""
+    if source not in _collector_classes:
+        folder, class_name = COLLECTORS[source]
+        spec = importlib.util.spec_from_file_location(
+            f"{source}_scraper",
+            Path(__file__).parent / folder / "scrape.py"
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _collector_classes[source] = getattr(module, class_name)
+    return _collector_classes[source]
+
+SNAPSHOT_IDS_COLLECTION = 'data_collection_snapshot_ids'  # ids of deltas too large to keep inline
+DELTA_INLINE_IDS = 100000  # ~1.2MB of ObjectIds per document, far below mongo's 16MB limit
+
+
+def snapshot_window_end():
+    """
+    End of a snapshot window taken now. scraped_at is stored in utc with millisecond
+    precision; the current millisecond can still receive writes, so it is left to
+    the next window
+    """
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000) - timedelta(milliseconds=1)
+
+
+def build_snapshot_document(timestamp, counts, summary, delta, window_start, window_end):
+    """Snapshot layout shared by live collection and replayed backfills"""
+    return {
+        'timestamp': timestamp,
+        'week': timestamp.isocalendar()[1],
+        'github_count': counts['github'],
+        'arxiv_count': counts['arxiv'],
+        'news_count': counts['news'],
+        'total_documents': sum(counts.values()),
+        'data_summary': summary,
+        # documents first seen in (window_start, window_end], ids kept as ObjectIds (12 bytes each)
+        'delta': delta,
+        'window_start': window_start,
+        'window_end': window_end
+    }
+
+
+def save_snapshot(db, snapshot, replace_filter=None):
+    """
+    Insert a snapshot (or replace the one matching replace_filter). Deltas with more
+    than DELTA_INLINE_IDS ids are moved into chunk documents first, so neither the
+    snapshot nor a chunk can hit the document size limit.
+    """
+    chunks = []
+    for source, entry in snapshot['delta'].items():
+        ids = entry['ids']
+        if len(ids) <= DELTA_INLINE_IDS:
+            continue
+        key = ObjectId()
+        for seq, start in enumerate(range(0, len(ids), DELTA_INLINE_IDS)):
+            chunk = {'delta_key': key, 'source': source, 'seq': seq, 'ids': ids[start:start + DELTA_INLINE_IDS]}
+            if 'backfill_run' in snapshot:
+                chunk['backfill_run'] = snapshot['backfill_run']
+            chunks.append(chunk)
+        snapshot['delta'][source] = {'count': len(ids), 'ids': [], 'chunks_key': key}
+    if chunks:  # written before the snapshot that points at them
+        db[SNAPSHOT_IDS_COLLECTION].insert_many(chunks)
+    snapshots = db['data_collection_snapshots']
+    if replace_filter is None:
+        return snapshots.insert_one(snapshot).inserted_id
+    snapshots.replace_one(replace_filter, snapshot, upsert=True)
+    return snapshots.find_one(replace_filter, {'_id': 1})['_id']
+
+
+def delta_ids(db, entry):
+    """All ids of one source's delta, inline or spread over chunk documents"""
+    if 'chunks_key' not in entry:
+        return entry.get('ids', [])
+    ids = []
+    for chunk in db[SNAPSHOT_IDS_COLLECTION].find({'delta_key': entry['chunks_key']}).sort('seq', 1):
+        ids.extend(chunk['ids'])
+    return ids
+
 
 class PeriodicDataCollector:
     """Collects data periodically and maintains temporal snapshots"""
     
-    def __init__(self):
+    def __init__(self, collector_timeout=900):
         """Initialize collector and database connection"""
-        self.mongo_client = MongoClient('localhost', 27017)
-        self.db = self.mongo_client['gen_eezes']
-        self.snapshot_date = datetime.now()
+        self.storage = MongoDBStorage()
+        self.storage.ensure_indexes()  # the snapshot delta is a scraped_at range query
+        self.mongo_client = self.storage.client
+        self.db = self.storage.db
+        self.snapshot_date = datetime.utcnow()  # same clock as scraped_at and the backfilled snapshots
+        self.collector_timeout = collector_timeout  # seconds each collector gets
+        self.collection_results = {}
+        self.write_lock = threading.Lock()  # collectors save one at a time, never after a timeout
+        self.saved_sources = set()  # collectors of the current run that got to write
+    
+    def _fetch(self, source):
+        """Fetch with one collector, returns (collector, items, ids skipped before fetching)"""
+        collector_class = load_collector_class(source)
+        if source == 'github':
+            collector = collector_class(period="daily", active_days=60, github_token=os.getenv("GITHUB_TOKEN"))
+            return collector, collector.fetch_trending_async(), 0
+        if source == 'arxiv':
+            collector = collector_class(max_results=10, days_back=365)
+            return collector, collector.fetch_recent_papers_incremental(self.storage), 0
+        collector = collector_class(max_results=50, score_threshold=100)
+        items = collector.fetch_news_concurrent(db=self.storage)
+        return collector, items, collector.known_skipped  # stored HN ids dropped by the $in check
+    
+    def _save(self, source, collector, items):
+        """Bulk-upsert one collector's items, returns the write counts"""
+        if source == 'github':
+            counts = self.storage.save_github_repos(items, bulk=True)
+        elif source == 'arxiv':
+            counts = self.storage.save_arxiv_papers(items, bulk=True)
+            collector.commit_watermarks(self.storage)
+        else:
+            counts = self.storage.save_tech_news(items, bulk=True)
+        return counts or {}
+    
+    def run_collector(self, source, cancelled=None):
+        """
+        Run one collector, returns structured counts instead of raising.
         
-    def run_github_collector(self):
-        """Run GitHub trending collector"""
-        print("  📦 Collecting GitHub trending repositories...")
+        Args:
+            source: key of COLLECTORS
+            cancelled: threading.Event set once the collector has timed out; checked under
+                the write lock, so a cancelled collector never writes and no write is in
+                flight once the lock has been taken after setting it
+        """
+        result = {'source': source, 'fetched': 0, 'inserted': 0, 'updated': 0,
+                  'skipped': 0, 'errors': 0, 'duration': 0.0, 'error': None}
+        start = time.perf_counter()
         try:
-            # Import the GitHub scraper
-            spec = importlib.util.spec_from_file_location(
-                "github_scraper",
-                Path(__file__).parent / "github-trending-collector" / "scrape.py"
-            )
-            github_module = importlib.util.module_from_spec(spec)
-            
-            # Capture the scraper's output
-            initial_count = self.db['github_repos'].count_documents({})
-            spec.loader.exec_module(github_module)
-            final_count = self.db['github_repos'].count_documents({})
-            
-            collected = final_count - initial_count
-            print(f"    ✓ GitHub: {collected} new repos (total: {final_count})")
-            return collected
+            collector, items, skipped = self._fetch(source)
+            with self.write_lock:
+                if cancelled is not None and cancelled.is_set():
+                    raise TimeoutError(f"cancelled after {self.collector_timeout}s, {len(items)} items discarded")
+                counts = self._save(source, collector, items)
+                self.saved_sources.add(source)
+            result.update({
+                'fetched': len(items),
+                'inserted': counts.get('inserted', 0),
+                'updated': counts.get('updated', 0),
+                'skipped': skipped + counts.get('unchanged', 0),
+                'errors': counts.get('errors', 0),
+            })
         except Exception as e:
-            print(f"    ⚠ GitHub collector error: {e}")
-            return 0
+            print(f"    ⚠ {source} collector error: {e}")
+            result['error'] = str(e)
+        result['duration'] = round(time.perf_counter() - start, 2)
+        return result
     
-    def run_arxiv_collector(self):
+    def run_github_collector(self, cancelled=None):
+        """Run GitHub trending collector"""
+        print("  📦 Collecting GitHub trending repositories...")
+        return self.run_collector('github', cancelled)
+    
+    def run_arxiv_collector(self, cancelled=None):
         """Run arXiv papers collector"""
         print("  📚 Collecting arXiv papers...")
-        try:
-            spec = importlib.util.spec_from_file_location(
-                "arxiv_scraper",
-                Path(__file__).parent / "arxiv-collector" / "scrape.py"
-            )
-            arxiv_module = importlib.util.module_from_spec(spec)
-            
-            initial_count = self.db['arxiv_papers'].count_documents({})
-            spec.loader.exec_module(arxiv_module)
-            final_count = self.db['arxiv_papers'].count_documents({})
-            
-            collected = final_count - initial_count
-            print(f"    ✓ arXiv: {collected} new papers (total: {final_count})")
-            return collected
-        except Exception as e:
-            print(f"    ⚠ arXiv collector error: {e}")
-            return 0
+        return self.run_collector('arxiv', cancelled)
     
-    def run_news_collector(self):
+    def run_news_collector(self, cancelled=None):
         """Run tech news collector"""
         print("  📰 Collecting tech news...")
-        try:
-            spec = importlib.util.spec_from_file_location(
-                "news_scraper",
-                Path(__file__).parent / "tech-news-collector" / "scrape.py"
-            )
-            news_module = importlib.util.module_from_spec(spec)
-            
-            initial_count = self.db['tech_news'].count_documents({})
-            spec.loader.exec_module(news_module)
-            final_count = self.db['tech_news'].count_documents({})
-            
-            collected = final_count - initial_count
-            print(f"    ✓ Tech News: {collected} new articles (total: {final_count})")
-            return collected
-        except Exception as e:
-            print(f"    ⚠ News collector error: {e}")
-            return 0
+        return self.run_collector('news', cancelled)
     
     def collect_all_data(self):
-        """Run all collectors and aggregate into a snapshot"""
+        """Run all collectors concurrently and return per-source counts"""
         print("\n" + "="*80)
         print(f"PERIODIC DATA COLLECTION - {self.snapshot_date.strftime('%Y-%m-%d %H:%M:%S')}")
         print("="*80)
         
         print("\n📥 Running data collectors...")
-        github_count = self.run_github_collector()
-        arxiv_count = self.run_arxiv_collector()
-        news_count = self.run_news_collector()
+        runners = {
+            'github': self.run_github_collector,
+            'arxiv': self.run_arxiv_collector,
+            'news': self.run_news_collector,
+        }
+        # collectors are I/O bound, so threads are enough. Threads can't be killed: a
+        # collector that misses the deadline is cancelled (it skips its writes) and its
+        # daemon thread is abandoned, so neither this run nor interpreter exit waits on it
+        finished = {}
+        cancelled = threading.Event()
+        self.saved_sources = set()
+        threads = {}
+        for source, run in runners.items():
+            def target(source=source, run=run):
+                finished[source] = run(cancelled)
+            threads[source] = threading.Thread(target=target, name=f"{source}-collector", daemon=True)
+            threads[source].start()
+        deadline = time.perf_counter() + self.collector_timeout
+        for thread in threads.values():
+            thread.join(timeout=max(0, deadline - time.perf_counter()))
+        with self.write_lock:  # waits out a save that started before the deadline
+            cancelled.set()
+        for source in self.saved_sources:  # past their writes, only the result is left to hand back
+            threads[source].join()
+        results = {}
+        for source in runners:
+            if source in finished:
+                results[source] = finished[source]
+                continue
+            print(f"    ⚠ {source} collector timed out after {self.collector_timeout}s")
+            results[source] = {'source': source, 'fetched': 0, 'inserted': 0, 'updated': 0,
+                               'skipped': 0, 'errors': 0, 'duration': self.collector_timeout,
+                               'error': 'timeout'}
         
-        total_collected = github_count + arxiv_count + news_count
+        for source, result in results.items():
+            status = "✓" if not result['error'] else "⚠"
+            print(f"    {status} {source}: fetched {result['fetched']}, {result['inserted']} new, "
+                  f"{result['updated']} updated, {result['skipped']} skipped ({result['duration']}s)")
         
+        total_collected = sum(r['inserted'] for r in results.values())
         print(f"\n✅ Collection complete: {total_collected} new documents collected")
         
-        return total_collected
+        self.collection_results = results
+        return results
     
     def create_snapshot(self):
         """Create a temporal snapshot of current data state"""
         print("\n💾 Creating temporal snapshot...")
         
-        # Get current state from collections
-        github_data = list(self.db['github_repos'].find({}, {'_id': 1, 'title': 1, 'stars': 1}))
-        arxiv_data = list(self.db['arxiv_papers'].find({}, {'_id': 1, 'title': 1}))
-        news_data = list(self.db['tech_news'].find({}, {'_id': 1, 'title': 1}))
+        snapshots = self.db['data_collection_snapshots']
+        previous = snapshots.find_one({'window_end': {'$exists': True}}, {'window_end': 1}, sort=[('window_end', -1)])
+        window_start = previous['window_end'] if previous else None
+        window_end = snapshot_window_end()
         
-        snapshot = {
-            'timestamp': self.snapshot_date,
-            'week': self._get_week_number(),
-            'github_count': len(github_data),
-            'arxiv_count': len(arxiv_data),
-            'news_count': len(news_data),
-            'total_documents': len(github_data) + len(arxiv_data) + len(news_data),
-            'data_summary': {
-                'github': [{'id': str(doc.get('_id', '')), 'title': doc.get('title', '')} for doc in github_data[:5]],
-                'arxiv': [{'id': str(doc.get('_id', '')), 'title': doc.get('title', '')} for doc in arxiv_data[:5]],
-                'news': [{'id': str(doc.get('_id', '')), 'title': doc.get('title', '')} for doc in news_data[:5]]
-            }
-        }
+        # estimated counts + 5-doc samples + indexed scraped_at range for the delta,
+        # so cost follows the weekly intake instead of the corpus size
+        counts, summary, delta = {}, {}, {}
+        for source, collection_name in SNAPSHOT_SOURCES.items():
+            collection = self.db[collection_name]
+            counts[source] = collection.estimated_document_count()
+            summary[source] = [
+                {'id': str(doc['_id']), 'title': doc.get('title') or doc.get('full_name', '')}
+                for doc in collection.find({}, {'_id': 1, 'title': 1, 'full_name': 1}).limit(5)
+            ]
+            window = {'$lte': window_end}
+            if window_start:
+                window['$gt'] = window_start
+            new_ids = [doc['_id'] for doc in collection.find({'scraped_at': window}, {'_id': 1})]
+            delta[source] = {'count': len(new_ids), 'ids': new_ids}
+        
+        snapshot = build_snapshot_document(self.snapshot_date, counts, summary, delta, window_start, window_end)
+        if self.collection_results:
+            snapshot['collection_results'] = self.collection_results
         
         # Save to MongoDB
-        result = self.db['data_collection_snapshots'].insert_one(snapshot)
-        print(f"  ✓ Snapshot saved (ID: {result.inserted_id})")
+        snapshot_id = save_snapshot(self.db, snapshot)
+        print(f"  ✓ Snapshot saved (ID: {snapshot_id}, "
+              f"{sum(d['count'] for d in delta.values())} documents first seen since the last snapshot)")
         
         return snapshot
     
+    def get_corpus_as_of(self, timestamp):
+        """
+        Ids per source that existed at a snapshot timestamp (utc), rebuilt from the stored deltas.
+        Live snapshots taken before a replay backfill overlap its weeks, so ids are de-duplicated
+        """
+        corpus = {source: {} for source in SNAPSHOT_SOURCES}
+        cursor = self.db['data_collection_snapshots'].find(
+            {'timestamp': {'$lte': timestamp}, 'delta': {'$exists': True}}, {'delta': 1}
+        ).sort('window_end', 1)
+        for snapshot in cursor:
+            for source in SNAPSHOT_SOURCES:
+                corpus[source].update(dict.fromkeys(delta_ids(self.db, snapshot['delta'].get(source, {}))))
+        return {source: list(ids) for source, ids in corpus.items()}
+    
     def _get_week_number(self):
         """Get the ISO week number for the snapshot"""
         return self.snapshot_date.isocalendar()[1]
@@ -1,8 +1,7 @@
 """Quick script to check and update users"""
-from pymongo import MongoClient
+from mongodb_storage import get_database
 
-client = MongoClient('localhost', 27017)
-db = client['gen_eezes']
+db = get_database('gen_eezes')
 users_col = db['users']
 
 print("Current users:")
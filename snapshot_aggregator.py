@@ -8,10 +8,8 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from pymongo import MongoClient
+from mongodb_storage import get_mongo_client
 from datetime import datetime, timedelta
-from clustering_pipeline.clustering_handler import ClusteringHandler
-from embedding_pipeline.embedding_handler import EmbeddingHandler
 import numpy as np
 from collections import Counter
 
@@ -20,10 +18,26 @@ class SnapshotAggregator:
     """Aggregates collection snapshots and extracts temporal features"""
     
     def __init__(self):
-        self.mongo_client = MongoClient('localhost', 27017)
+        self.mongo_client = get_mongo_client()
         self.db = self.mongo_client['gen_eezes']
-        self.clustering_handler = ClusteringHandler()
-        self.embedding_handler = EmbeddingHandler()
+        self._clustering_handler = None
+        self._embedding_handler = None
+    
+    @property
+    def clustering_handler(self):
+        """Created on first use, aggregation itself never clusters"""
+        if self._clustering_handler is None:
+            from clustering_pipeline.clustering_handler import ClusteringHandler
+            self._clustering_handler = ClusteringHandler()
+        return self._clustering_handler
+    
+    @property
+    def embedding_handler(self):
+        """Created on first use, the model loads on the first encode"""
+        if self._embedding_handler is None:
+            from embedding_pipeline.embedding_handler import EmbeddingHandler
+            self._embedding_handler = EmbeddingHandler()
+        return self._embedding_handler
     
     def aggregate_snapshots(self):
         """Aggregate collection snapshots into temporal format"""
@@ -1,19 +1,28 @@
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import sys
 sys.path.insert(0, '..')
 from mongodb_storage import MongoDBStorage
 
 class TechNewsCollector:
-    def __init__(self, max_results=50, score_threshold=100): # collect tech news from hackernews
+    def __init__(self, max_results=50, score_threshold=100, max_workers=16, base_url="https://hacker-news.firebaseio.com/v0"): # collect tech news from hackernews
         self.max_results = max_results # num of stories to fetch
         self.score_threshold = score_threshold # min score to include story
-        self.base_url = "https://hacker-news.firebaseio.com/v0"
+        self.max_workers = max_workers # parallel item fetches in concurrent mode
+        self.base_url = base_url
+        self.session = requests.Session() # pooled keep-alive connections shared by the worker threads
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = 15
+        self.known_skipped = 0 # stored ids the last concurrent run didn't fetch again
     
     def fetch_top_stories(self): # fetch top story ids from HackerNews
         try:
             url = f"{self.base_url}/topstories.json"
-            story_ids = requests.get(url).json()
+            story_ids = self.session.get(url, timeout=self.timeout).json()
             return story_ids[:self.max_results * 2] # fetch extra to filter
         except Exception as e:
             print(f"error fetching top stories: {e}")
@@ -22,7 +31,7 @@ class TechNewsCollector:
     def fetch_story_details(self, story_id): # fetch details for a specific story
         try:
             url = f"{self.base_url}/item/{story_id}.json"
-            story = requests.get(url).json()
+            story = self.session.get(url, timeout=self.timeout).json()
             return story
         except Exception as e:
             print(f"error fetching story {story_id}: {e}")
@@ -38,8 +47,8 @@ class TechNewsCollector:
             "quantum", "5g", "iot", "automation", "framework",
             "library", "tool", "devops", "security", "cybersecurity"
         ]
-        title = story.get("title", "").lower()
-        url = story.get("url", "").lower()
+        title = (story.get("title") or "").lower()
+        url = (story.get("url") or "").lower()
         return any(keyword in title or keyword in url for keyword in tech_keywords)
     
     def fetch_news(self): # fetch and filter tech news from HackerNews
@@ -55,35 +64,77 @@ class TechNewsCollector:
                 continue
             fetched += 1
             print(f"  processing story {fetched}...", end="\r")
-            if story.get("score", 0) < self.score_threshold: # filter by score and tech relevance
+            if not self.keep_story(story):
                 continue
-            if not self.is_tech_related(story):
-                continue
-            if not story.get("url"): # skip stories with no url
-                continue
-            try:
-                timestamp = datetime.fromtimestamp(story.get("time", 0))
-            except:
-                timestamp = datetime.utcnow()
-            news_item = {
-                "hackernews_id": story.get("id"),
-                "title": story.get("title"),
-                "url": story.get("url"),
-                "score": story.get("score", 0),
-                "comments": story.get("descendants", 0),
-                "author": story.get("by", "Unknown"),
-                "published_at": timestamp.isoformat(),
-                "source": "HackerNews",
-                "story_type": story.get("type")
-            }
+            news_item = self.build_news_item(story)
             news.append(news_item)
             print(f"  added: {news_item['title'][:60]}...")
         print(f"\nProcessed {fetched} stories, found {len(news)} tech-related news items\n")
         return news
 
+    def keep_story(self, story): # filter by score, tech relevance and url
+        if story.get("score", 0) < self.score_threshold:
+            return False
+        if not self.is_tech_related(story):
+            return False
+        return bool(story.get("url")) # skip stories with no url
+
+    def build_news_item(self, story):
+        try:
+            timestamp = datetime.fromtimestamp(story.get("time", 0))
+        except:
+            timestamp = datetime.utcnow()
+        return {
+            "hackernews_id": story.get("id"),
+            "title": story.get("title"),
+            "url": story.get("url"),
+            "score": story.get("score", 0),
+            "comments": story.get("descendants", 0),
+            "author": story.get("by", "Unknown"),
+            "published_at": timestamp.isoformat(),
+            "source": "HackerNews",
+            "story_type": story.get("type")
+        }
+
+    def known_story_ids(self, db, story_ids): # one $in query for ids already in tech_news
+        if db is None or not story_ids:
+            return set()
+        cursor = db.news_collection.find({"hackernews_id": {"$in": list(story_ids)}}, {"hackernews_id": 1, "_id": 0})
+        return {doc["hackernews_id"] for doc in cursor}
+
+    def fetch_news_concurrent(self, db=None, refresh_known=False):
+        """
+        Fetch stories in parallel over the pooled session.
+        Ids already stored in db are skipped. With refresh_known=True they are
+        re-fetched too, but only their score / comment counts are updated in db;
+        the returned list holds new stories only.
+        """
+        print(f"\nfetching tech news from hackernews ({self.max_workers} workers)...")
+        story_ids = self.fetch_top_stories()
+        known = self.known_story_ids(db, story_ids)
+        to_fetch = [sid for sid in story_ids if refresh_known or sid not in known]
+        self.known_skipped = len(story_ids) - len(to_fetch)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            stories = list(executor.map(self.fetch_story_details, to_fetch)) # keeps ranking order
+        news = []
+        for story in stories:
+            if len(news) >= self.max_results:
+                break
+            if not story or story.get("id") in known or not self.keep_story(story):
+                continue
+            news.append(self.build_news_item(story))
+        refreshed = 0
+        if refresh_known and known:
+            refreshed = db.update_news_scores([s for s in stories if s and s.get("id") in known])
+        print(f"fetched {len(to_fetch)} stories ({len(known)} already stored, "
+              f"{'scores refreshed for ' + str(refreshed) if refresh_known else 'skipped'}), "
+              f"found {len(news)} new tech-related news items\n")
+        return news
+
 if __name__ == "__main__":
     collector = TechNewsCollector(max_results=50, score_threshold=100)
-    news = collector.fetch_news()
+    db = MongoDBStorage()
+    news = collector.fetch_news_concurrent(db=db)
     print(f"\n{'='*60}")
     print(f"fetched {len(news)} tech news items!")
     print(f"{'='*60}")
@@ -93,6 +144,5 @@ if __name__ == "__main__":
         print(f"  score: {news[0]['score']}")
         print(f"  url: {news[0]['url']}")
         print(f"\nsaving to mongodb...")
-        db = MongoDBStorage()
-        db.save_tech_news(news)
+        db.save_tech_news(news, bulk=True)
         db.get_collection_stats()
\ No newline at end of file
@@ -9,7 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from temporal_analysis_handler import TemporalAnalysisHandler
 from historical_data_generator import HistoricalDataGenerator
-from pymongo import MongoClient
+from mongodb_storage import get_mongo_client
 from datetime import datetime, timedelta
 from typing import Dict
 
@@ -24,7 +24,7 @@ class TemporalAnalysisPipeline:
         print("="*80)
         
         # MongoDB connection
-        self.mongo_client = MongoClient('mongodb://localhost:27017/')
+        self.mongo_client = get_mongo_client()
         self.db = self.mongo_client['gen_eezes']
         
         # Initialize handlers
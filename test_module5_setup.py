@@ -34,7 +34,7 @@ CURRENT SETUP STATUS:
 
 import os
 import json
-from pymongo import MongoClient
+from mongodb_storage import get_database
 
 # Check environment setup
 env_vars = {
@@ -74,8 +74,7 @@ for filepath in files_to_check:
 
 print("\n✓ MONGODB CHECK:")
 try:
-    client = MongoClient('localhost', 27017)
-    db = client['gen_eezes']
+    db = get_database('gen_eezes')
     
     # Check collections
     collections = {
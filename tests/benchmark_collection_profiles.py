@@ -0,0 +1,109 @@
+"""
+Recall vs latency of the collection profiles in qdrant_storage.COLLECTION_PROFILES
+(HNSW m / ef_construct, search ef, int8 quantization with rescoring, on-disk
+vectors). Each profile gets a scratch collection with the same vectors; recall@k
+is measured against exact numpy top-k, latency per single search, and the
+search-time ef can be swept to find where recall flattens out.
+
+HNSW and quantization only exist on a Qdrant server; the in-memory client
+searches exhaustively, so without --host every profile reports recall 1.0.
+
+    python tests/benchmark_collection_profiles.py --host localhost --docs 50000
+    python tests/benchmark_collection_profiles.py --host localhost --collection github_embeddings --ef 32 64 128 256
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import QdrantStorage, COLLECTION_PROFILES, resolve_profile, search_params
+from check_vector_recall import synthetic_vectors, stored_vectors, top_k
+
+
+def ram_bytes_per_point(profile, dim):
+    """Rough resident size: original vectors unless on disk, int8 copy, level-0 HNSW links."""
+    size = 0 if profile["on_disk"] else dim * 4
+    if profile["quantization"] == "int8":
+        size += dim
+    return size + profile["m"] * 2 * 4
+
+
+def wait_until_indexed(qdrant, timeout=600):
+    """HNSW is built in the background after the upsert; measure only once it's done."""
+    start = time.time()
+    while time.time() - start < timeout:
+        if qdrant.client.get_collection(qdrant.collection_name).status.value == "green":
+            return
+        time.sleep(1)
+    print(f"warning: {qdrant.collection_name} still optimizing after {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recall vs latency per collection profile")
+    parser.add_argument("--host", help="qdrant server host (default: in-memory client, no HNSW)")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--collection", help="use the vectors of this collection instead of a synthetic corpus")
+    parser.add_argument("--qdrant-path", default="./qdrant_storage", help="local storage holding --collection")
+    parser.add_argument("--docs", type=int, default=20000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--profiles", nargs="+", default=list(COLLECTION_PROFILES))
+    parser.add_argument("--ef", nargs="+", type=int, help="search-time ef values to sweep (default: each profile's ef)")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="exit non-zero if a profile's own ef is below this")
+    args = parser.parse_args()
+
+    if args.collection:
+        vectors = stored_vectors(args.qdrant_path, args.collection)
+    else:
+        vectors = synthetic_vectors(args.docs)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    exact = top_k(queries, vectors, args.k)
+    kwargs = {"host": args.host, "port": args.port} if args.host else {"use_memory": True}
+
+    rows = []
+    for name in args.profiles:
+        profile = resolve_profile(name)
+        qdrant = QdrantStorage(f"profile_benchmark_{name}", vectors.shape[1], profile=profile, **kwargs)
+        start = time.perf_counter()
+        qdrant.upsert_bulk(list(range(len(vectors))), vectors, [{}] * len(vectors), wait=True)
+        wait_until_indexed(qdrant)
+        build = time.perf_counter() - start
+
+        for ef in args.ef or [profile["ef"]]:
+            qdrant.search_params = search_params({**profile, "ef": ef})
+            latencies, recalls = [], []
+            for query, truth in zip(queries, exact):
+                t0 = time.perf_counter()
+                hits = qdrant.search(query, limit=args.k)
+                latencies.append(time.perf_counter() - t0)
+                recalls.append(len({hit["id"] for hit in hits} & set(truth.tolist())) / args.k)
+            rows.append({
+                "profile": name, "ef": ef, "own_ef": ef == profile["ef"], "build_s": build,
+                "recall": float(np.mean(recalls)),
+                "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+                "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+                "ram_bytes": ram_bytes_per_point(profile, vectors.shape[1]),
+            })
+        qdrant.delete_collection()
+
+    print(f"\n{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.k}, "
+          f"{'server ' + args.host if args.host else 'in-memory (exhaustive search)'}\n")
+    print(f"{'profile':<10} {'ef':>5} {'recall':>7} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8} {'RAM B/pt':>9}")
+    for row in rows:
+        print(f"{row['profile']:<10} {row['ef']:>5} {row['recall']:>7.3f} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['build_s']:>8.1f} {row['ram_bytes']:>9}")
+
+    below = [row["profile"] for row in rows if row["own_ef"] and row["recall"] < args.min_recall]
+    if below:
+        sys.exit(f"\nrecall below {args.min_recall}: {', '.join(below)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Synthetic and sampled text corpora shared by the embedding benchmarks
+(benchmark_embeddings.py, benchmark_onnx_backend.py).
+"""
+
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+WORDS = ("python rust go typescript library framework fast async database vector search model "
+         "training inference transformer embedding cluster pipeline agent api server browser "
+         "compiler kernel graph neural network dataset benchmark open source release tool cli "
+         "distributed storage streaming realtime secure lightweight scalable plugin runtime").split()
+
+
+def words(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def synthetic_corpus(n_docs, seed=0):
+    """Combined texts shaped like embed_all_data's github / arxiv / news inputs."""
+    from embedding_handler import EmbeddingHandler
+    from embed_all_data import FIELD_WEIGHTS
+
+    combine = EmbeddingHandler(cache_path=None).combine_fields  # no model load
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n_docs):
+        kind = ("github", "arxiv", "news")[i % 3]
+        if kind == "github":
+            fields = {"owner": f"owner{i}", "name": f"project-{i}", "description": words(rng, rng.randint(5, 25)),
+                      "readme": words(rng, 80)[:500], "topics": words(rng, rng.randint(0, 6))}
+        elif kind == "arxiv":
+            fields = {"title": words(rng, rng.randint(6, 16)), "abstract": words(rng, rng.randint(120, 250)),
+                      "categories": "cs.LG cs.AI"}
+        else:
+            fields = {"title": words(rng, rng.randint(5, 14)), "url": f"https://example.com/{i}",
+                      "author": f"user{i}"}
+        docs.append(combine(fields, weights=FIELD_WEIGHTS[kind]))
+    return docs
+
+
+def mongo_corpus(n_docs, seed=0):
+    """Combined texts for a random sample of the stored corpus."""
+    from mongodb_storage import get_database
+    from embedding_handler import EmbeddingHandler
+    from embed_all_data import (FIELD_WEIGHTS, GITHUB_PROJECTION, ARXIV_PROJECTION, NEWS_PROJECTION,
+                                github_entry, arxiv_entry, news_entry)
+
+    db = get_database("gen_eezes")
+    combine = EmbeddingHandler(cache_path=None).combine_fields
+    docs = []
+    sources = [("github", "github_repos", GITHUB_PROJECTION, github_entry),
+               ("arxiv", "arxiv_papers", ARXIV_PROJECTION, arxiv_entry),
+               ("news", "tech_news", NEWS_PROJECTION, news_entry)]
+    for kind, collection, projection, build_entry in sources:
+        sample = db[collection].aggregate([{"$sample": {"size": n_docs // 3 + 1}}, {"$project": projection}])
+        docs.extend(combine(build_entry(doc)[1], weights=FIELD_WEIGHTS[kind]) for doc in sample)
+    random.Random(seed).shuffle(docs)
+    return docs[:n_docs]
@@ -0,0 +1,183 @@
+"""
+Embedding throughput benchmark for EmbeddingHandler.
+
+Runs every combination of backend x batch size x thread count x cache mode on
+a synthetic corpus shaped like our repo / paper / news inputs (or a sample of
+the real MongoDB corpus) and reports docs/sec, tokens/sec, p50/p95 batch
+latency and peak RSS. Each combination runs in its own process so peak RSS is
+per configuration. Results go to JSON; --compare prints the change against an
+earlier results file.
+
+    python tests/benchmark_embeddings.py --docs 2000 --batch-sizes 32 128 auto --threads 1 4
+    python tests/benchmark_embeddings.py --corpus mongo --output after.json --compare before.json
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import resource  # unix only, peak RSS is reported as n/a elsewhere
+except ImportError:
+    resource = None
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from benchmark_corpus import synthetic_corpus, mongo_corpus
+
+
+def set_threads(backend, threads):
+    if backend == "torch":
+        import torch
+        torch.set_num_threads(threads)
+    else:
+        # onnxruntime fixes its thread count per session, so replace the shared model
+        import embedding_handler
+        from onnx_backend import OnnxEncoder
+        key = ("all-MiniLM-L6-v2", backend)
+        embedding_handler._shared_models[key] = OnnxEncoder(key[0], quantize=backend == "onnx-int8", threads=threads)
+
+
+def run_config(config, docs):
+    """One benchmark run (in a fresh process), returns the measurements."""
+    from embedding_handler import EmbeddingHandler
+
+    set_threads(config["backend"], config["threads"])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "cache.sqlite") if config["cache"] != "off" else None
+        handler = EmbeddingHandler(backend=config["backend"], cache_path=cache_path)
+        try:
+            return measure(config, handler, docs)
+        finally:
+            if handler.cache is not None:
+                handler.cache.conn.close()  # windows can't remove an open sqlite file
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macos, KB on linux
+
+
+def measure(config, handler, docs):
+    batch_size = None if config["batch_size"] == "auto" else int(config["batch_size"])
+    chunk = batch_size or 256  # "auto" sizes buckets inside each 256-doc call
+
+    handler.embed_batch(docs[:16], batch_size=batch_size)  # load model, warm up
+    if config["cache"] == "warm":
+        handler.embed_batch(docs, batch_size=batch_size)
+    tokens = sum(handler.token_lengths(docs))
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(docs), chunk):
+        t0 = time.perf_counter()
+        handler.embed_batch(docs[i:i + chunk], batch_size=batch_size)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    return {
+        **config,
+        "docs": len(docs),
+        "tokens": tokens,
+        "seconds": round(elapsed, 4),
+        "docs_per_sec": round(len(docs) / elapsed, 2),
+        "tokens_per_sec": round(tokens / elapsed, 1),
+        "batch_latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "batch_latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def config_key(result):
+    return (result["backend"], str(result["batch_size"]), result["threads"], result["cache"])
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {config_key(r): r for r in json.load(f)["results"]}
+    print(f"\nchange vs {baseline_path}:")
+    for result in results:
+        old = baseline.get(config_key(result))
+        if old:
+            change = result["docs_per_sec"] / old["docs_per_sec"] - 1
+            print(f"  {'/'.join(map(str, config_key(result))):<28} docs/sec {old['docs_per_sec']:>9.1f} -> "
+                  f"{result['docs_per_sec']:>9.1f} ({change:+.1%})")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EmbeddingHandler throughput benchmark")
+    parser.add_argument("--corpus", choices=["synthetic", "mongo"], default="synthetic")
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--backends", nargs="+", default=["torch"], help="torch, onnx, onnx-int8")
+    parser.add_argument("--batch-sizes", nargs="+", default=["32", "128", "auto"])
+    parser.add_argument("--threads", nargs="+", type=int, default=[os.cpu_count() or 1])
+    parser.add_argument("--cache", nargs="+", default=["off", "warm"], help="off, cold, warm")
+    parser.add_argument("--output", default="benchmark_embeddings.json")
+    parser.add_argument("--compare", help="earlier results file to compare docs/sec against")
+    parser.add_argument("--in-process", action="store_true", help="skip the per-config process (peak RSS becomes cumulative)")
+    args = parser.parse_args()
+
+    docs = synthetic_corpus(args.docs) if args.corpus == "synthetic" else mongo_corpus(args.docs)
+    configs = [
+        {"backend": b, "batch_size": bs, "threads": t, "cache": c}
+        for b, bs, t, c in itertools.product(args.backends, args.batch_sizes, args.threads, args.cache)
+    ]
+
+    print(f"{len(docs)} {args.corpus} docs, {len(configs)} configurations\n")
+    print(f"{'backend':<10} {'batch':>5} {'thr':>4} {'cache':>5} {'docs/s':>9} {'tok/s':>10} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'rss MB':>8}")
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for config in configs:
+        if args.in_process:
+            result = run_config(config, docs)
+        else:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_config, (config, docs))
+        results.append(result)
+        print(f"{result['backend']:<10} {result['batch_size']:>5} {result['threads']:>4} {result['cache']:>5} "
+              f"{result['docs_per_sec']:>9.1f} {result['tokens_per_sec']:>10.0f} {result['batch_latency_p50_ms']:>8.1f} "
+              f"{result['batch_latency_p95_ms']:>8.1f} {result['peak_rss_mb'] if result['peak_rss_mb'] is not None else 'n/a':>8}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "corpus": args.corpus,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+LocalVectorIndex (memory-mapped matrix + sqlite payloads) against the embedded
+Qdrant client through the same QdrantStorage API: ingest time, single and
+batched search latency, and a check that both return the same top-k (both
+search exactly, so any difference is a bug).
+
+    python tests/benchmark_local_index.py --docs 50000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import QdrantStorage
+from check_vector_recall import synthetic_vectors
+
+SOURCES = ["github", "arxiv", "news"]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local vector index vs embedded qdrant")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.docs)
+    queries = synthetic_vectors(args.queries, seed=1)
+    ids = list(range(len(vectors)))
+    payloads = [{"source": SOURCES[i % 3], "score": i % 500} for i in ids]
+
+    rows, results = [], {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in ("qdrant", "local"):
+            storage = QdrantStorage("benchmark_local_index", vectors.shape[1], backend=backend,
+                                    path=str(Path(workdir) / backend))
+            _, ingest = timed(lambda: storage.upsert_bulk(ids, vectors, payloads, chunk_size=1000, wait=True))
+            single, single_time = timed(lambda: [storage.search(q, limit=args.k) for q in queries])
+            filtered, filtered_time = timed(lambda: [storage.search(q, limit=args.k, filter_dict={"source": "news"})
+                                                     for q in queries])
+            _, batch_time = timed(lambda: storage.search_batch(queries, limit=args.k))
+            results[backend] = (single, filtered)
+            rows.append((backend, ingest, single_time, filtered_time, batch_time))
+            storage.client.close()
+
+    same = all(
+        [r["id"] for r in a] == [r["id"] for r in b]
+        for a, b in zip(results["qdrant"][0] + results["qdrant"][1], results["local"][0] + results["local"][1])
+    )
+
+    n = len(queries)
+    print(f"\n{len(vectors)} vectors x {vectors.shape[1]} dims, {n} queries, top-{args.k}\n")
+    print(f"{'backend':<8} {'ingest s':>9} {'search ms':>10} {'filtered ms':>12} {'batch ms/q':>11}")
+    for backend, ingest, single_time, filtered_time, batch_time in rows:
+        print(f"{backend:<8} {ingest:>9.2f} {single_time / n * 1000:>10.2f} "
+              f"{filtered_time / n * 1000:>12.2f} {batch_time / n * 1000:>11.2f}")
+    print(f"\nidentical results: {'yes' if same else 'NO'}")
+    if not same:
+        sys.exit("local index results differ from qdrant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the torch and onnxruntime embedding backends: docs/sec and cosine
+similarity of every vector to the torch one (tolerances in onnx_backend.py).
+
+    python tests/benchmark_onnx_backend.py --docs 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from benchmark_corpus import synthetic_corpus
+from embedding_handler import EmbeddingHandler
+from onnx_backend import COSINE_TOLERANCE
+
+
+def run_backend(backend, docs, repeats):
+    handler = EmbeddingHandler(backend=backend, cache_path=None)
+    handler.embed_batch(docs[:32])  # warm-up
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        vectors = handler.embed_batch(docs)
+        best = min(best, time.perf_counter() - start)
+    return vectors, len(docs) / best
+
+
+def cosine_rows(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"])
+    args = parser.parse_args()
+
+    docs = synthetic_corpus(args.docs)
+    reference, torch_rate = run_backend("torch", docs, args.repeats)
+    print(f"\n{'backend':<10} {'docs/sec':>10} {'speedup':>8} {'min cos':>9} {'mean cos':>9}  ok")
+    print(f"{'torch':<10} {torch_rate:>10.1f} {1.0:>8.2f} {1.0:>9.5f} {1.0:>9.5f}  -")
+
+    failed = []
+    for backend in args.backends:
+        vectors, rate = run_backend(backend, docs, args.repeats)
+        cosines = cosine_rows(reference, vectors)
+        ok = cosines.min() >= COSINE_TOLERANCE[backend]
+        if not ok:
+            failed.append(backend)
+        print(f"{backend:<10} {rate:>10.1f} {rate / torch_rate:>8.2f} {cosines.min():>9.5f} {cosines.mean():>9.5f}  {'yes' if ok else 'NO'}")
+
+    if failed:
+        sys.exit(f"\noutside cosine tolerance: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
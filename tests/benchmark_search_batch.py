@@ -0,0 +1,81 @@
+"""
+Batched search (QdrantStorage.search_batch, one request per batch of queries)
+against the looped single-query path (QdrantStorage.search per query):
+queries/sec for both, and a check that they return the same results.
+
+    python tests/benchmark_search_batch.py                       # in-memory qdrant
+    python tests/benchmark_search_batch.py --host localhost      # qdrant server, where round-trips dominate
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import QdrantStorage
+from check_vector_recall import synthetic_vectors
+
+SOURCES = ["github", "arxiv", "news"]
+
+
+def build_collection(args, vectors):
+    kwargs = {"host": args.host, "port": args.port} if args.host else {"use_memory": True}
+    qdrant = QdrantStorage("benchmark_search_batch", vectors.shape[1], **kwargs)
+    payloads = [{"source": SOURCES[i % 3], "score": i % 500} for i in range(len(vectors))]
+    qdrant.upsert_bulk(list(range(len(vectors))), vectors, payloads, wait=True)
+    return qdrant
+
+
+def best_time(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        results = fn()
+        best = min(best, time.perf_counter() - start)
+    return results, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="search_batch vs looped search")
+    parser.add_argument("--host", help="qdrant server host (default: in-memory client)")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--docs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--filtered", action="store_true", help="give every query a per-source filter")
+    args = parser.parse_args()
+
+    vectors = synthetic_vectors(args.docs)
+    qdrant = build_collection(args, vectors)
+    queries = synthetic_vectors(args.queries, seed=1)
+    filters = [{"source": SOURCES[i % 3]} for i in range(len(queries))] if args.filtered else None
+
+    looped, loop_time = best_time(
+        lambda: [qdrant.search(q, limit=args.limit, filter_dict=filters[i] if filters else None)
+                 for i, q in enumerate(queries)],
+        args.repeats
+    )
+    batched, batch_time = best_time(
+        lambda: qdrant.search_batch(queries, limit=args.limit, filters=filters),
+        args.repeats
+    )
+    same = all([r["id"] for r in a] == [r["id"] for r in b] for a, b in zip(looped, batched))
+
+    print(f"\n{args.docs} points, {len(queries)} queries, top-{args.limit}"
+          f"{', filtered' if args.filtered else ''}, {'server ' + args.host if args.host else 'in-memory'}\n")
+    print(f"{'path':<14} {'seconds':>8} {'queries/s':>10}")
+    print(f"{'looped search':<14} {loop_time:>8.3f} {len(queries) / loop_time:>10.1f}")
+    print(f"{'search_batch':<14} {batch_time:>8.3f} {len(queries) / batch_time:>10.1f}")
+    print(f"\nspeedup: {loop_time / batch_time:.2f}x, identical results: {'yes' if same else 'NO'}")
+
+    qdrant.delete_collection()
+    if not same:
+        sys.exit("batched results differ from looped search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Recall of compact vector storage (float16 / truncated dimensions) against full
+float32, measured as exact top-k overlap with the same queries.
+
+    python tests/check_vector_recall.py                                # synthetic corpus
+    python tests/check_vector_recall.py --collection github_embeddings # stored vectors
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import compact_vectors
+
+# (datatype, dims) pairs checked by default
+DEFAULT_CONFIGS = ["float16", "float32:256", "float16:256", "float16:128"]
+
+
+def synthetic_vectors(n, dim=384, n_topics=40, seed=0):
+    """Unit vectors around topic centres, roughly how sentence embeddings cluster."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, n_topics, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def stored_vectors(qdrant_path, collection):
+    from qdrant_client import QdrantClient
+    client = QdrantClient(path=qdrant_path, prefer_grpc=False)
+    vectors, offset = [], None
+    while True:
+        points, offset = client.scroll(collection, limit=1000, offset=offset, with_vectors=True, with_payload=False)
+        vectors.extend(point.vector for point in points)
+        if offset is None:
+            break
+    client.close()
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def top_k(queries, vectors, k):
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall_at_k(vectors, queries, datatype, dims, k):
+    """Stored side compacted like QdrantStorage does, queries stay float32 (truncated only)."""
+    exact = top_k(queries, vectors, k)
+    stored = compact_vectors(vectors, dims, datatype).astype(np.float32)
+    approx = top_k(compact_vectors(queries, dims), stored, k)
+    return np.mean([len(set(a) & set(e)) / k for a, e in zip(approx, exact)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recall of compact vector storage vs float32")
+    parser.add_argument("--collection", help="read vectors from this qdrant collection instead of a synthetic corpus")
+    parser.add_argument("--qdrant-path", default="./qdrant_storage")
+    parser.add_argument("--docs", type=int, default=5000, help="synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS, help="datatype[:dims] entries")
+    parser.add_argument("--min-recall", type=float, default=0.0, help="exit non-zero below this recall")
+    args = parser.parse_args()
+
+    if args.collection:
+        vectors = stored_vectors(args.qdrant_path, args.collection)
+    else:
+        vectors = synthetic_vectors(args.docs)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    full_bytes = vectors.shape[1] * 4
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, recall@{args.k}\n")
+    print(f"{'config':<14} {'bytes/point':>11} {'saving':>7} {'recall':>7}")
+    print(f"{'float32':<14} {full_bytes:>11} {1.0:>6.1f}x {1.0:>7.3f}")
+    failed = False
+    for config in args.configs:
+        datatype, _, dims = config.partition(":")
+        dims = int(dims) if dims else None
+        size = (dims or vectors.shape[1]) * np.dtype(datatype).itemsize
+        recall = recall_at_k(vectors, queries, datatype, dims, args.k)
+        failed |= recall < args.min_recall
+        print(f"{config:<14} {size:>11} {full_bytes / size:>6.1f}x {recall:>7.3f}")
+
+    if failed:
+        sys.exit(f"\nrecall below {args.min_recall}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Shared pytest fixtures: mongodb_storage on a fresh in-memory mongomock client per test."""
+
+import sys
+from pathlib import Path
+
+import mongomock
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import mongodb_storage
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """
+    Point mongodb_storage at mongomock with empty client / index registries.
+    Everything is restored when the test ends, so no state leaks between modules.
+    """
+    monkeypatch.setattr(mongodb_storage, "MongoClient", mongomock.MongoClient)
+    monkeypatch.setattr(mongodb_storage, "_clients", {})
+    monkeypatch.setattr(mongodb_storage, "_indexed_dbs", set())
+    return mongodb_storage
+
+
+@pytest.fixture
+def storage(mongo):
+    """MongoDBStorage on the test database."""
+    return mongo.MongoDBStorage(db_name="test_gen_eezes")
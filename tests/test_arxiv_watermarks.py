@@ -0,0 +1,127 @@
+"""Check the arXiv collector's per-category watermarks against a fake arXiv client and mongomock."""
+
+import importlib.util
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def load_collector_module():
+    """Import the arxiv collector from the hyphenated collector folder."""
+    spec = importlib.util.spec_from_file_location("arxiv_scraper", ROOT / "arxiv-collector" / "scrape.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def paper(i, hours_ago):
+    return SimpleNamespace(
+        get_short_id=lambda: f"2401.{i:05d}", title=f"paper {i}", summary="abstract", authors=[],
+        categories=["cs.LG"], published=NOW - timedelta(hours=hours_ago), pdf_url="", entry_id=f"id{i}",
+    )
+
+
+def install_fake_client(module, feed, monkeypatch):
+    """arxiv.Client serving feed newest first, honouring max_results; records results read and clients made."""
+    reads, clients = [], []
+
+    class FakeClient:
+        def __init__(self, **kwargs):
+            clients.append(self)
+
+        def results(self, search):
+            ordered = sorted(feed, key=lambda r: r.published, reverse=True)
+            for n, result in enumerate(ordered):
+                if search.max_results is not None and n >= search.max_results:
+                    return
+                reads.append(result)
+                yield result
+
+    monkeypatch.setattr(module.arxiv, "Client", FakeClient)
+    return reads, clients
+
+
+def naive(when):
+    return when.replace(tzinfo=None)
+
+
+def test_watermark_advances_to_newest_and_stops_paging(storage, monkeypatch):
+    module = load_collector_module()
+    feed = [paper(i, hours_ago=i) for i in range(1, 6)] + [paper(99, hours_ago=24 * 5)]
+    install_fake_client(module, feed, monkeypatch)
+    collector = module.ArxivCollector(max_results=100, days_back=30, categories=["cat:cs.LG"])
+
+    first = collector.fetch_recent_papers_incremental(storage)
+    collector.commit_watermarks(storage)
+    assert len(first) == 6
+    assert storage.get_arxiv_watermarks()["cs.LG"] == naive(NOW - timedelta(hours=1))
+
+    reads, _ = install_fake_client(module, feed + [paper(0, hours_ago=0)], monkeypatch) # one newer paper
+    second = collector.fetch_recent_papers_incremental(storage)
+    collector.commit_watermarks(storage)
+    # everything inside the lookback comes back too, the bulk upsert leaves it unchanged
+    assert sorted(p["arxiv_id"] for p in second) == [f"2401.{i:05d}" for i in range(6)]
+    assert len(reads) == 7 # then the 5-day-old paper, past the lookback, stops paging
+    assert storage.get_arxiv_watermarks()["cs.LG"] == naive(NOW)
+
+
+def test_late_announcements_inside_the_lookback_are_fetched(storage, monkeypatch):
+    """A paper showing up after the watermark moved past its published date is still collected."""
+    module = load_collector_module()
+    storage.update_arxiv_watermarks({"cs.LG": naive(NOW - timedelta(hours=20))})
+    install_fake_client(module, [paper(1, hours_ago=20), paper(2, hours_ago=30)], monkeypatch)
+    collector = module.ArxivCollector(max_results=100, days_back=30, categories=["cat:cs.LG"])
+
+    papers = collector.fetch_recent_papers_incremental(storage)
+    collector.commit_watermarks(storage)
+    assert "2401.00002" in [p["arxiv_id"] for p in papers]
+    assert storage.get_arxiv_watermarks()["cs.LG"] == naive(NOW - timedelta(hours=20))
+
+
+def test_seed_run_is_capped_and_advances_to_newest(storage, monkeypatch):
+    """max_results caps a category's first run; the watermark still moves to the newest paper."""
+    module = load_collector_module()
+    install_fake_client(module, [paper(i, hours_ago=i) for i in range(1, 11)], monkeypatch)
+    collector = module.ArxivCollector(max_results=4, days_back=30, categories=["cat:cs.LG"])
+
+    papers = collector.fetch_recent_papers_incremental(storage)
+    collector.commit_watermarks(storage)
+    assert len(papers) == 4
+    assert storage.get_arxiv_watermarks()["cs.LG"] == naive(NOW - timedelta(hours=1))
+
+
+def test_categories_with_a_watermark_are_not_capped(storage, monkeypatch):
+    """Once a category has a watermark, a burst of more than max_results papers is still fetched in full."""
+    module = load_collector_module()
+    storage.update_arxiv_watermarks({"cs.LG": naive(NOW - timedelta(hours=20))})
+    install_fake_client(module, [paper(i, hours_ago=i) for i in range(1, 16)], monkeypatch)
+    collector = module.ArxivCollector(max_results=4, days_back=30, categories=["cat:cs.LG"])
+
+    papers = collector.fetch_recent_papers_incremental(storage)
+    collector.commit_watermarks(storage)
+    assert len(papers) == 15
+    assert storage.get_arxiv_watermarks()["cs.LG"] == naive(NOW - timedelta(hours=1))
+
+
+def test_categories_share_one_client(storage, monkeypatch):
+    """One client paces every request (arXiv asks for one every 3 seconds), categories run in turn."""
+    module = load_collector_module()
+    _, clients = install_fake_client(module, [paper(i, hours_ago=i) for i in range(1, 4)], monkeypatch)
+    collector = module.ArxivCollector(max_results=10, days_back=30, categories=["cat:cs.LG", "cat:cs.AI", "cat:cs.CL"])
+
+    papers = collector.fetch_recent_papers_incremental(storage)
+    assert len(clients) == 1
+    assert len(papers) == 3 # cross-listed in every category, stored once
+    assert set(collector.pending_watermarks) == {"cs.LG", "cs.AI", "cs.CL"}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,112 @@
+"""Check EmbeddingHandler.embed_batch's length-bucketed batching and encoding pool against a fake model."""
+
+import multiprocessing
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+import embedding_handler
+from embedding_handler import EmbeddingHandler
+
+MODEL = "fake-batching-model"
+TOKEN_BUDGET = 120
+
+
+def fake_vectors(texts):
+    """Module level, so spawned workers can import it."""
+    return np.array([[len(t), len(t.split())] for t in texts], dtype=np.float32).reshape(-1, 2)
+
+
+class FakeModel:
+    """2-dim encoder: vector = [len(text), word count], records every batch it gets."""
+
+    def __init__(self):
+        self.batches = []
+        self.chunks = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        self.batches.append(list(texts))
+        return fake_vectors(texts)
+
+    def start_multi_process_pool(self, target_devices):
+        return multiprocessing.get_context("spawn").Pool(len(target_devices))
+
+    def stop_multi_process_pool(self, pool):
+        pool.terminate()
+        pool.join()
+
+    def encode_multi_process(self, texts, pool, batch_size=32, chunk_size=None):
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        self.chunks.extend(chunks)
+        return np.vstack(pool.map(fake_vectors, chunks))  # map hands results back in chunk order
+
+
+def make_handler():
+    model = FakeModel()
+    embedding_handler._shared_models[(MODEL, "torch")] = model
+    handler = EmbeddingHandler(model_name=MODEL, cache_path=None)
+    handler.token_budget = lambda memory_fraction=0.25: TOKEN_BUDGET
+    return handler, model
+
+
+def mixed_texts(n=60, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(["word"] * rng.choice([1, 2, 5, 20, 60])) for _ in range(n)]
+
+
+def test_bucketed_output_keeps_input_order():
+    handler, _ = make_handler()
+    texts = mixed_texts()
+    texts[7] = "   "
+
+    vectors = handler.embed_batch(texts)
+
+    expected = [[len(t), len(t.split())] if t.strip() else [0, 0] for t in texts]
+    assert vectors.dtype == np.float32
+    assert vectors.tolist() == expected
+
+
+def test_batches_stay_under_the_token_budget():
+    handler, model = make_handler()
+    texts = mixed_texts()
+
+    handler.embed_batch(texts)
+
+    assert sorted(t for batch in model.batches for t in batch) == sorted(texts)
+    previous = 0
+    for batch in model.batches:
+        lengths = handler.token_lengths(batch)
+        assert min(lengths) >= previous  # buckets come in length order
+        if len(batch) > 1:  # a single text longer than the budget still gets its own batch
+            assert len(batch) * max(lengths) <= TOKEN_BUDGET
+        previous = max(lengths)
+    assert len(model.batches) < len(texts)  # short texts are grouped
+
+
+def test_pool_matches_single_process_output():
+    handler, model = make_handler()
+    texts = mixed_texts(n=200, seed=1)
+    expected = handler.embed_batch(texts)
+
+    handler.start_pool(processes=2)
+    try:
+        pooled = handler.embed_batch(texts)
+    finally:
+        handler.stop_pool()
+
+    assert len(model.chunks) > 1
+    assert np.array_equal(pooled, expected)
+
+
+if __name__ == "__main__":
+    test_bucketed_output_keeps_input_order()
+    test_batches_stay_under_the_token_budget()
+    test_pool_matches_single_process_output()
@@ -0,0 +1,144 @@
+"""
+Check EmbeddingHandler's cache hit / miss paths (a fully cached batch must not load the model)
+and float16 storage in the cache and the local index.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+import embedding_handler
+from embed_all_data import pipeline_from_env
+from embedding_cache import EmbeddingCache
+from embedding_handler import EmbeddingHandler
+
+MODEL = "fake-cache-model"
+KEY = (MODEL, "torch")
+
+
+class FakeModel:
+    """4-dim encoder: vector = [len(text)] * 4, records every text it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return 4
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        self.encoded.extend(texts)
+        return np.array([[len(t)] * 4 for t in texts], dtype=np.float32)
+
+
+def make_handler(cache_dtype="float32"):
+    model = FakeModel()
+    embedding_handler._shared_models[KEY] = model
+    return EmbeddingHandler(model_name=MODEL, cache_path=":memory:", cache_dtype=cache_dtype), model
+
+
+def unload_model():
+    """Any further model access would try to import sentence_transformers and fail."""
+    embedding_handler._shared_models.pop(KEY, None)
+
+
+def test_misses_are_encoded_and_cached():
+    handler, model = make_handler()
+    vectors = handler.embed_batch(["alpha", "", "gamma ray"])
+
+    assert model.encoded == ["alpha", "gamma ray"]
+    assert vectors.shape == (3, 4)
+    assert vectors[1].tolist() == [0, 0, 0, 0]
+    assert handler.cache.stats == {"hits": 0, "misses": 2, "evicted": 0}
+
+
+def test_full_hit_never_touches_the_model():
+    handler, model = make_handler()
+    first = handler.embed_batch(["alpha", "gamma ray"])
+    unload_model()
+
+    second = handler.embed_batch(["gamma ray", "", "alpha"])
+
+    assert KEY not in embedding_handler._shared_models
+    assert np.array_equal(second, np.stack([first[1], np.zeros(4), first[0]]))
+
+
+def test_partial_hit_encodes_only_misses():
+    handler, model = make_handler()
+    handler.embed_batch(["alpha"])
+    model.encoded.clear()
+
+    vectors = handler.embed_batch(["alpha", "beta two"])
+
+    assert model.encoded == ["beta two"]
+    assert vectors[:, 0].tolist() == [5, 8]
+
+
+def test_float16_cache_returns_float32():
+    handler, _ = make_handler(cache_dtype="float16")
+    handler.embed_batch(["alpha"])
+    unload_model()
+
+    vectors = handler.embed_batch(["alpha"])
+    assert vectors.dtype == np.float32
+    assert vectors[0].tolist() == [5, 5, 5, 5]
+
+
+def test_cached_fields_fuse_without_the_model():
+    handler, _ = make_handler()
+    documents = [{"title": "alpha", "body": "gamma ray"}]
+    first = handler.embed_fields_batch(documents)
+    handler.field_cache.clear()  # force the embedding cache path
+    unload_model()
+
+    assert np.allclose(handler.embed_fields_batch(documents), first)
+
+
+def test_float16_cache_round_trip(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((20, 384)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"text {i}" for i in range(len(vectors))]
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), dtype="float16")
+    cache.put_many(MODEL, texts, vectors)
+
+    hits = cache.get_many(MODEL, texts)
+    assert all(v.dtype == np.float32 for v in hits.values())
+    assert np.allclose(np.stack([hits[i] for i in range(len(texts))]), vectors, atol=1e-3)
+    blob = cache.conn.execute("SELECT vector FROM embeddings LIMIT 1").fetchone()[0]
+    assert len(blob) == 384 * 2
+
+    # blobs of the other precision can't be read back, reopening as float32 clears them
+    reopened = EmbeddingCache(str(tmp_path / "cache.sqlite"), dtype="float32")
+    assert reopened.size == 0 and reopened.get_many(MODEL, texts) == {}
+
+
+def test_env_cache_dtype_reaches_cache_and_local_index(mongo, monkeypatch, tmp_path):
+    monkeypatch.setenv("EMBED_CACHE_DTYPE", "float16")
+    monkeypatch.setenv("EMBED_VECTOR_CONFIG", '{"news": {"datatype": "float16"}}')
+    embedding_handler._shared_models[KEY] = FakeModel()
+    pipeline = pipeline_from_env(mongodb_db_name="test_gen_eezes", embedder_model=MODEL, stream=False,
+                                 vector_store="local", local_index_path=str(tmp_path / "index"),
+                                 cache_path=str(tmp_path / "cache.sqlite"))
+    pipeline.db.save_tech_news([{"hackernews_id": i, "title": f"story {i}", "url": f"https://example.com/{i}"}
+                                for i in range(3)], bulk=True)
+    assert pipeline.embed_tech_news() == 3
+
+    assert pipeline.embedder.cache.dtype == np.float16
+    assert pipeline.embedder.cache.size == 3
+    assert (tmp_path / "index" / "news_embeddings" / "vectors.f16").exists()
+    exported, _, _ = pipeline.qdrant_client.export("news_embeddings")
+    assert exported.dtype == np.float32
+    assert np.allclose(exported, 0.5)  # [len] * 4 normalised, exact in float16
+    pipeline.qdrant_client.close()
+
+
+if __name__ == "__main__":
+    test_misses_are_encoded_and_cached()
+    test_full_hit_never_touches_the_model()
+    test_partial_hit_encodes_only_misses()
+    test_float16_cache_returns_float32()
+    test_cached_fields_fuse_without_the_model()
@@ -0,0 +1,134 @@
+"""Check EmbeddingPipeline's checksum sync (skip unchanged, re-embed changed, delete removed) on mongomock + in-memory qdrant."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+import embedding_handler
+from embed_all_data import EmbeddingPipeline
+from qdrant_storage import stable_point_id
+
+MODEL = "fake-test-model"
+
+
+class FakeModel:
+    """Deterministic 8-dim encoder that counts what it encodes."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        self.encoded.extend(texts)
+        rng = [np.random.default_rng(abs(hash(t)) % 2**32) for t in texts]
+        return np.array([r.random(8) for r in rng], dtype=np.float32)
+
+
+def make_pipeline(stream, model_name=MODEL, client=None):
+    model = FakeModel()
+    embedding_handler._shared_models[(model_name, "torch")] = model
+    pipeline = EmbeddingPipeline(mongodb_db_name="test_gen_eezes", qdrant_path=None, embedder_model=model_name,
+                                 stream=stream, stream_batch_size=2, cache_path=None)
+    if client is not None:  # continue on an earlier run's vectors
+        pipeline.qdrant_news.client = client
+    return pipeline, model
+
+
+def news(i, title=None):
+    return {"hackernews_id": i, "title": title or f"story number {i}", "url": f"https://example.com/{i}",
+            "score": 100 + i, "comments": i, "author": "someone"}
+
+
+def check_sync(stream):
+    pipeline, model = make_pipeline(stream)
+    pipeline.db.save_tech_news([news(i) for i in range(1, 6)], bulk=True)
+
+    assert pipeline.embed_tech_news() == 5
+    assert pipeline.sync_stats["news"] == {"new": 5, "changed": 0, "metadata": 0, "unchanged": 0, "deleted": 0}
+
+    model.encoded.clear()
+    assert pipeline.embed_tech_news() == 0
+    assert model.encoded == []
+    assert pipeline.sync_stats["news"]["unchanged"] == 5
+
+    pipeline.db.save_tech_news([news(1, title="story number 1, updated")], bulk=True)
+    pipeline.db.news_collection.delete_one({"hackernews_id": 5})
+    assert pipeline.embed_tech_news() == 1
+    assert len(model.encoded) == 1 and "updated" in model.encoded[0]
+    assert pipeline.sync_stats["news"] == {"new": 0, "changed": 1, "metadata": 0, "unchanged": 3, "deleted": 1}
+
+    stored = pipeline.qdrant_news.get_checksums()
+    assert set(stored) == {stable_point_id("news", i) for i in range(1, 5)}
+
+
+def test_checksum_sync_batch(mongo):
+    check_sync(stream=False)
+
+
+def test_checksum_sync_stream(mongo):
+    check_sync(stream=True)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_model_change_reembeds_everything(mongo, stream):
+    pipeline, _ = make_pipeline(stream)
+    pipeline.db.save_tech_news([news(i) for i in range(1, 6)], bulk=True)
+    pipeline.embed_tech_news()
+
+    switched, model = make_pipeline(stream, model_name="fake-test-model-v2", client=pipeline.qdrant_client)
+    assert switched.embed_tech_news() == 5
+    assert len(model.encoded) == 5
+    assert switched.sync_stats["news"]["changed"] == 5
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_metadata_only_changes_update_the_payload(mongo, stream):
+    pipeline, model = make_pipeline(stream)
+    pipeline.db.save_tech_news([news(i) for i in range(1, 6)], bulk=True)
+    pipeline.embed_tech_news()
+    vector_before = pipeline.qdrant_client.retrieve("news_embeddings", [stable_point_id("news", 2)], with_vectors=True)[0].vector
+
+    model.encoded.clear()
+    pipeline.db.news_collection.update_many({"hackernews_id": {"$in": [1, 2, 3]}}, {"$inc": {"score": 50}})
+    assert pipeline.embed_tech_news() == 0
+    assert model.encoded == []
+    assert pipeline.sync_stats["news"] == {"new": 0, "changed": 0, "metadata": 3, "unchanged": 2, "deleted": 0}
+
+    point = pipeline.qdrant_client.retrieve("news_embeddings", [stable_point_id("news", 2)], with_vectors=True)[0]
+    assert point.payload["score"] == 152
+    assert point.vector == vector_before
+    pipeline.embed_tech_news()
+    assert pipeline.sync_stats["news"]["unchanged"] == 5
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_emptied_collection_deletes_every_point(mongo, stream):
+    pipeline, _ = make_pipeline(stream)
+    pipeline.db.save_tech_news([news(i) for i in range(1, 4)], bulk=True)
+    pipeline.embed_tech_news()
+
+    pipeline.db.news_collection.delete_many({})
+    assert pipeline.embed_tech_news() == 0
+    assert pipeline.sync_stats["news"]["deleted"] == 3
+    assert pipeline.qdrant_news.get_checksums() == {}
+
+
+def test_documents_without_natural_key_fall_back_to_mongo_id(mongo):
+    pipeline, _ = make_pipeline(stream=False)
+    pipeline.db.news_collection.insert_one({"title": "no hackernews id", "url": "https://example.com/x"})
+    doc = pipeline.db.news_collection.find_one()
+
+    assert pipeline.embed_tech_news() == 1
+    assert set(pipeline.qdrant_news.get_checksums()) == {stable_point_id("news", doc["_id"])}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
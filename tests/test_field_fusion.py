@@ -0,0 +1,88 @@
+"""Check EmbeddingHandler.embed_fields_batch: FIELD_WEIGHTS fusion, re-normalisation and missing fields."""
+
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+import embedding_handler
+from embed_all_data import FIELD_WEIGHTS
+from embedding_handler import EmbeddingHandler
+
+MODEL = "fake-fusion-model"
+DIM = 16
+WEIGHTS = FIELD_WEIGHTS["github"]
+
+
+def fake_vector(text):
+    """Same unnormalised vector for the same text, seeded from its crc32."""
+    return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIM).astype(np.float32) * 3
+
+
+class FakeModel:
+    def get_sentence_embedding_dimension(self):
+        return DIM
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        return np.stack([fake_vector(t) for t in texts])
+
+
+def make_handler():
+    embedding_handler._shared_models[(MODEL, "torch")] = FakeModel()
+    return EmbeddingHandler(model_name=MODEL, cache_path=None)
+
+
+def expected_fusion(fields, weights):
+    fused = np.zeros(DIM, dtype=np.float64)
+    for name, text in fields.items():
+        if text and text.strip():
+            vector = fake_vector(text.strip())
+            fused += weights.get(name, 1.0) * vector / np.linalg.norm(vector)
+    norm = np.linalg.norm(fused)
+    return fused / norm if norm > 0 else fused
+
+
+def test_fields_are_fused_by_field_weights():
+    documents = [
+        {"owner": "octo", "name": "fastvec", "description": "vector search in rust", "readme": "a long readme", "topics": "search"},
+        {"owner": "octo", "name": "slowvec", "description": "vector search in python", "readme": "", "topics": "search"},
+    ]
+    fused = make_handler().embed_fields_batch(documents, weights=WEIGHTS)
+
+    assert fused.dtype == np.float32
+    for vector, doc in zip(fused, documents):
+        assert np.allclose(vector, expected_fusion(doc, WEIGHTS), atol=1e-5)
+        assert np.isclose(np.linalg.norm(vector), 1.0, atol=1e-5)
+    # weights are real multipliers, not equal shares
+    assert not np.allclose(fused[0], expected_fusion(documents[0], {}), atol=1e-3)
+
+
+def test_missing_fields_fall_back():
+    documents = [
+        {"name": "only-a-name"},
+        {"description": "   ", "topics": None},  # nothing to embed
+        {"name": "fastvec", "extra": "not weighted"},  # unknown fields weigh 1.0
+    ]
+    fused = make_handler().embed_fields_batch(documents, weights=WEIGHTS)
+
+    single = fake_vector("only-a-name")
+    assert np.allclose(fused[0], single / np.linalg.norm(single), atol=1e-5)
+    assert fused[1].tolist() == [0.0] * DIM
+    assert np.allclose(fused[2], expected_fusion(documents[2], WEIGHTS), atol=1e-5)
+
+
+def test_documents_without_text_are_zero_vectors():
+    fused = make_handler().embed_fields_batch([{"name": ""}, {}], weights=WEIGHTS)
+    assert fused.shape == (2, DIM)
+    assert not fused.any()
+
+
+if __name__ == "__main__":
+    test_fields_are_fused_by_field_weights()
+    test_missing_fields_fall_back()
+    test_documents_without_text_are_zero_vectors()
@@ -0,0 +1,221 @@
+"""Check the GitHub trending collector (sync vs async, http cache) against a local HTTP stand-in."""
+
+import hashlib
+import http.server
+import importlib.util
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+N_REPOS = 25
+LATENCY = 0.05  # seconds added to every stand-in response
+UPDATED_AT = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def load_collector_class():
+    """Import GitHubTrendingCollector from the hyphenated collector folder."""
+    spec = importlib.util.spec_from_file_location(
+        "github_scraper", ROOT / "github-trending-collector" / "scrape.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.GitHubTrendingCollector
+
+
+def trending_html(n_repos):
+    rows = []
+    for i in range(n_repos):
+        rows.append(f"""
+        <article class="Box-row">
+          <h2><a href="/owner{i}/repo{i}">owner{i} /
+            repo{i}</a></h2>
+          <p class="col-9 color-fg-muted my-1 pr-4">A fast library number {i} for building data pipelines in Python</p>
+          <span itemprop="programmingLanguage">Python</span>
+          <span class="d-inline-block float-sm-right">{i * 10} stars today</span>
+        </article>""")
+    return f"<html><body>{''.join(rows)}</body></html>"
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    """Serves /trending, /repos/{owner}/{repo} and /{owner}/{repo}/{branch}/README.md."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+    api_calls = 0
+    arrivals = []  # monotonic arrival time of every metadata / readme request
+    exhausted_until = 0  # epoch second: until then api responses report a nearly used up quota resetting then
+
+    def do_GET(self):
+        if not self.path.startswith("/trending"):
+            StandInHandler.arrivals.append(time.monotonic())
+        time.sleep(LATENCY)
+        parts = self.path.strip("/").split("/")
+        if parts[0].startswith("trending"):
+            self._send(200, trending_html(N_REPOS), "text/html")
+        elif parts[0] == "repos" and len(parts) == 3:
+            body = json.dumps({
+                "created_at": "2024-01-01T00:00:00Z",
+                "updated_at": UPDATED_AT,
+                "pushed_at": UPDATED_AT,
+                "stargazers_count": 1000,
+                "forks_count": 10,
+                "open_issues_count": 3,
+                "topics": ["python", "data"],
+            })
+            self._send(200, body, "application/json")
+        elif len(parts) == 4 and parts[2] == "master" and parts[3] == "README.md":
+            # only the master branch exists, so the main probe 404s first
+            self._send(200, f"# {parts[1]}\n\nThis project helps you build and test data pipelines quickly.", "text/plain")
+        else:
+            self._send(404, "not found", "text/plain")
+
+    def _send(self, status, body, content_type):
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if status in (200, 304):
+            self.send_header("ETag", etag)
+        if self.path.startswith("/repos/"):  # quota headers like api.github.com, 304s are free
+            if status != 304:
+                StandInHandler.api_calls += 1
+            if time.time() < StandInHandler.exhausted_until:
+                self.send_header("X-RateLimit-Remaining", "3")
+                self.send_header("X-RateLimit-Reset", str(StandInHandler.exhausted_until))
+            else:
+                self.send_header("X-RateLimit-Remaining", str(5000 - StandInHandler.api_calls))
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_collector(collector_class, base, cache_path=":memory:"):
+    return collector_class(
+        active_days=60,
+        base_url=f"{base}/trending?since=daily",
+        api_url=base,
+        raw_url=base,
+        cache_path=cache_path,
+        language_cache_path=":memory:",
+    )
+
+
+def test_async_matches_sync():
+    """Async mode must return the same records as sync mode, faster."""
+    collector_class = load_collector_class()
+    server = start_stand_in()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        start = time.perf_counter()
+        sync_repos = make_collector(collector_class, base).fetch_trending()
+        sync_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_repos = make_collector(collector_class, base).fetch_trending_async(max_per_host=8)
+        async_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    strip = lambda repos: [{k: v for k, v in r.items() if k not in ("updated_at", "pushed_at")} for r in repos]
+    assert len(sync_repos) == N_REPOS
+    assert strip(sync_repos) == strip(async_repos)
+    assert async_time < sync_time
+
+    print(f"\nsync:  {sync_time:.2f}s for {len(sync_repos)} repos")
+    print(f"async: {async_time:.2f}s for {len(async_repos)} repos ({sync_time / async_time:.1f}x faster)")
+
+
+def test_conditional_requests_hit_cache():
+    """A second run over unchanged repos is served from 304s and uses no quota."""
+    collector_class = load_collector_class()
+    server = start_stand_in()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = str(Path(tmp) / "http_cache.sqlite")
+        try:
+            first = make_collector(collector_class, base, cache_path)
+            first_repos = first.fetch_trending_async()
+            second = make_collector(collector_class, base, cache_path)
+            second_repos = second.fetch_trending_async()
+        finally:
+            server.shutdown()
+        first.cache.conn.close()
+        second.cache.conn.close()
+
+    assert first_repos == second_repos
+    assert first.last_cache_report["hits"] == 0
+    assert first.last_cache_report["quota_used"] == N_REPOS
+    # one metadata + one readme 304 per repo, and the cached branch is probed first
+    assert second.last_cache_report["hits"] == 2 * N_REPOS
+    assert second.last_cache_report["uncached"] == 0
+    assert second.last_cache_report["quota_used"] == 0
+
+
+def test_async_pacing_is_serialized_per_host():
+    """Concurrent api requests must queue behind the pace delay, not all sleep it once and fire together."""
+    collector_class = load_collector_class()
+    server = start_stand_in()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    pace = 0.02
+    StandInHandler.arrivals = []
+    collector = make_collector(collector_class, base)
+    collector.cache.pace_delay = lambda: pace
+    try:
+        repos = collector.fetch_trending_async(max_per_host=8)
+    finally:
+        server.shutdown()
+
+    assert len(repos) == N_REPOS
+    arrivals = sorted(StandInHandler.arrivals)[:N_REPOS]
+    gaps = [b - a for a, b in zip(arrivals, arrivals[1:])]
+    # unserialized, eight requests would arrive within a millisecond of each other
+    assert min(gaps) > pace / 2
+    assert arrivals[-1] - arrivals[0] >= pace * (N_REPOS - 1) * 0.9
+
+
+def test_exhausted_quota_waits_for_one_reset():
+    """Requests queued while the quota is used up all wait for the same reset instead of stacking windows."""
+    collector_class = load_collector_class()
+    server = start_stand_in()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    StandInHandler.api_calls = 0
+    StandInHandler.arrivals = []
+    StandInHandler.exhausted_until = int(time.time()) + 2
+    collector = make_collector(collector_class, base)
+    start = time.monotonic()
+    try:
+        repos = collector.fetch_trending_async(max_per_host=8)
+    finally:
+        StandInHandler.exhausted_until = 0
+        server.shutdown()
+    elapsed = time.monotonic() - start
+
+    assert len(repos) == N_REPOS
+    # one wait of at most reset (<= 2s away) + 1s; stacked, every queued request would add another window
+    assert elapsed < 8
+    arrivals = sorted(StandInHandler.arrivals)
+    assert max(b - a for a, b in zip(arrivals, arrivals[1:])) > 0.5  # the wait did happen
+
+
+if __name__ == "__main__":
+    test_async_matches_sync()
+    test_conditional_requests_hit_cache()
+    test_async_pacing_is_serialized_per_host()
+    test_exhausted_quota_waits_for_one_reset()
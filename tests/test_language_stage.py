@@ -0,0 +1,52 @@
+"""Check LanguageStage's batched translation split against a fake translator."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "github-trending-collector"))
+
+from language_stage import LanguageStage, BATCH_MARKER
+
+
+class UpperTranslator:
+    """Stands in for googletrans: "translates" by upper-casing, counts requests."""
+
+    def __init__(self):
+        self.requests = 0
+
+    def translate(self, text, dest="en", src=None):
+        self.requests += 1
+        return SimpleNamespace(text=text.upper())
+
+
+def test_markdown_tables_survive_batching():
+    """'|||' in a markdown table must not be taken for a batch boundary."""
+    stage = LanguageStage(":memory:", translator=UpperTranslator())
+    texts = ["first | a ||| b |", "second text", "third"]
+
+    assert stage.translate_batch(texts, "de") == ["FIRST | A ||| B |", "SECOND TEXT", "THIRD"]
+    assert stage.translator.requests == 1
+
+
+def test_text_containing_the_marker_is_sent_alone():
+    stage = LanguageStage(":memory:", translator=UpperTranslator())
+    texts = ["one", f"two {BATCH_MARKER} three", "four"]
+
+    assert stage.translate_batch(texts, "de") == ["ONE", f"TWO {BATCH_MARKER} THREE", "FOUR"]
+    assert stage.translator.requests == 2
+
+
+def test_mangled_separator_falls_back_to_single_requests():
+    stage = LanguageStage(":memory:", translator=UpperTranslator())
+    stage.translator.translate = lambda text, dest="en", src=None: SimpleNamespace(
+        text=text.replace(BATCH_MARKER, "") if BATCH_MARKER in text else text.upper())
+
+    assert stage.translate_batch(["one", "two"], "de") == ["ONE", "TWO"]
+
+
+if __name__ == "__main__":
+    test_markdown_tables_survive_batching()
+    test_text_containing_the_marker_is_sent_alone()
+    test_mangled_separator_falls_back_to_single_requests()
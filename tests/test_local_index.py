@@ -0,0 +1,200 @@
+"""Check LocalVectorIndex (memory-mapped matrix + sqlite payloads) through QdrantStorage."""
+
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_client.models import Datatype, Distance, FieldCondition, Filter, MatchValue, VectorParams
+
+import local_index
+from local_index import DEFAULT_LOCAL_INDEX_PATH, LocalVectorIndex
+from qdrant_storage import QdrantStorage
+
+DIM = 16
+
+
+def vectors(n, seed=0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+def make_index(path, name="points"):
+    index = LocalVectorIndex(path)
+    if not index.collection_exists(name):
+        index.create_collection(name, VectorParams(size=DIM, distance=Distance.COSINE))
+    return index
+
+
+def upsert(index, ids, data, name="points"):
+    index.upsert(name, (list(ids), data, [{"i": int(i), "even": int(i) % 2 == 0} for i in ids]))
+
+
+def snapshot(index, name="points"):
+    """Everything a reader has loaded: id -> (payload, vector)."""
+    data, ids, payloads = index.export(name)
+    return {point_id: (payload, vector.tolist()) for point_id, payload, vector in zip(ids, payloads, data)}
+
+
+def test_upsert_delete_search():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        data = vectors(50)
+        upsert(index, range(50), data)
+        assert index.count("points").count == 50
+
+        hits = index.search("points", data[7], limit=3)
+        assert hits[0].id == 7 and hits[0].payload == {"i": 7, "even": False}
+        assert hits[0].score == pytest.approx(1.0, abs=1e-5)
+
+        upsert(index, [7], data[8:9])  # same id, new vector
+        assert {hit.id for hit in index.search("points", data[8], limit=2)} == {7, 8}
+
+        index.delete("points", [7, 8, 1000])
+        assert index.count("points").count == 48
+        assert {7, 8}.isdisjoint(hit.id for hit in index.search("points", data[8], limit=48))
+
+        upsert(index, [100], data[:1])  # reuses a freed row
+        assert len(index._collection("points").alive) == 50
+        even = Filter(must=[FieldCondition(key="even", match=MatchValue(value=True))])
+        assert all(hit.id % 2 == 0 for hit in index.search("points", data[0], query_filter=even, limit=50))
+        index.close()
+
+
+def test_update_payloads_keeps_vectors():
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = QdrantStorage("points", DIM, backend="local", path=tmp)
+        reader = make_index(tmp)
+        data = vectors(5)
+        storage.upsert_bulk(list(range(5)), data, [{"i": i, "score": 0} for i in range(5)])
+
+        assert storage.update_payloads([1, 3, 99], [{"score": 10}, {"score": 30}, {"score": 0}]) == 3
+        points = {p.id: p for p in reader.retrieve("points", [1, 3, 4], with_vectors=True)}
+        assert [points[i].payload for i in (1, 3, 4)] == [{"i": 1, "score": 10}, {"i": 3, "score": 30}, {"i": 4, "score": 0}]
+        assert np.allclose(points[1].vector, data[1] / np.linalg.norm(data[1]), atol=1e-6)
+        storage.client.close()
+        reader.close()
+
+
+def test_datetime_range_on_utc_z_timestamps():
+    """payload_timestamp stores "...Z" strings, which datetime.fromisoformat only parses from python 3.11."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = QdrantStorage("points", DIM, backend="local", path=tmp)
+        stamps = ["2023-12-31T23:00:00Z", "2024-01-15T08:30:00Z", "2024-02-01T00:00:00Z"]
+        storage.upsert_bulk(list(range(3)), vectors(3), [{"timestamp": stamp} for stamp in stamps])
+
+        assert local_index._as_datetime(stamps[0]) == datetime(2023, 12, 31, 23, tzinfo=timezone.utc)
+        hits = storage.search(vectors(1)[0], limit=3, filter_dict={"timestamp": {"$gte": datetime(2024, 1, 1)}})
+        assert sorted(hit["id"] for hit in hits) == [1, 2]
+        hits = storage.search(vectors(1)[0], limit=3, filter_dict={"timestamp": {"$lt": "2024-01-15T08:30:00Z"}})
+        assert [hit["id"] for hit in hits] == [0]
+        storage.client.close()
+
+
+def test_second_reader_refreshes_consistently():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = make_index(tmp), make_index(tmp)
+        data = vectors(300)
+        upsert(writer, range(100), data[:100])
+        assert snapshot(reader) == snapshot(writer)
+
+        upsert(writer, range(50, 200), data[100:250])  # updates and new rows, the file grows
+        writer.delete("points", list(range(0, 100, 3)))
+        upsert(writer, [1000, 1001], data[250:252])  # reuse deleted rows
+        assert snapshot(reader) == snapshot(writer)
+        assert reader._collection("points").loaded_version == writer._collection("points").loaded_version
+        assert not reader._collection("points").vectors.flags.writeable
+
+        fresh = make_index(tmp)
+        assert snapshot(fresh) == snapshot(reader)
+        for index in (writer, reader, fresh):
+            index.close()
+
+
+def test_reader_behind_the_change_log_reloads(monkeypatch):
+    monkeypatch.setattr(local_index, "CHANGE_LOG_VERSIONS", 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = make_index(tmp), make_index(tmp)
+        data = vectors(10)
+        reader.count("points")
+        for i in range(10):
+            upsert(writer, [i], data[i:i + 1])
+        writer.delete("points", [3])
+        assert snapshot(reader) == snapshot(writer)
+        assert len(snapshot(reader)) == 9
+        writer.close()
+        reader.close()
+
+
+def test_reader_during_writes_never_sees_partial_versions():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, reader = make_index(tmp), make_index(tmp)
+        data = vectors(2000)
+        errors = []
+        done = threading.Event()
+
+        def read():
+            try:
+                while not done.is_set():
+                    for hit in reader.search("points", data[0], limit=20):
+                        assert hit.payload["i"] == hit.id
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        for start in range(0, 2000, 100):
+            upsert(writer, range(start, start + 100), data[start:start + 100])
+            writer.delete("points", list(range(start, start + 100, 7)))
+        done.set()
+        thread.join()
+        assert errors == []
+        assert snapshot(reader) == snapshot(writer)
+        writer.close()
+        reader.close()
+
+
+def test_default_path_is_repo_root():
+    assert Path(DEFAULT_LOCAL_INDEX_PATH) == ROOT.resolve() / "vector_index"
+
+
+def test_float16_collection_stores_half_precision():
+    with tempfile.TemporaryDirectory() as tmp:
+        full = QdrantStorage("full", DIM, backend="local", path=tmp)
+        half = QdrantStorage("half", DIM, backend="local", path=tmp, datatype="float16")
+        data = vectors(2000)
+        for storage in (full, half):
+            storage.upsert_bulk(list(range(len(data))), data, [{"i": i} for i in range(len(data))])
+
+        assert (Path(tmp) / "half" / "vectors.f16").stat().st_size * 2 == (Path(tmp) / "full" / "vectors.f32").stat().st_size
+        assert half.client.get_collection("half").config.params.vectors.datatype == Datatype.FLOAT16
+        exported, _, _ = half.client.export("half")
+        assert exported.dtype == np.float32
+        for query in vectors(5, seed=1):
+            assert [r["id"] for r in full.search(query, limit=5)] == [r["id"] for r in half.search(query, limit=5)]
+        half.client.close()
+        full.client.close()
+
+
+def test_unsupported_datatype_is_refused():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = LocalVectorIndex(tmp)
+        with pytest.raises(ValueError):
+            index.create_collection("bytes", VectorParams(size=DIM, distance=Distance.COSINE, datatype=Datatype.UINT8))
+
+
+if __name__ == "__main__":
+    test_upsert_delete_search()
+    test_update_payloads_keeps_vectors()
+    test_datetime_range_on_utc_z_timestamps()
+    test_second_reader_refreshes_consistently()
+    test_reader_during_writes_never_sees_partial_versions()
+    test_default_path_is_repo_root()
+    test_float16_collection_stores_half_precision()
+    test_unsupported_datatype_is_refused()
@@ -0,0 +1,59 @@
+"""Check MongoDBStorage's bulk upserts (idempotent, keyed on the natural ids) against mongomock."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def repos(n, description="a fast library"):
+    return [{"full_name": f"owner{i}/repo{i}", "name": f"repo{i}", "description": description} for i in range(n)]
+
+
+def test_second_bulk_upsert_changes_nothing(storage):
+    """Re-saving the same repos matches every document and modifies none."""
+    first = storage.save_github_repos(repos(20), bulk=True)
+    first_seen = {d["full_name"]: d["scraped_at"] for d in storage.github_collection.find()}
+    second = storage.save_github_repos(repos(20), bulk=True)
+
+    assert first == {"inserted": 20, "updated": 0, "unchanged": 0, "errors": 0}
+    assert second == {"inserted": 0, "updated": 0, "unchanged": 20, "errors": 0}
+    assert storage.github_collection.count_documents({}) == 20
+    # scraped_at is the first time a repo was seen, last_seen_at moves on every run
+    for doc in storage.github_collection.find():
+        assert doc["scraped_at"] == first_seen[doc["full_name"]]
+        assert doc["last_seen_at"] >= doc["scraped_at"]
+
+
+def test_changed_documents_are_updated_in_place(storage):
+    storage.save_github_repos(repos(5), bulk=True)
+    counts = storage.save_github_repos(repos(3, description="now even faster") + repos(5)[3:], bulk=True)
+
+    assert counts == {"inserted": 0, "updated": 3, "unchanged": 2, "errors": 0}
+    assert storage.github_collection.count_documents({"description": "now even faster"}) == 3
+
+
+def test_upsert_keys_are_unique_indexes(storage):
+    """The upsert keys are indexed (and unique) before the first bulk write."""
+    storage.save_tech_news([{"hackernews_id": 1, "title": "story"}], bulk=True)
+
+    for collection, key in ((storage.github_collection, "full_name"),
+                            (storage.arxiv_collection, "arxiv_id"),
+                            (storage.news_collection, "hackernews_id")):
+        index = collection.index_information()[f"{key}_1"]
+        assert index.get("unique") is True
+        assert "scraped_at_1" in collection.index_information()
+
+
+def test_missing_key_counts_as_error(storage):
+    counts = storage.save_arxiv_papers([{"arxiv_id": "2401.00001", "title": "a"}, {"title": "no id"}], bulk=True)
+
+    assert counts["inserted"] == 1
+    assert counts["errors"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
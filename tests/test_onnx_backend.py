@@ -0,0 +1,51 @@
+"""Check that OnnxEncoder vectors match the torch SentenceTransformer within COSINE_TOLERANCE (skipped without onnxruntime or torch)."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+pytest.importorskip("torch")
+sentence_transformers = pytest.importorskip("sentence_transformers")
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from onnx_backend import COSINE_TOLERANCE, OnnxEncoder
+
+MODEL = "all-MiniLM-L6-v2"
+TEXTS = [
+    "fast async vector database written in rust",
+    "name: transformers description: state of the art machine learning for pytorch and jax",
+    "Attention is all you need. We propose a new simple network architecture based solely on attention.",
+    "x",
+    " ".join(["long readme text"] * 200),  # past max_seq_length, truncated the same way
+]
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return sentence_transformers.SentenceTransformer(MODEL, device="cpu").encode(TEXTS, convert_to_numpy=True)
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("onnx"))
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_matches_torch(backend, reference, cache_dir):
+    encoder = OnnxEncoder(MODEL, quantize=backend == "onnx-int8", cache_dir=cache_dir)
+    vectors = encoder.encode(TEXTS, batch_size=2)
+
+    assert vectors.shape == reference.shape
+    assert encoder.get_sentence_embedding_dimension() == reference.shape[1]
+    cosines = (vectors * reference).sum(axis=1) / (
+        np.linalg.norm(vectors, axis=1) * np.linalg.norm(reference, axis=1))
+    assert cosines.min() >= COSINE_TOLERANCE[backend]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,145 @@
+"""Check the periodic collector's snapshot deltas and get_corpus_as_of against mongomock."""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import periodic_collector
+
+
+@pytest.fixture
+def collector(mongo):
+    """PeriodicDataCollector on a fresh in-memory mongomock client."""
+    return periodic_collector.PeriodicDataCollector()
+
+
+def add_repos(collector, names):
+    collector.storage.save_github_repos([{"full_name": name, "name": name} for name in names], bulk=True)
+    return [collector.db["github_repos"].find_one({"full_name": name})["_id"] for name in names]
+
+
+def snapshot_at(collector, when):
+    time.sleep(0.005)  # the millisecond a snapshot is taken in belongs to the next window
+    collector.set_snapshot_date(when)
+    return collector.create_snapshot()
+
+
+def test_collector_startup_ensures_indexes(collector):
+    assert "scraped_at_1" in collector.db["github_repos"].index_information()
+
+
+def test_deltas_only_hold_new_documents(collector):
+    week1 = add_repos(collector, ["a/1", "a/2"])
+    first = snapshot_at(collector, datetime(2026, 1, 5))
+    week2 = add_repos(collector, ["a/3"])
+    add_repos(collector, ["a/1"])  # seen again, not new
+    second = snapshot_at(collector, datetime(2026, 1, 12))
+
+    assert first["delta"]["github"] == {"count": 2, "ids": week1}
+    assert second["delta"]["github"] == {"count": 1, "ids": week2}
+    assert second["window_start"] == first["window_end"]
+
+
+def test_corpus_as_of_replays_deltas(collector):
+    week1 = add_repos(collector, ["a/1", "a/2"])
+    snapshot_at(collector, datetime(2026, 1, 5))
+    week2 = add_repos(collector, ["a/3"])
+    snapshot_at(collector, datetime(2026, 1, 12))
+
+    assert collector.get_corpus_as_of(datetime(2026, 1, 1))["github"] == []
+    assert collector.get_corpus_as_of(datetime(2026, 1, 5))["github"] == week1
+    assert collector.get_corpus_as_of(datetime(2026, 1, 12) + timedelta(days=1))["github"] == week1 + week2
+
+
+def test_large_deltas_are_split_into_chunks(collector, monkeypatch):
+    """Deltas above DELTA_INLINE_IDS leave the snapshot document and still replay in order."""
+    monkeypatch.setattr(periodic_collector, "DELTA_INLINE_IDS", 3)
+    ids = add_repos(collector, [f"a/{i}" for i in range(8)])
+    snapshot = snapshot_at(collector, datetime(2026, 1, 5))
+
+    stored = collector.db["data_collection_snapshots"].find_one({"_id": snapshot["_id"]})
+    assert stored["delta"]["github"]["count"] == 8
+    assert stored["delta"]["github"]["ids"] == []
+    assert collector.db[periodic_collector.SNAPSHOT_IDS_COLLECTION].count_documents({}) == 3
+    assert collector.get_corpus_as_of(datetime(2026, 1, 5))["github"] == ids
+
+
+class FakeGitHub:
+    release = None  # threading.Event to hold the fetch on, None returns at once
+
+    def __init__(self, **kwargs):
+        pass
+
+    def fetch_trending_async(self):
+        if self.release is not None:
+            self.release.wait()
+        return [{"full_name": "a/1", "name": "1"}, {"full_name": "a/2", "name": "2"}]
+
+
+class FakeArxiv:
+    def __init__(self, **kwargs):
+        pass
+
+    def fetch_recent_papers_incremental(self, storage):
+        return [{"arxiv_id": "2401.00001", "title": "paper"}]
+
+    def commit_watermarks(self, storage):
+        pass
+
+
+class FakeNews:
+    def __init__(self, **kwargs):
+        self.known_skipped = 0
+
+    def fetch_news_concurrent(self, db=None):
+        self.known_skipped = 3  # stored stories the $in check kept from being fetched
+        return [{"hackernews_id": 1, "title": "story"}]
+
+
+@pytest.fixture
+def fake_collectors(monkeypatch):
+    for source, fake in (("github", FakeGitHub), ("arxiv", FakeArxiv), ("news", FakeNews)):
+        monkeypatch.setitem(periodic_collector._collector_classes, source, fake)
+    monkeypatch.setattr(FakeGitHub, "release", None)
+
+
+def test_collect_all_data_returns_structured_results(collector, fake_collectors):
+    collector.storage.save_github_repos([{"full_name": "a/1", "name": "1"}], bulk=True)
+    results = collector.collect_all_data()
+
+    assert set(results) == {"github", "arxiv", "news"}
+    github = results["github"]
+    assert (github["fetched"], github["inserted"], github["skipped"], github["error"]) == (2, 1, 1, None)
+    assert (results["arxiv"]["fetched"], results["arxiv"]["inserted"]) == (1, 1)
+    assert results["news"]["skipped"] == 3  # dropped before fetching, still counted
+    assert collector.collection_results == results
+
+
+def test_timed_out_collector_never_writes(collector, fake_collectors):
+    """A collector past the deadline is reported, the others still save, and its late results are dropped."""
+    release = threading.Event()
+    FakeGitHub.release = release
+    collector.collector_timeout = 0.2
+    start = time.perf_counter()
+    results = collector.collect_all_data()
+
+    assert time.perf_counter() - start < 2
+    assert results["github"]["error"] == "timeout"
+    assert results["arxiv"]["error"] is None and results["news"]["inserted"] == 1
+
+    thread = next(t for t in threading.enumerate() if t.name == "github-collector")
+    assert thread.daemon  # abandoned, interpreter exit doesn't wait on it
+    release.set()
+    thread.join(timeout=5)
+    assert collector.db["github_repos"].count_documents({}) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
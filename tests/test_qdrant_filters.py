@@ -0,0 +1,84 @@
+"""Check QdrantStorage._build_filter operators against in-memory Qdrant and the local index."""
+
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import QdrantStorage, payload_timestamp
+
+DIM = 8
+DOCS = [
+    {"source": "github", "language": "Python", "score": 10, "timestamp": payload_timestamp(datetime(2023, 6, 1))},
+    {"source": "github", "language": "Rust", "score": 250, "timestamp": payload_timestamp(datetime(2024, 1, 15))},
+    {"source": "arxiv", "language": "", "score": 40, "timestamp": payload_timestamp(datetime(2024, 3, 1, 12))},
+    {"source": "news", "language": "", "score": 900, "timestamp": payload_timestamp(datetime(2024, 5, 20))},
+]
+
+
+@pytest.fixture(params=["qdrant", "local"])
+def storage(request):
+    with tempfile.TemporaryDirectory() as tmp:
+        if request.param == "qdrant":
+            storage = QdrantStorage("filters", DIM, use_memory=True)
+        else:
+            storage = QdrantStorage("filters", DIM, backend="local", path=tmp)
+        vectors = np.random.default_rng(0).standard_normal((len(DOCS), DIM)).astype(np.float32)
+        storage.upsert_bulk(list(range(len(DOCS))), vectors, DOCS, wait=True)
+        yield storage
+        storage.client.close()
+
+
+def matching(storage, filter_dict):
+    hits = storage.search(np.ones(DIM, dtype=np.float32), limit=len(DOCS), filter_dict=filter_dict)
+    return sorted(hit["id"] for hit in hits)
+
+
+def test_eq_and_ne(storage):
+    assert matching(storage, {"source": "github"}) == [0, 1]
+    assert matching(storage, {"source": {"$eq": "arxiv"}}) == [2]
+    assert matching(storage, {"source": {"$ne": "github"}}) == [2, 3]
+
+
+def test_in_and_nin(storage):
+    assert matching(storage, {"source": {"$in": ["arxiv", "news"]}}) == [2, 3]
+    assert matching(storage, {"language": {"$nin": ["", "Rust"]}}) == [0]
+
+
+def test_numeric_range(storage):
+    assert matching(storage, {"score": {"$gte": 40, "$lt": 900}}) == [1, 2]
+    assert matching(storage, {"score": {"$gt": np.int64(250)}}) == [3]
+
+
+def test_datetime_range(storage):
+    assert matching(storage, {"timestamp": {"$gte": datetime(2024, 1, 1)}}) == [1, 2, 3]
+    assert matching(storage, {"timestamp": {"$gte": date(2024, 1, 1), "$lt": "2024-03-01T12:00:00"}}) == [1]
+    assert matching(storage, {"timestamp": {"$lte": "2023-12-31"}, "source": "github"}) == [0]
+    # same format as the stored field
+    assert matching(storage, {"timestamp": {"$gt": "2024-01-15T00:00:00Z", "$lte": "2024-05-20T00:00:00Z"}}) == [2, 3]
+    assert matching(storage, {"timestamp": {"$gte": "2024-03-01T13:00:00+01:00"}}) == [2, 3]
+
+
+def test_payload_timestamp_parses_z_suffix():
+    assert payload_timestamp("2024-01-15T08:30:00Z") == "2024-01-15T08:30:00Z"
+    assert payload_timestamp("2024-01-15T09:30:00+01:00") == "2024-01-15T08:30:00Z"
+    assert payload_timestamp("not a date", date(2024, 1, 2)) == "2024-01-02T00:00:00Z"
+
+
+def test_invalid_bounds_raise(storage):
+    with pytest.raises(ValueError, match="ISO-8601"):
+        storage.search(np.ones(DIM, dtype=np.float32), filter_dict={"score": {"$gte": "a lot"}})
+    with pytest.raises(ValueError, match="ISO-8601"):
+        storage._build_filter({"timestamp": {"$gte": datetime(2024, 1, 1), "$lt": 5}})
+    with pytest.raises(ValueError, match="unsupported filter operator"):
+        storage._build_filter({"score": {"$regex": "^1"}})
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
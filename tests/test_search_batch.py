@@ -0,0 +1,78 @@
+"""Check QdrantStorage.search_batch: numpy limits, per-query retry and error propagation."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+from qdrant_storage import QdrantStorage
+
+DIM = 8
+
+
+def make_storage(n=20):
+    storage = QdrantStorage("batch", DIM, use_memory=True)
+    vectors = np.random.default_rng(0).standard_normal((n, DIM)).astype(np.float32)
+    storage.upsert_bulk(list(range(n)), vectors, [{"i": i} for i in range(n)], wait=True)
+    return storage, vectors
+
+
+def test_numpy_limits():
+    storage, vectors = make_storage()
+    results = storage.search_batch(vectors[:3], limit=np.int64(4))
+    assert [len(r) for r in results] == [4, 4, 4]
+    results = storage.search_batch(vectors[:3], limit=np.array([1, 2, 3]))
+    assert [len(r) for r in results] == [1, 2, 3]
+
+
+def test_failed_batch_is_retried_per_query():
+    storage, vectors = make_storage()
+    expected = storage.search_batch(vectors[:5], limit=3)
+    query_batch_points = storage.client.query_batch_points
+
+    def fail_on_batches(collection_name, requests, **kwargs):
+        if len(requests) > 1:
+            raise RuntimeError("request too large")
+        return query_batch_points(collection_name=collection_name, requests=requests, **kwargs)
+
+    storage.client.query_batch_points = fail_on_batches
+    assert storage.search_batch(vectors[:5], limit=3) == expected
+
+
+def test_only_the_failed_batch_is_retried():
+    storage, vectors = make_storage()
+    expected = storage.search_batch(vectors[:5], limit=np.int32(2))
+    query_batch_points = storage.client.query_batch_points
+    sizes = []
+
+    def fail_second_batch(collection_name, requests, **kwargs):
+        sizes.append(len(requests))
+        if len(sizes) == 2:
+            raise RuntimeError("timed out")
+        return query_batch_points(collection_name=collection_name, requests=requests, **kwargs)
+
+    storage.client.query_batch_points = fail_second_batch
+    assert storage.search_batch(vectors[:5], limit=np.int32(2), max_batch=2) == expected
+    assert sizes == [2, 2, 1, 1, 1]  # second batch failed and went query by query, then the last one
+
+
+def test_persistent_error_is_raised():
+    storage, vectors = make_storage()
+
+    def unavailable(collection_name, requests, **kwargs):
+        raise ConnectionError("qdrant is down")
+
+    storage.client.query_batch_points = unavailable
+    with pytest.raises(ConnectionError):
+        storage.search_batch(vectors[:3])
+
+
+if __name__ == "__main__":
+    test_numpy_limits()
+    test_failed_batch_is_retried_per_query()
+    test_only_the_failed_batch_is_retried()
+    test_persistent_error_is_raised()
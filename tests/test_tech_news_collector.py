@@ -0,0 +1,73 @@
+"""Check the HackerNews collector's seen-id skipping and score refresh against mongomock."""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def load_collector_class():
+    """Import TechNewsCollector from the hyphenated collector folder."""
+    spec = importlib.util.spec_from_file_location(
+        "tech_news_scraper", ROOT / "tech-news-collector" / "scrape.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.TechNewsCollector
+
+
+def story(story_id, score=200, comments=10, title=None):
+    return {"id": story_id, "title": title or f"A new python library {story_id}", "url": f"https://example.com/{story_id}",
+            "score": score, "descendants": comments, "by": "someone", "time": 1700000000, "type": "story"}
+
+
+def make_collector(stories):
+    """Collector whose HackerNews calls are served from a dict, recording which items were fetched."""
+    collector = load_collector_class()(max_results=50, score_threshold=100, max_workers=4)
+    collector.fetched = []
+    collector.fetch_top_stories = lambda: list(stories)
+
+    def fetch_story_details(story_id):
+        collector.fetched.append(story_id)
+        return dict(stories[story_id])
+
+    collector.fetch_story_details = fetch_story_details
+    return collector
+
+
+def test_known_stories_are_skipped_by_default(storage):
+    storage.save_tech_news([make_collector({1: story(1)}).build_news_item(story(1))], bulk=True)
+    collector = make_collector({1: story(1), 2: story(2)})
+
+    news = collector.fetch_news_concurrent(db=storage)
+
+    assert collector.fetched == [2]
+    assert [item["hackernews_id"] for item in news] == [2]
+
+
+def test_refresh_known_only_updates_score_and_comments(storage):
+    """Known stories get their counts refreshed in place; nothing else is rewritten or returned."""
+    storage.save_tech_news([make_collector({1: story(1)}).build_news_item(story(1))], bulk=True)
+    storage.news_collection.update_one({"hackernews_id": 1}, {"$set": {"title": "edited by hand"}})
+    collector = make_collector({1: story(1, score=350, comments=42, title="retitled upstream"), 2: story(2)})
+
+    news = collector.fetch_news_concurrent(db=storage, refresh_known=True)
+
+    assert sorted(collector.fetched) == [1, 2]
+    assert [item["hackernews_id"] for item in news] == [2]
+    stored = storage.news_collection.find_one({"hackernews_id": 1})
+    assert (stored["score"], stored["comments"]) == (350, 42)
+    assert stored["title"] == "edited by hand"
+
+
+def test_refresh_never_inserts(storage):
+    assert storage.update_news_scores([story(7)]) == 0
+    assert storage.news_collection.count_documents({}) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,85 @@
+"""Check QdrantStorage.upsert_bulk: per-chunk retry, failed_ids and the final wait=True barrier."""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "embedding_pipeline"))
+
+import qdrant_storage
+from qdrant_storage import QdrantStorage
+
+DIM = 8
+
+
+class FakeClient:
+    """Records upserts; fail(first_id, wait, times) makes matching requests raise that many times."""
+
+    def __init__(self):
+        self.calls = []
+        self.failures = {}
+
+    def fail(self, first_id, wait=False, times=1):
+        self.failures[(first_id, wait)] = times
+
+    def upsert(self, collection_name, points, wait):
+        key = (points.ids[0], wait)
+        self.calls.append(key)
+        if self.failures.get(key, 0) > 0:
+            self.failures[key] -= 1
+            raise ConnectionError("write rejected")
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setattr(qdrant_storage.time, "sleep", lambda seconds: None)
+    storage = QdrantStorage("bulk", DIM, use_memory=True)
+    storage.client = FakeClient()
+    return storage
+
+
+def upsert(storage, n=10, **kwargs):
+    vectors = np.random.default_rng(0).standard_normal((n, DIM)).astype(np.float32)
+    return storage.upsert_bulk(list(range(n)), vectors, [{"i": i} for i in range(n)], chunk_size=4, workers=1, **kwargs)
+
+
+def test_failed_chunk_is_retried(storage):
+    storage.client.fail(4, times=2)
+    assert upsert(storage, retries=3) == 10
+    assert storage.failed_ids == []
+    assert storage.client.calls.count((4, False)) == 3
+
+
+def test_chunk_out_of_retries_lands_in_failed_ids(storage):
+    storage.client.fail(4, times=3)
+    assert upsert(storage, retries=3) == 6
+    assert storage.failed_ids == [4, 5, 6, 7]
+    assert storage.client.calls[-1] == (8, True)  # barrier on the last chunk that went through
+
+
+def test_barrier_is_sent_once_with_wait(storage):
+    assert upsert(storage) == 10
+    assert storage.client.calls == [(0, False), (4, False), (8, False), (8, True)]
+    storage.client.calls.clear()
+    assert upsert(storage, wait=True) == 10
+    assert storage.client.calls == [(0, True), (4, True), (8, True)]
+
+
+def test_failed_barrier_counts_its_chunk_once(storage):
+    storage.client.fail(8, wait=True, times=3)
+    assert upsert(storage, retries=3) == 8
+    assert storage.failed_ids == [8, 9]
+
+
+def test_barrier_skips_failed_last_chunk(storage):
+    storage.client.fail(8, times=3)
+    assert upsert(storage, retries=3) == 8
+    assert storage.failed_ids == [8, 9]
+    assert storage.client.calls[-1] == (4, True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
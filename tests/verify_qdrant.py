@@ -34,9 +34,9 @@ def main():
         
         for col_name in collection_names:
             print(f"\n📦 {col_name}:")
-            points_result = client.retrieve(
+            points_result, _ = client.scroll(
                 collection_name=col_name,
-                ids=[1],
+                limit=1,
                 with_payload=True
             )
             
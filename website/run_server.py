@@ -9,6 +9,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from mongodb_storage import MongoDBStorage
 
 PORT = 8000
+db = MongoDBStorage() # one storage (and pooled client) for the whole server, not one per request
 
 class CustomHandler(http.server.SimpleHTTPRequestHandler):
     def do_POST(self): # handle POST requests
@@ -26,7 +27,6 @@ class CustomHandler(http.server.SimpleHTTPRequestHandler):
                     self.wfile.write(json.dumps({"error": "First name and email are required"}).encode())
                     return
                 # save to mongodb:
-                db = MongoDBStorage()
                 user_id = db.save_user(first_name, email)
                 if user_id:
                     self.send_response(200)